@@ -0,0 +1,219 @@
+"""Offline bulk analysis of historical tenders.
+
+    python -m app.bulk_analyze /data/tenders --owner analyst@example.com --workers 8
+    python -m app.bulk_analyze manifest.txt --owner analyst@example.com --checkpoint backfill.jsonl
+
+Each PDF is parsed in a process pool with the same pipeline the API uses; the
+parent process copies the file into storage and writes the ``Document`` and
+``AnalysisReport`` rows under the chosen owner. Finished files are appended to a
+JSON-lines checkpoint, so an interrupted run resumes where it stopped.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .core.database import session_scope
+from .core.migrations import upgrade_database
+from .models import AnalysisReport, Document, User
+from .schemas import RuleConfig
+from .services.analysis_runner import build_highlights
+from .services.pdf_analyzer import analyze_pdf
+from .services.report_builder import create_export_bundle
+from .services.storage import store_local_file
+from .services.versioning import page_hashes, replace_document_pages
+
+
+LOGGER = logging.getLogger("gem_analyzer.bulk")
+
+
+def discover_sources(target: Path) -> List[Path]:
+    """A directory is scanned recursively for PDFs; any other file is read as a manifest of paths."""
+    if target.is_dir():
+        return sorted(path.resolve() for path in target.rglob("*") if path.is_file() and path.suffix.lower() == ".pdf")
+
+    sources: List[Path] = []
+    for line in target.read_text(encoding="utf-8").splitlines():
+        entry = line.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        path = Path(entry)
+        sources.append((path if path.is_absolute() else target.parent / path).resolve())
+    return sources
+
+
+def load_checkpoint(checkpoint: Path) -> Set[str]:
+    if not checkpoint.exists():
+        return set()
+    completed: Set[str] = set()
+    for line in checkpoint.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # a torn final line from an interrupted write
+        if entry.get("status") == "completed":
+            completed.add(entry["source"])
+    return completed
+
+
+def _analyze_source(source: str, rule_data: Dict[str, Any], owner_email: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    rule_model = RuleConfig(**rule_data)
+    hashes = page_hashes(Path(source))
+    # The bulk pool already fills every core; a nested BOQ table pool would oversubscribe it.
+    result = analyze_pdf(Path(source), rule_model, table_workers=1)
+    sections_dict = {key: value.model_dump() for key, value in result.sections.items()}
+    highlights = build_highlights(sections_dict)
+    export_path = create_export_bundle(
+        document_name=Path(source).name,
+        summary=result.summary,
+        highlights=highlights,
+        sections=result.sections,
+        rule_config=rule_data,
+        owner_email=owner_email,
+        boq_rows=result.boq_rows,
+    )
+    return {
+        "summary": result.summary,
+        "highlights": highlights,
+        "sections": sections_dict,
+        "boq_rows": [row.model_dump() for row in result.boq_rows],
+        "export_path": str(export_path),
+        "page_count": result.page_count,
+        # Page records let a later amendment of this tender be analyzed incrementally.
+        "page_hashes": hashes,
+        "pages": result.pages,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def _persist(owner_id: int, source: Path, rule_data: Dict[str, Any], outcome: Dict[str, Any]) -> int:
+    stored_path = store_local_file(source)
+    with session_scope() as db:
+        document = Document(
+            owner_id=owner_id,
+            original_filename=source.name,
+            stored_filename=stored_path.name,
+            content_type="application/pdf",
+            file_size=stored_path.stat().st_size,
+            status="completed",
+            rule_config=rule_data,
+            metadata_notes=f"Bulk import from {source}",
+        )
+        db.add(document)
+        db.flush()
+        db.add(
+            AnalysisReport(
+                document_id=document.id,
+                summary=outcome["summary"],
+                highlights=outcome["highlights"],
+                sections=outcome["sections"],
+                boq_rows=outcome["boq_rows"],
+                rule_config=rule_data,
+                zip_path=outcome["export_path"],
+                export_path=outcome["export_path"],
+            )
+        )
+        replace_document_pages(db, document.id, outcome["page_hashes"], outcome["pages"])
+        db.flush()
+        return document.id
+
+
+class Throughput:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.documents = 0
+        self.pages = 0
+        self.failures = 0
+
+    def record(self, pages: int) -> None:
+        self.documents += 1
+        self.pages += pages
+
+    def report(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (
+            f"{self.documents} documents, {self.pages} pages, {self.failures} failed in {elapsed:.1f}s "
+            f"({self.pages / elapsed:.1f} pages/s, {self.documents * 60 / elapsed:.1f} documents/min)"
+        )
+
+
+def _bounded_submit(pool: ProcessPoolExecutor, sources: List[Path], window: int, *args: Any) -> Iterator[Tuple[Path, Future]]:
+    """Yield finished futures while keeping at most ``window`` analyses queued in the pool."""
+    pending: Dict[Future, Path] = {}
+    iterator = iter(sources)
+    while True:
+        while len(pending) < window:
+            source = next(iterator, None)
+            if source is None:
+                break
+            pending[pool.submit(_analyze_source, str(source), *args)] = source
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a directory or manifest of tender PDFs straight into the database.")
+    parser.add_argument("target", type=Path, help="directory of PDFs or a manifest file with one path per line")
+    parser.add_argument("--owner", required=True, help="email of the existing user who will own the documents")
+    parser.add_argument("--workers", type=int, default=None, help="analysis processes (default: CPU count)")
+    parser.add_argument("--checkpoint", type=Path, default=Path("bulk_analyze.checkpoint.jsonl"))
+    parser.add_argument("--rule-config", type=Path, default=None, help="JSON rule config (default: built-in rules)")
+    parser.add_argument("--report-every", type=int, default=25, help="print throughput every N documents")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    upgrade_database()
+
+    with session_scope() as db:
+        owner = db.query(User).filter(User.email == args.owner).first()
+        if owner is None:
+            print(f"No user registered with email {args.owner}", file=sys.stderr)
+            return 2
+        owner_id, owner_email = owner.id, owner.email
+
+    rule_data = RuleConfig(**json.loads(args.rule_config.read_text(encoding="utf-8"))) if args.rule_config else RuleConfig()
+    rule_dump = rule_data.model_dump()
+
+    sources = discover_sources(args.target)
+    completed = load_checkpoint(args.checkpoint)
+    pending = [source for source in sources if str(source) not in completed]
+    print(f"{len(sources)} PDFs found, {len(sources) - len(pending)} already done, {len(pending)} to analyze")
+    if not pending:
+        return 0
+
+    workers = args.workers or os.cpu_count() or 1
+    stats = Throughput()
+    with args.checkpoint.open("a", encoding="utf-8") as checkpoint, ProcessPoolExecutor(max_workers=workers) as pool:
+        # Two in flight per worker keeps every process busy without materializing every future.
+        for source, future in _bounded_submit(pool, pending, 2 * workers, rule_dump, owner_email):
+            entry: Dict[str, Any] = {"source": str(source)}
+            try:
+                outcome = future.result()
+                entry.update(status="completed", document_id=_persist(owner_id, source, rule_dump, outcome), pages=outcome["page_count"])
+                stats.record(outcome["page_count"])
+            except Exception as exc:
+                LOGGER.exception("Failed to analyze %s", source)
+                entry.update(status="failed", error=f"{exc.__class__.__name__}: {exc}")
+                stats.failures += 1
+            checkpoint.write(json.dumps(entry) + "\n")
+            checkpoint.flush()
+            if stats.documents and stats.documents % args.report_every == 0:
+                print(stats.report())
+
+    print(stats.report())
+    return 1 if stats.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,8 @@ class Settings(BaseSettings):
 
     database_url: str = Field(default="sqlite:///./gem_analyzer.db", env="DATABASE_URL")
     sqlalchemy_echo: bool = Field(default=False, env="SQLALCHEMY_ECHO")
+    # Defaults to DATABASE_URL with its asyncio driver (aiosqlite / asyncpg); set it when driver options differ.
+    async_database_url: Optional[str] = Field(default=None, env="ASYNC_DATABASE_URL")
 
     access_token_expire_minutes: int = Field(default=60 * 12, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     jwt_secret_key: str = Field(default="change-me", env="JWT_SECRET_KEY")
@@ -20,6 +22,51 @@ class Settings(BaseSettings):
     export_dir: Path = Field(default=Path("storage/exports"))
     template_dir: Path = Field(default=Path("app/templates"))
 
+    boq_table_workers: int = Field(default=2, env="BOQ_TABLE_WORKERS")
+    boq_parallel_min_pages: int = Field(default=4, env="BOQ_PARALLEL_MIN_PAGES")
+
+    # "inline" runs analyses as background tasks in the API process; "queue" leaves them to `python -m app.worker`.
+    analysis_executor: str = Field(default="inline", env="ANALYSIS_EXECUTOR")
+    worker_concurrency: int = Field(default=2, env="WORKER_CONCURRENCY")
+    worker_poll_interval_seconds: float = Field(default=2.0, env="WORKER_POLL_INTERVAL_SECONDS")
+    job_lease_seconds: int = Field(default=120, env="JOB_LEASE_SECONDS")
+    job_max_attempts: int = Field(default=3, env="JOB_MAX_ATTEMPTS")
+    job_retry_delay_seconds: int = Field(default=30, env="JOB_RETRY_DELAY_SECONDS")
+
+    # Admission control for analyses run inside the API process (ANALYSIS_EXECUTOR=inline).
+    analysis_max_concurrent: int = Field(default=2, env="ANALYSIS_MAX_CONCURRENT")
+    analysis_memory_budget_mb: float = Field(default=1536, env="ANALYSIS_MEMORY_BUDGET_MB")
+    analysis_max_queue_depth: int = Field(default=16, env="ANALYSIS_MAX_QUEUE_DEPTH")
+    analysis_max_per_user: int = Field(default=4, env="ANALYSIS_MAX_PER_USER")
+
+    compression_min_bytes: int = Field(default=1024, env="COMPRESSION_MIN_BYTES")
+    gzip_level: int = Field(default=6, env="GZIP_LEVEL")
+    brotli_quality: int = Field(default=5, env="BROTLI_QUALITY")
+    document_payload_cache_size: int = Field(default=20000, env="DOCUMENT_PAYLOAD_CACHE_SIZE")
+    # Analyses read per keyset batch by GET /documents/export.
+    export_batch_size: int = Field(default=500, env="EXPORT_BATCH_SIZE")
+    # ZipFile keeps ~0.5 KB of metadata per member until the archive closes, roughly 5 members per analysis.
+    export_zip_max_analyses: int = Field(default=10000, env="EXPORT_ZIP_MAX_ANALYSES")
+    # Lifetime of the token in a signed export link; it only has to outlive the browser starting the download.
+    export_link_ttl_seconds: int = Field(default=60, env="EXPORT_LINK_TTL_SECONDS")
+
+    # "frequency", "textrank", "lexrank" or "lsa"; rule sections may override both. A budget of 0 disables it.
+    summarizer_engine: str = Field(default="frequency", env="SUMMARIZER_ENGINE")
+    summarizer_budget_ms: float = Field(default=250.0, env="SUMMARIZER_BUDGET_MS")
+
+    # Pages read by mode=preview before the full analysis takes over, and the wall-clock budget for reading them
+    # (waiting for an admission slot included); a preview that cannot start in time is skipped.
+    preview_page_budget: int = Field(default=5, env="PREVIEW_PAGE_BUDGET")
+    preview_time_budget_ms: float = Field(default=1500.0, env="PREVIEW_TIME_BUDGET_MS")
+
+    rule_matcher_cache_size: int = Field(default=256, env="RULE_MATCHER_CACHE_SIZE")
+
+    progress_keepalive_seconds: float = Field(default=15.0, env="PROGRESS_KEEPALIVE_SECONDS")
+
+    # Event-loop lag is sampled every interval; the window keeps the most recent samples for /health/loop.
+    loop_lag_interval_ms: float = Field(default=50.0, env="LOOP_LAG_INTERVAL_MS")
+    loop_lag_window: int = Field(default=1200, env="LOOP_LAG_WINDOW")
+
     allowed_origins: List[str] = Field(default_factory=lambda: ["*"], env="ALLOWED_ORIGINS")
 
     smtp_host: str = Field(default="smtp.example.com", env="SMTP_HOST")
@@ -1,7 +1,8 @@
 from contextlib import contextmanager
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from .config import get_settings
@@ -10,10 +11,32 @@ from .config import get_settings
 settings = get_settings()
 
 
-engine = create_engine(settings.database_url, echo=settings.sqlalchemy_echo, future=True)
+# SQLite connections are shared across the threadpool and with worker processes; wait on locks instead of failing.
+connect_args = {"check_same_thread": False, "timeout": 30} if settings.database_url.startswith("sqlite") else {}
+
+engine = create_engine(settings.database_url, echo=settings.sqlalchemy_echo, future=True, connect_args=connect_args)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
 
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+
+def with_async_driver(url: str) -> str:
+    """The same database through its asyncio driver, e.g. ``sqlite:///x.db`` -> ``sqlite+aiosqlite:///x.db``."""
+    scheme, separator, rest = url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+", 1)[0])
+    return f"{driver}{separator}{rest}" if driver and separator else url
+
+
+# Async request handlers use their own pool so commits never block the event loop; sync routes keep SessionLocal.
+async_engine = create_async_engine(
+    settings.async_database_url or with_async_driver(settings.database_url),
+    echo=settings.sqlalchemy_echo,
+    connect_args={"timeout": 30} if settings.database_url.startswith("sqlite") else {},
+)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 @contextmanager
 def session_scope() -> Generator[Session, None, None]:
@@ -31,3 +54,13 @@ def session_scope() -> Generator[Session, None, None]:
 def get_db() -> Generator[Session, None, None]:
     with session_scope() as session:
         yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
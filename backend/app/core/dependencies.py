@@ -1,25 +1,63 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..models import User
 from ..schemas import TokenPayload
-from .database import get_db
-from .security import decode_access_token
+from .database import get_async_db, get_db
+from .security import EXPORT_SCOPE, decode_access_token
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_db)]) -> User:
+def _token_subject(token: str, scope: Optional[str] = None) -> str:
+    """Subject of a valid token issued for ``scope``; session tokens carry no scope."""
     try:
         payload = TokenPayload(**decode_access_token(token))
     except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    if payload.scope != scope:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    return payload.sub
+
 
-    user = db.query(User).filter(User.email == payload.sub).first()
+def _require_user(user: Optional[User]) -> User:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
+
+
+def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_db)]) -> User:
+    subject = _token_subject(token)
+    return _require_user(db.query(User).filter(User.email == subject).first())
+
+
+def get_export_user(
+    db: Annotated[Session, Depends(get_db)],
+    bearer: Annotated[Optional[str], Depends(optional_oauth2_scheme)],
+    token: Optional[str] = Query(default=None, description="Token of a signed export link"),
+) -> User:
+    """The bearer user for API clients, or the owner of a signed export link the browser navigated to."""
+    if token:
+        subject = _token_subject(token, scope=EXPORT_SCOPE)
+    elif bearer:
+        subject = _token_subject(bearer)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"}
+        )
+    return _require_user(db.query(User).filter(User.email == subject).first())
+
+
+async def get_current_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[AsyncSession, Depends(get_async_db)]
+) -> User:
+    """``get_current_user`` for async routes: the lookup runs on the async engine instead of blocking the loop."""
+    subject = _token_subject(token)
+    return _require_user(await db.scalar(select(User).where(User.email == subject).limit(1)))
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .config import get_settings
+
+
+settings = get_settings()
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep.
+
+    Any synchronous work on an async path (a blocking commit, a CPU-bound parse)
+    delays every other coroutine by the same amount, so the lag distribution is a
+    direct view of how well the loop is kept free.
+    """
+
+    def __init__(self, interval_seconds: float, window: int):
+        self.interval_seconds = interval_seconds
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.total_samples = 0
+        self.max_lag_ms = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self.total_samples = 0
+        self.max_lag_ms = 0.0
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = max(0.0, loop.time() - started - self.interval_seconds) * 1000
+            self._samples.append(lag_ms)
+            self.total_samples += 1
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self._samples)
+
+        def percentile(fraction: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2) if ordered else 0.0
+
+        return {
+            "interval_ms": self.interval_seconds * 1000,
+            "window_samples": len(ordered),
+            "total_samples": self.total_samples,
+            "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max_lag_ms, 2),
+        }
+
+
+loop_monitor = LoopLagMonitor(settings.loop_lag_interval_ms / 1000, settings.loop_lag_window)
@@ -0,0 +1,44 @@
+"""Schema upgrades through Alembic, applied on startup by the API, the workers and the CLIs.
+
+``alembic upgrade head`` from ``backend/`` does the same by hand.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .database import engine
+
+
+LOGGER = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# The schema ``create_all`` built before migrations existed; such databases are stamped here, then upgraded.
+BASELINE_REVISION = "0001_baseline"
+# Arbitrary key for the PostgreSQL advisory lock that keeps API and worker processes from migrating at once.
+MIGRATION_LOCK_KEY = 72_710_034
+
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def upgrade_database(bind: Engine = engine) -> None:
+    config = alembic_config()
+    with bind.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        tables = set(inspect(connection).get_table_names())
+        config.attributes["connection"] = connection
+        if "users" in tables and "alembic_version" not in tables:
+            LOGGER.info("Database predates migrations; stamping it at %s before upgrading", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
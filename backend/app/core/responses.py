@@ -0,0 +1,34 @@
+import gzip
+from typing import Any, Dict, Union
+
+import brotli
+import orjson
+from fastapi import Request, Response
+
+from .config import get_settings
+
+
+settings = get_settings()
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def compressed_json(request: Request, content: Union[bytes, Any], status_code: int = 200) -> Response:
+    """Return JSON (pre-serialized bytes or a plain object), compressed when large enough and accepted.
+
+    Compression is applied per JSON response rather than as middleware so that SSE
+    streams and already-deflated ZIP downloads are never buffered or recompressed.
+    """
+    body = content if isinstance(content, bytes) else dumps(content)
+    headers: Dict[str, str] = {"Vary": "Accept-Encoding"}
+    if len(body) >= settings.compression_min_bytes:
+        accepted = request.headers.get("accept-encoding", "").lower()
+        if "br" in accepted:
+            body = brotli.compress(body, quality=settings.brotli_quality)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=settings.gzip_level)
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
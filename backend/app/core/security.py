@@ -9,6 +9,9 @@ from .config import get_settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# ``scope`` claim of the short-lived tokens in signed export links; they are not session credentials.
+EXPORT_SCOPE = "export"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -5,11 +5,14 @@ from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .core.config import get_settings
-from .core.database import engine
-from .models import Base
-from .routers import analysis, auth
+from .core.database import async_engine
+from .core.loop_monitor import loop_monitor
+from .core.migrations import upgrade_database
+from .routers import analysis, auth, profiles
+from .services.admission import admission_controller
 
 
 LOGGER = logging.getLogger("gem_analyzer")
@@ -17,7 +20,7 @@ settings = get_settings()
 
 
 def create_application() -> FastAPI:
-    application = FastAPI(title=settings.project_name, version="1.0.0")
+    application = FastAPI(title=settings.project_name, version="1.0.0", default_response_class=ORJSONResponse)
 
     application.add_middleware(
         CORSMiddleware,
@@ -29,11 +32,24 @@ def create_application() -> FastAPI:
 
     application.include_router(auth.router, prefix=settings.api_v1_prefix)
     application.include_router(analysis.router, prefix=settings.api_v1_prefix)
+    application.include_router(profiles.router, prefix=settings.api_v1_prefix)
 
     @application.get("/health", tags=["health"])  # type: ignore[misc]
     def healthcheck() -> dict[str, Any]:
         return {"status": "ok"}
 
+    @application.get("/health/admission", tags=["health"])  # type: ignore[misc]
+    def admission_status() -> dict[str, Any]:
+        return admission_controller.snapshot()
+
+    @application.get("/health/loop", tags=["health"])  # type: ignore[misc]
+    async def loop_lag(reset: bool = False) -> dict[str, Any]:
+        """Event-loop lag of this worker process; ``reset`` starts a fresh window after reading it."""
+        snapshot = loop_monitor.snapshot()
+        if reset:
+            loop_monitor.reset()
+        return snapshot
+
     return application
 
 
@@ -42,5 +58,16 @@ app = create_application()
 
 @app.on_event("startup")
 def on_startup() -> None:
-    LOGGER.info("Creating database tables if not present")
-    Base.metadata.create_all(bind=engine)
+    LOGGER.info("Applying database migrations")
+    upgrade_database()
+
+
+@app.on_event("startup")
+async def start_loop_monitor() -> None:
+    loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await loop_monitor.stop()
+    await async_engine.dispose()
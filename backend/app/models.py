@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from itertools import chain
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String, Text, event, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, attributes, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
@@ -27,8 +31,10 @@ class User(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    # Ids key cached listing fragments and progress streams, so a deleted document's id must never come back.
+    __table_args__ = {"sqlite_autoincrement": True}
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     original_filename: Mapped[str] = mapped_column(String(512), nullable=False)
     stored_filename: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
@@ -38,23 +44,320 @@ class Document(Base):
     rule_config: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
     metadata_notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     uploaded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    # Amendments and corrigenda are uploaded as new versions of the document they replace.
+    parent_document_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("documents.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    version: Mapped[int] = mapped_column(Integer, default=1)
+    # Saved rule profile (and the version of it) the latest analysis was requested with, if any.
+    rule_profile_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("rule_profiles.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    rule_profile_version: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     owner: Mapped[User] = relationship(back_populates="documents")
     analyses: Mapped[List["AnalysisReport"]] = relationship(back_populates="document", cascade="all, delete-orphan")
+    jobs: Mapped[List["AnalysisJob"]] = relationship(back_populates="document", cascade="all, delete-orphan")
+    pages: Mapped[List["DocumentPage"]] = relationship(back_populates="document", cascade="all, delete-orphan")
+
+
+class RuleProfile(Base):
+    """A named rule config saved by a user, optionally shared with everyone in the same organization."""
+
+    __tablename__ = "rule_profiles"
+    # Ids key the compiled matcher caches of every process, so a deleted profile's id must never come back.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    organization: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    rule_config: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    # Bumped on every edit; compiled matchers are cached per (id, version).
+    version: Mapped[int] = mapped_column(Integer, default=1)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class AnalysisReport(Base):
     __tablename__ = "analysis_reports"
+    __table_args__ = {"sqlite_autoincrement": True}
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     summary: Mapped[str] = mapped_column(Text, nullable=False)
     highlights: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
     sections: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    boq_rows: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
     rule_config: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
     zip_path: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
     export_path: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
     emailed_to: Mapped[Optional[List[str]]] = mapped_column(JSON, default=list)
+    version_diff: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    # Set on quick previews of the leading pages; the full analysis deletes them when it lands.
+    preview_pages: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # The queue job that produced this report; unique so a retried job can never write a second one.
+    job_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("analysis_jobs.id", ondelete="SET NULL"), nullable=True, unique=True, index=True
+    )
 
     document: Mapped[Document] = relationship(back_populates="analyses")
+
+
+class DocumentPage(Base):
+    """Per-page text hash, extracted text and keyword hits, so later versions can skip unchanged pages."""
+
+    __tablename__ = "document_pages"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    page_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    text_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    text: Mapped[str] = mapped_column(Text, default="")
+    keyword_hits: Mapped[Dict[str, List[int]]] = mapped_column(JSON, default=dict)
+
+    document: Mapped[Document] = relationship(back_populates="pages")
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner_email: Mapped[str] = mapped_column(String(255), nullable=False)
+    rule_config: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    status: Mapped[str] = mapped_column(String(32), default="queued", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, index=True)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    progress: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    document: Mapped[Document] = relationship(back_populates="jobs")
+
+
+class DocumentChange(Base):
+    """Append-only change log; its id is the cursor handed out by ``GET /documents/changes``.
+
+    Ids must become visible in increasing order per owner, which SQLite's single writer gives for free
+    and ``_record_document_changes`` enforces on PostgreSQL.
+    """
+
+    __tablename__ = "document_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # No foreign key: tombstones must outlive the document they describe.
+    document_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+# Namespace for the per-owner advisory locks that serialize change-log writes on PostgreSQL.
+CHANGE_LOG_LOCK_KEY = 27
+
+
+@event.listens_for(Session, "after_flush")
+def _record_document_changes(session: Session, flush_context: Any) -> None:
+    touched: Dict[int, Tuple[Optional[int], bool]] = {}
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, Document) and instance.id is not None:
+            touched[instance.id] = (instance.owner_id, instance in session.deleted)
+        elif isinstance(instance, AnalysisReport) and instance.document_id is not None:
+            touched.setdefault(instance.document_id, (None, False))
+    if not touched:
+        return
+
+    connection = session.connection()
+    unknown = [document_id for document_id, (owner_id, _) in touched.items() if owner_id is None]
+    owners = dict(connection.execute(select(Document.id, Document.owner_id).where(Document.id.in_(unknown))).all()) if unknown else {}
+    rows = [
+        {"owner_id": owners.get(document_id) if owner_id is None else owner_id, "document_id": document_id, "deleted": deleted}
+        for document_id, (owner_id, deleted) in touched.items()
+    ]
+    rows = [row for row in rows if row["owner_id"] is not None]
+    if not rows:
+        return
+
+    if connection.dialect.name == "postgresql":
+        # Sequence values are handed out at INSERT but become visible at COMMIT, so two concurrent writers
+        # could commit ids 42 then 41 and a client holding cursor 42 would never see 41. Holding a
+        # per-owner lock until commit makes each owner's ids visible in order; cursors are per owner.
+        for owner_id in sorted({row["owner_id"] for row in rows}):
+            connection.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_KEY, owner_id)))
+    now = datetime.utcnow()
+    connection.execute(insert(DocumentChange), [{**row, "changed_at": now} for row in rows])
+
+
+class DashboardCounter(Base):
+    """Per-user running totals behind ``GET /documents/stats``, kept current by ``_maintain_dashboard_counters``.
+
+    ``kind`` is ``status``, ``section`` or ``keyword`` for the current state of every document and its
+    latest analysis, or ``uploaded`` / ``analyzed`` keyed by ISO day. ``total`` carries the summed
+    importance score of ``section`` rows.
+    """
+
+    __tablename__ = "dashboard_counters"
+
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+
+CounterDeltas = Dict[Tuple[int, str, str], List[float]]
+
+
+def analysis_counters(sections: Optional[Dict[str, Any]]) -> Iterator[Tuple[str, str, float]]:
+    """What an analysis adds to its owner's counters: each section with its score, and each distinct keyword found."""
+    keywords = set()
+    for key, insight in (sections or {}).items():
+        yield "section", key, float(insight.get("importance_score") or 0.0)
+        keywords.update(insight.get("keywords_found") or ())
+    for keyword in sorted(keywords):
+        yield "keyword", keyword, 0.0
+
+
+def _bump(deltas: CounterDeltas, owner_id: Optional[int], kind: str, key: Any, sign: int, total: float = 0.0) -> None:
+    if owner_id is None or key is None:
+        return
+    entry = deltas.setdefault((owner_id, kind, str(key)[:255]), [0, 0.0])
+    entry[0] += sign
+    entry[1] += sign * total
+
+
+def _bump_analysis(deltas: CounterDeltas, owner_id: Optional[int], sections: Optional[Dict[str, Any]], sign: int) -> None:
+    for kind, key, total in analysis_counters(sections):
+        _bump(deltas, owner_id, kind, key, sign, total)
+
+
+def _latest_sections(connection: Connection, document_id: int, exclude: Collection[int] = ()) -> Optional[Dict[str, Any]]:
+    query = select(AnalysisReport.sections).where(AnalysisReport.document_id == document_id)
+    if exclude:
+        query = query.where(AnalysisReport.id.not_in(exclude))
+    order = (AnalysisReport.created_at.desc(), AnalysisReport.id.desc())
+    return connection.execute(query.order_by(*order).limit(1)).scalar_one_or_none()
+
+
+def _committed_status(connection: Connection, document: Document) -> Optional[str]:
+    history = attributes.get_history(document, "status")
+    if history.deleted:
+        return history.deleted[0]
+    if history.added:  # the previous value was never loaded
+        return connection.execute(select(Document.status).where(Document.id == document.id)).scalar_one_or_none()
+    return document.status
+
+
+def _apply_counter_deltas(connection: Connection, deltas: CounterDeltas) -> None:
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(connection.dialect.name)
+    for (owner_id, kind, key), (count, total) in deltas.items():
+        if not count and not total:
+            continue
+        values = {"owner_id": owner_id, "kind": kind, "key": key, "count": count, "total": total}
+        if dialect is not None:
+            statement = dialect.insert(DashboardCounter).values(**values)
+            connection.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["owner_id", "kind", "key"],
+                    set_={
+                        "count": DashboardCounter.count + statement.excluded.count,
+                        "total": DashboardCounter.total + statement.excluded.total,
+                    },
+                )
+            )
+            continue
+        result = connection.execute(
+            update(DashboardCounter)
+            .where(DashboardCounter.owner_id == owner_id, DashboardCounter.kind == kind, DashboardCounter.key == key)
+            .values(count=DashboardCounter.count + count, total=DashboardCounter.total + total)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(DashboardCounter).values(**values))
+
+
+@event.listens_for(Session, "before_flush")
+def _maintain_dashboard_counters(session: Session, flush_context: Any, instances: Any) -> None:
+    """Fold each flush's document and analysis writes into ``dashboard_counters`` in the same transaction.
+
+    Runs before the flush so the database still holds every touched document's previous status and
+    latest analysis; only those are subtracted before the new state is added.
+    """
+    now = datetime.utcnow()
+    deltas: CounterDeltas = {}
+    deleted_owners = {instance.id for instance in session.deleted if isinstance(instance, User)}
+    deleted_documents = [
+        instance for instance in session.deleted
+        if isinstance(instance, Document) and instance.id is not None and instance.owner_id not in deleted_owners
+    ]
+    deleted_document_ids = {document.id for document in deleted_documents}
+    added_reports: Dict[Any, List[AnalysisReport]] = defaultdict(list)
+    removed_reports: Dict[Any, List[AnalysisReport]] = defaultdict(list)
+
+    for instance in session.new:
+        if isinstance(instance, Document):
+            # Column defaults only apply at INSERT; set them now so the counters see the stored values.
+            instance.uploaded_at = instance.uploaded_at or now
+            instance.status = instance.status or "pending"
+            _bump(deltas, instance.owner_id, "status", instance.status, 1)
+            _bump(deltas, instance.owner_id, "uploaded", instance.uploaded_at.date().isoformat(), 1)
+        elif isinstance(instance, AnalysisReport):
+            instance.created_at = instance.created_at or now
+            target = instance.document_id if instance.document_id is not None else instance.document
+            added_reports[target.id if isinstance(target, Document) and target.id is not None else target].append(instance)
+    for instance in session.deleted:
+        if isinstance(instance, AnalysisReport) and instance.document_id not in deleted_document_ids:
+            removed_reports[instance.document_id].append(instance)
+
+    touched = [
+        instance for instance in session.dirty
+        if isinstance(instance, Document) and instance.id is not None and instance not in session.deleted
+    ]
+    if not (deltas or added_reports or removed_reports or deleted_documents or touched):
+        return
+    connection = session.connection()
+
+    for document in touched:
+        history = attributes.get_history(document, "status")
+        if history.added:
+            _bump(deltas, document.owner_id, "status", _committed_status(connection, document), -1)
+            _bump(deltas, document.owner_id, "status", document.status, 1)
+
+    for document in deleted_documents:
+        _bump(deltas, document.owner_id, "status", _committed_status(connection, document), -1)
+        _bump(deltas, document.owner_id, "uploaded", document.uploaded_at.date().isoformat(), -1)
+        created = connection.execute(select(AnalysisReport.created_at).where(AnalysisReport.document_id == document.id))
+        for created_at in created.scalars():
+            _bump(deltas, document.owner_id, "analyzed", created_at.date().isoformat(), -1)
+        _bump_analysis(deltas, document.owner_id, _latest_sections(connection, document.id), -1)
+
+    for target in set(added_reports) | set(removed_reports):
+        if target is None or target in deleted_document_ids:
+            continue
+        if isinstance(target, Document):  # pending document: no stored analyses yet
+            owner_id, previous = target.owner_id, None
+        else:
+            owner_id = connection.execute(select(Document.owner_id).where(Document.id == target)).scalar_one_or_none()
+            previous = _latest_sections(connection, target)
+        if owner_id is None or owner_id in deleted_owners:
+            continue
+        added, removed = added_reports.get(target, []), removed_reports.get(target, [])
+        for report in added:
+            _bump(deltas, owner_id, "analyzed", report.created_at.date().isoformat(), 1)
+        for report in removed:
+            _bump(deltas, owner_id, "analyzed", report.created_at.date().isoformat(), -1)
+        if added:
+            current = max(added, key=lambda report: report.created_at).sections
+        else:
+            current = _latest_sections(connection, target, exclude=[report.id for report in removed])
+        _bump_analysis(deltas, owner_id, previous, -1)
+        _bump_analysis(deltas, owner_id, current, 1)
+
+    _apply_counter_deltas(connection, deltas)
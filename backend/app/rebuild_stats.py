@@ -0,0 +1,54 @@
+"""Recompute the dashboard counters behind ``GET /documents/stats`` from documents and analyses.
+
+    python -m app.rebuild_stats                                # every user
+    python -m app.rebuild_stats --owner analyst@example.com --check
+
+The counters are maintained incrementally on every flush; this is the slow path
+that rescans each user's documents and latest analyses. ``--check`` only reports
+drift and exits non-zero if any was found. Each user is rebuilt in its own
+transaction, so run it while analyses for that user are not being written.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .core.database import session_scope
+from .core.migrations import upgrade_database
+from .models import User
+from .services.dashboard_stats import rebuild_counters
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify per-user dashboard counters.")
+    parser.add_argument("--owner", action="append", default=[], help="email of a user to rebuild (repeatable; default: all)")
+    parser.add_argument("--check", action="store_true", help="report drift without rewriting the counters")
+    args = parser.parse_args(argv)
+
+    upgrade_database()
+
+    with session_scope() as db:
+        query = db.query(User.id, User.email)
+        if args.owner:
+            query = query.filter(User.email.in_(args.owner))
+        users = query.order_by(User.id).all()
+    missing = set(args.owner) - {email for _, email in users}
+    for email in sorted(missing):
+        print(f"No user registered with email {email}", file=sys.stderr)
+
+    drifted = 0
+    for user_id, email in users:
+        with session_scope() as db:
+            drift = rebuild_counters(db, user_id, dry_run=args.check)
+        if drift:
+            drifted += 1
+            print(f"{email}: {len(drift)} counters {'drifted' if args.check else 'rebuilt'}")
+            for line in drift:
+                print(f"  {line}")
+    print(f"{len(users)} users checked, {drifted} with drift")
+    return 2 if missing else (1 if args.check and drifted else 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,34 @@
 from __future__ import annotations
 
 import json
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Annotated, Dict, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..core.config import get_settings
-from ..core.database import get_db
-from ..core.dependencies import get_current_user
-from ..models import AnalysisReport, Document, User
-from ..schemas import AnalysisCreateResponse, AnalysisResult, DocumentListResponse, RuleConfig, SectionInsight
-from ..services.pdf_analyzer import analyze_pdf
-from ..services.report_builder import create_export_bundle
-from ..services.storage import save_upload_file
+from ..core.database import get_async_db, get_db
+from ..core.dependencies import get_current_user, get_current_user_async, get_export_user
+from ..core.responses import compressed_json, dumps
+from ..core.security import EXPORT_SCOPE, create_access_token
+from ..models import AnalysisReport, Document, DocumentChange, RuleProfile, User
+from ..schemas import AnalysisCreateResponse, DocumentChangesResponse, DocumentListResponse, DocumentStats, ExportLink, RuleConfig
+from ..services.admission import AdmissionRejected, Ticket, admission_controller, count_pages, estimate_memory_mb
+from ..services.analysis_runner import run_document_analysis, run_preview
+from ..services.bulk_export import ExportFilter, count_analyses, ndjson_stream, zip_stream
+from ..services.dashboard_stats import read_stats
+from ..services.document_payloads import document_fragments, join_fragments, payload_cache
+from ..services.job_queue import enqueue_analysis, follow_job_progress
+from ..services.progress import TERMINAL_EVENTS, ProgressEvent, progress_broker
+from ..services.rule_profiles import compiled_profile, get_accessible_profile_async
+from ..services.storage import delete_export_bundle, delete_file, save_upload_file
 from ..services.emailer import send_email
 
 
@@ -33,85 +46,214 @@ def _parse_rule_config(raw_rule_config: Optional[str]) -> RuleConfig:
     return RuleConfig(**data)
 
 
-def _build_highlights(sections: Dict[str, Dict[str, str]]) -> Dict[str, str]:
-    highlights: Dict[str, str] = {}
-    for key, section in sections.items():
-        summary = section.get("summary", "")
-        highlight = summary.split(".")[0][:240] if summary else "No insight detected."
-        highlights[key] = highlight
-    return highlights
-
-
-@router.post("/analyze", response_model=AnalysisCreateResponse, status_code=status.HTTP_201_CREATED)
+async def _resolve_rules(
+    db: AsyncSession, user: User, profile_id: Optional[int], raw_rule_config: Optional[str]
+) -> Tuple[RuleConfig, Optional[RuleProfile]]:
+    """Rules for an analysis: a saved profile (parsed and compiled once, then cached) or an inline JSON config."""
+    if profile_id is None:
+        return _parse_rule_config(raw_rule_config), None
+    if raw_rule_config:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pass either profile_id or rule_config, not both")
+    profile = await get_accessible_profile_async(db, user, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rule profile not found")
+    return compiled_profile(profile).config, profile
+
+
+async def _admit(user: User, stored_path: Path) -> Optional[Ticket]:
+    """Admission ticket for an in-process analysis; in queue mode the workers bound their own concurrency."""
+    if settings.analysis_executor == "queue":
+        return None
+    memory_mb = estimate_memory_mb(await run_in_threadpool(count_pages, stored_path), stored_path.stat().st_size)
+    try:
+        return admission_controller.submit(user.id, memory_mb)
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analysis capacity is saturated, please retry later",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
+
+async def _preview(
+    user: User,
+    stored_path: Path,
+    ticket: Optional[Ticket],
+    rule_model: RuleConfig,
+    profile: Optional[RuleProfile],
+    page_budget: int,
+) -> Optional[Dict[str, Any]]:
+    """Preview report columns read on an admission slot within ``PREVIEW_TIME_BUDGET_MS``; ``None`` if no slot frees up in time.
+
+    Inline uploads preview on their own ticket, which then carries straight on to
+    the full analysis; in queue mode the preview holds a ticket of its own.
+    """
+    deadline = time.monotonic() + settings.preview_time_budget_ms / 1000
+    preview_ticket = ticket
+    if preview_ticket is None:
+        try:
+            preview_ticket = admission_controller.submit(user.id, estimate_memory_mb(page_budget, stored_path.stat().st_size))
+        except AdmissionRejected:
+            return None
+    try:
+        if not await admission_controller.wait_admitted(preview_ticket, timeout=deadline - time.monotonic()):
+            return None
+        rules = compiled_profile(profile) if profile is not None else None
+        return await run_in_threadpool(run_preview, stored_path, rule_model, page_budget, rules, deadline)
+    finally:
+        if preview_ticket is not ticket:
+            admission_controller.release(preview_ticket)
+
+
+def _schedule_analysis(
+    db: AsyncSession,
+    document: Document,
+    rule_model: RuleConfig,
+    user: User,
+    ticket: Optional[Ticket],
+    background_tasks: BackgroundTasks,
+) -> None:
+    # The parse runs after the response is sent; clients follow it via /documents/{id}/events.
+    # Queue mode only adds the job row here, so the async session commits it with the document.
+    if ticket is None:
+        enqueue_analysis(db, document, rule_model, user.email)
+    else:
+        # A subscriber arriving before the new run publishes must wait for it, not see the last run finish.
+        progress_broker.reset(document.id)
+        background_tasks.add_task(admission_controller.run, ticket, run_document_analysis, document.id, rule_model, user.email)
+
+
+@router.post("/analyze", response_model=AnalysisCreateResponse, status_code=status.HTTP_202_ACCEPTED)
 async def analyze_document(
     *,
     file: UploadFile = File(...),
     rule_config: Optional[str] = None,
-    db: Annotated[Session, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    profile_id: Optional[int] = None,
+    previous_document_id: Optional[int] = None,
+    mode: Literal["full", "preview"] = "full",
+    preview_pages: Optional[int] = Query(default=None, ge=1, le=10),
+    background_tasks: BackgroundTasks,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Annotated[User, Depends(get_current_user_async)],
 ) -> AnalysisCreateResponse:
+    """Store the upload and schedule its analysis.
+
+    With ``mode=preview`` the leading pages (``preview_pages``, default ``PREVIEW_PAGE_BUDGET``)
+    are analyzed inline and returned as a preview report; the full analysis replaces it when done.
+    The preview stops at ``PREVIEW_TIME_BUDGET_MS`` with the pages read so far, and is skipped
+    when analysis capacity is saturated.
+    """
     if file.content_type not in {"application/pdf"}:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only PDF files are supported")
 
+    rule_model, profile = await _resolve_rules(db, current_user, profile_id, rule_config)
+    previous = None
+    if previous_document_id is not None:
+        previous = await db.scalar(
+            select(Document).where(Document.id == previous_document_id, Document.owner_id == current_user.id)
+        )
+        if previous is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Previous document version not found")
     stored_path = await save_upload_file(file)
-    rule_model = _parse_rule_config(rule_config)
-
-    document = Document(
-        owner_id=current_user.id,
-        original_filename=file.filename or stored_path.name,
-        stored_filename=stored_path.name,
-        content_type=file.content_type or "application/pdf",
-        file_size=stored_path.stat().st_size,
-        status="processing",
-        rule_config=rule_model.model_dump(),
-    )
-    db.add(document)
-    db.commit()
-    db.refresh(document)
-
-    summary, section_models = analyze_pdf(stored_path, rule_model)
-    sections_dict = {key: value.model_dump() for key, value in section_models.items()}
-    highlights = _build_highlights(sections_dict)
-
-    export_path = create_export_bundle(
-        document_name=document.original_filename,
-        summary=summary,
-        highlights=highlights,
-        sections=section_models,
-        rule_config=rule_model.model_dump(),
-        owner_email=current_user.email,
-    )
 
-    analysis = AnalysisReport(
-        document_id=document.id,
-        summary=summary,
-        highlights=highlights,
-        sections=sections_dict,
-        rule_config=rule_model.model_dump(),
-        zip_path=str(export_path),
-        export_path=str(export_path),
-    )
-    document.status = "completed"
+    ticket = None
+    try:
+        ticket = await _admit(current_user, stored_path)
+        preview = None
+        if mode == "preview":
+            budget = preview_pages or settings.preview_page_budget
+            preview = await _preview(current_user, stored_path, ticket, rule_model, profile, budget)
+        document = Document(
+            owner_id=current_user.id,
+            original_filename=file.filename or stored_path.name,
+            stored_filename=stored_path.name,
+            content_type=file.content_type or "application/pdf",
+            file_size=stored_path.stat().st_size,
+            status="processing",
+            rule_config=rule_model.model_dump(),
+            parent_document_id=previous.id if previous is not None else None,
+            version=previous.version + 1 if previous is not None else 1,
+            rule_profile_id=profile.id if profile is not None else None,
+            rule_profile_version=profile.version if profile is not None else None,
+        )
+        db.add(document)
+        await db.flush()
+        # Committed together with the document and its job, so the full report is always the newer one.
+        report = AnalysisReport(document_id=document.id, **preview) if preview is not None else None
+        if report is not None:
+            db.add(report)
+        _schedule_analysis(db, document, rule_model, current_user, ticket, background_tasks)
+        await db.commit()
+    except Exception:
+        if ticket is not None:
+            admission_controller.release(ticket)
+        delete_file(stored_path)
+        raise
+    await db.refresh(document)
+
+    if report is not None:
+        return AnalysisCreateResponse(
+            document_id=document.id, analysis_id=report.id, status=document.status, summary_preview=report.summary
+        )
+    return AnalysisCreateResponse(document_id=document.id, status=document.status)
 
-    db.add(analysis)
-    db.commit()
-    db.refresh(analysis)
-
-    summary_preview = summary[:400] + ("..." if len(summary) > 400 else "")
-    return AnalysisCreateResponse(
-        document_id=document.id,
-        analysis_id=analysis.id,
-        status=document.status,
-        summary_preview=summary_preview,
-    )
+
+@router.post("/{document_id}/reanalyze", response_model=AnalysisCreateResponse, status_code=status.HTTP_202_ACCEPTED)
+async def reanalyze_document(
+    *,
+    document_id: int,
+    rule_config: Optional[str] = None,
+    profile_id: Optional[int] = None,
+    background_tasks: BackgroundTasks,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Annotated[User, Depends(get_current_user_async)],
+) -> AnalysisCreateResponse:
+    """Re-run the analysis of an uploaded PDF, by default with the rules it was last analyzed with."""
+    document = await db.scalar(select(Document).where(Document.id == document_id, Document.owner_id == current_user.id))
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    if document.status == "processing":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="An analysis of this document is already running")
+
+    if rule_config or profile_id is not None:
+        rule_model, profile = await _resolve_rules(db, current_user, profile_id, rule_config)
+    else:
+        # Follow edits made to the document's profile since the last run, if it still exists.
+        profile = (
+            await get_accessible_profile_async(db, current_user, document.rule_profile_id)
+            if document.rule_profile_id
+            else None
+        )
+        rule_model = compiled_profile(profile).config if profile is not None else RuleConfig(**(document.rule_config or {}))
+    ticket = await _admit(current_user, settings.upload_dir / document.stored_filename)
+    try:
+        document.status = "processing"
+        document.rule_config = rule_model.model_dump()
+        document.rule_profile_id = profile.id if profile is not None else None
+        document.rule_profile_version = profile.version if profile is not None else None
+        _schedule_analysis(db, document, rule_model, current_user, ticket, background_tasks)
+        await db.commit()
+    except Exception:
+        if ticket is not None:
+            admission_controller.release(ticket)
+        raise
+
+    return AnalysisCreateResponse(document_id=document.id, status=document.status)
+
+
+def _current_cursor(db: Session, owner_id: int) -> int:
+    return db.query(func.max(DocumentChange.id)).filter(DocumentChange.owner_id == owner_id).scalar() or 0
 
 
 @router.get("", response_model=DocumentListResponse)
 def list_documents(
     *,
+    request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
-) -> DocumentListResponse:
+) -> Response:
+    # Read the cursor first: anything written while the list is built is replayed by the next delta.
+    cursor = _current_cursor(db, current_user.id)
     documents = (
         db.query(Document)
         .filter(Document.owner_id == current_user.id)
@@ -119,39 +261,201 @@ def list_documents(
         .all()
     )
 
-    items = []
-    for doc in documents:
-        latest_analysis = (
-            db.query(AnalysisReport)
-            .filter(AnalysisReport.document_id == doc.id)
-            .order_by(AnalysisReport.created_at.desc())
-            .first()
-        )
-        analysis_payload = None
-        if latest_analysis:
-            section_map = {
-                key: SectionInsight(**value) if not isinstance(value, SectionInsight) else value
-                for key, value in latest_analysis.sections.items()
-            }
-            analysis_payload = AnalysisResult(
-                document_id=doc.id,
-                analysis_id=latest_analysis.id,
-                summary=latest_analysis.summary,
-                highlights=latest_analysis.highlights,
-                sections=section_map,
-                created_at=latest_analysis.created_at,
+    fragments = document_fragments(db, documents)
+    body = b'{"items":%s,"total":%d,"cursor":%d}' % (join_fragments(fragments), len(fragments), cursor)
+    return compressed_json(request, body)
+
+
+@router.get("/changes", response_model=DocumentChangesResponse)
+def list_document_changes(
+    *,
+    request: Request,
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> Response:
+    changes = (
+        db.query(DocumentChange.id, DocumentChange.document_id)
+        .filter(DocumentChange.owner_id == current_user.id, DocumentChange.id > since)
+        .order_by(DocumentChange.id)
+        .limit(limit)
+        .all()
+    )
+    if not changes:
+        return compressed_json(request, {"items": [], "deleted": [], "cursor": since, "has_more": False})
+
+    touched_ids = {document_id for _, document_id in changes}
+    documents = (
+        db.query(Document)
+        .filter(Document.owner_id == current_user.id, Document.id.in_(touched_ids))
+        .order_by(Document.uploaded_at.desc())
+        .all()
+    )
+    deleted = sorted(touched_ids - {doc.id for doc in documents})
+
+    body = b'{"items":%s,"deleted":%s,"cursor":%d,"has_more":%s}' % (
+        join_fragments(document_fragments(db, documents)),
+        dumps(deleted),
+        changes[-1].id,
+        b"true" if len(changes) == limit else b"false",
+    )
+    return compressed_json(request, body)
+
+
+@router.get("/stats", response_model=DocumentStats)
+def document_stats(
+    *,
+    days: int = Query(default=14, ge=1, le=90),
+    top_keywords: int = Query(default=10, ge=1, le=100),
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> DocumentStats:
+    return read_stats(db, current_user.id, days=days, top_keywords=top_keywords)
+
+
+def _export_filter(
+    user: User,
+    export_format: str,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    statuses: List[str],
+    latest_only: bool,
+    include_previews: bool,
+) -> ExportFilter:
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must not be after date_to")
+
+    filters = ExportFilter(
+        owner_id=user.id,
+        date_from=date_from,
+        date_to=date_to,
+        statuses=tuple(statuses),
+        latest_only=latest_only,
+        include_previews=include_previews,
+    )
+    if export_format == "zip":
+        matched = count_analyses(filters)
+        if matched > settings.export_zip_max_analyses:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"{matched} analyses match, but a ZIP export holds at most {settings.export_zip_max_analyses}; "
+                    "narrow the date range or export NDJSON"
+                ),
             )
-        items.append(
-            {
-                "id": doc.id,
-                "original_filename": doc.original_filename,
-                "uploaded_at": doc.uploaded_at,
-                "status": doc.status,
-                "latest_analysis": analysis_payload,
-            }
-        )
+    return filters
+
+
+@router.get("/export")
+def export_analyses(
+    *,
+    export_format: Literal["ndjson", "zip"] = Query(default="ndjson", alias="format"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    statuses: List[str] = Query(default=[], alias="status"),
+    latest_only: bool = False,
+    include_previews: bool = False,
+    current_user: Annotated[User, Depends(get_export_user)],
+) -> StreamingResponse:
+    """Stream every matching analysis as NDJSON, or as one ZIP of ``analysis.json`` plus report files per analysis.
+
+    Dates filter on when the analysis was written (both inclusive); ``status`` filters on the
+    document's current status and may be repeated. NDJSON memory use is one database batch,
+    whatever the size; ZIP archives are capped at ``EXPORT_ZIP_MAX_ANALYSES``. Browsers
+    authenticate with the ``token`` of a link from ``POST /documents/export/link`` so the
+    download streams to disk instead of through script memory.
+    """
+    filters = _export_filter(current_user, export_format, date_from, date_to, statuses, latest_only, include_previews)
+    filename = f"gem-analyses-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        zip_stream(filters) if export_format == "zip" else ndjson_stream(filters),
+        media_type="application/zip" if export_format == "zip" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/export/link", response_model=ExportLink)
+def create_export_link(
+    *,
+    export_format: Literal["ndjson", "zip"] = Query(default="ndjson", alias="format"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    statuses: List[str] = Query(default=[], alias="status"),
+    latest_only: bool = False,
+    include_previews: bool = False,
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> ExportLink:
+    """A short-lived token for ``GET /documents/export?token=...``; the filters are checked now so errors surface here."""
+    _export_filter(current_user, export_format, date_from, date_to, statuses, latest_only, include_previews)
+    token = create_access_token(
+        current_user.email,
+        expires_delta=timedelta(seconds=settings.export_link_ttl_seconds),
+        extra_claims={"scope": EXPORT_SCOPE},
+    )
+    return ExportLink(token=token, expires_in=settings.export_link_ttl_seconds)
+
+
+@router.get("/{document_id}/events")
+async def stream_document_events(
+    *,
+    document_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Annotated[User, Depends(get_current_user_async)],
+) -> StreamingResponse:
+    current_status = await db.scalar(
+        select(Document.status).where(Document.id == document_id, Document.owner_id == current_user.id)
+    )
+    if current_status is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    # Hand the pooled connection back before the stream, which can stay open for minutes.
+    await db.close()
+
+    async def event_stream():
+        yield "retry: 3000\n\n"
+        if current_status in TERMINAL_EVENTS:
+            yield ProgressEvent(document_id=document_id, event=current_status, sequence=0, data={"status": current_status}).to_sse()
+            return
+        if settings.analysis_executor == "queue":
+            events = follow_job_progress(document_id, keepalive_seconds=settings.progress_keepalive_seconds)
+        else:
+            events = progress_broker.subscribe(document_id, keepalive_seconds=settings.progress_keepalive_seconds)
+        async for event in events:
+            yield ": keepalive\n\n" if event is None else event.to_sse()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_document(
+    *,
+    document_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> Response:
+    document = (
+        db.query(Document)
+        .filter(Document.id == document_id, Document.owner_id == current_user.id)
+        .first()
+    )
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    if document.status == "processing":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="An analysis of this document is still running")
+
+    export_paths = {analysis.export_path for analysis in document.analyses if analysis.export_path}
+    db.delete(document)
+    db.commit()
+    payload_cache.evict(document_id)
 
-    return DocumentListResponse(items=items, total=len(items))
+    delete_file(settings.upload_dir / document.stored_filename)
+    for export_path in export_paths:
+        delete_export_bundle(Path(export_path))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/{document_id}/download")
@@ -171,7 +475,7 @@ def download_latest_bundle(
 
     analysis = (
         db.query(AnalysisReport)
-        .filter(AnalysisReport.document_id == document.id)
+        .filter(AnalysisReport.document_id == document.id, AnalysisReport.preview_pages.is_(None))
         .order_by(AnalysisReport.created_at.desc())
         .first()
     )
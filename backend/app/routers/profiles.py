@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from ..core.database import get_db
+from ..core.dependencies import get_current_user
+from ..models import RuleProfile, User
+from ..schemas import RuleProfileCreate, RuleProfileRead, RuleProfileUpdate
+from ..services.rule_matchers import matcher_cache
+from ..services.rule_profiles import get_accessible_profile, list_profiles
+
+
+router = APIRouter(prefix="/rule-profiles", tags=["rule profiles"])
+
+
+def _owned_profile(db: Session, user: User, profile_id: int) -> RuleProfile:
+    profile = db.query(RuleProfile).filter(RuleProfile.id == profile_id, RuleProfile.owner_id == user.id).first()
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rule profile not found")
+    return profile
+
+
+def _ensure_unique_name(db: Session, user: User, name: str, exclude_id: int = 0) -> None:
+    existing = (
+        db.query(RuleProfile.id)
+        .filter(RuleProfile.owner_id == user.id, RuleProfile.name == name, RuleProfile.id != exclude_id)
+        .first()
+    )
+    if existing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A rule profile with this name already exists")
+
+
+def _sharing_organization(user: User, shared: bool) -> Optional[str]:
+    if shared and not user.organization:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Set an organization on your account to share profiles")
+    return user.organization if shared else None
+
+
+@router.get("", response_model=List[RuleProfileRead])
+def list_rule_profiles(
+    *,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> List[RuleProfileRead]:
+    return [RuleProfileRead.model_validate(profile) for profile in list_profiles(db, current_user)]
+
+
+@router.post("", response_model=RuleProfileRead, status_code=status.HTTP_201_CREATED)
+def create_rule_profile(
+    *,
+    payload: RuleProfileCreate,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> RuleProfileRead:
+    _ensure_unique_name(db, current_user, payload.name)
+    profile = RuleProfile(
+        owner_id=current_user.id,
+        organization=_sharing_organization(current_user, payload.shared),
+        name=payload.name,
+        rule_config=payload.rule_config.model_dump(),
+    )
+    db.add(profile)
+    db.commit()
+    db.refresh(profile)
+    return RuleProfileRead.model_validate(profile)
+
+
+@router.get("/{profile_id}", response_model=RuleProfileRead)
+def get_rule_profile(
+    *,
+    profile_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> RuleProfileRead:
+    profile = get_accessible_profile(db, current_user, profile_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rule profile not found")
+    return RuleProfileRead.model_validate(profile)
+
+
+@router.put("/{profile_id}", response_model=RuleProfileRead)
+def update_rule_profile(
+    *,
+    profile_id: int,
+    payload: RuleProfileUpdate,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> RuleProfileRead:
+    profile = _owned_profile(db, current_user, profile_id)
+    if payload.name is not None:
+        _ensure_unique_name(db, current_user, payload.name, exclude_id=profile.id)
+        profile.name = payload.name
+    if payload.shared is not None:
+        profile.organization = _sharing_organization(current_user, payload.shared)
+    if payload.rule_config is not None:
+        profile.rule_config = payload.rule_config.model_dump()
+        profile.version += 1
+    db.commit()
+    db.refresh(profile)
+    matcher_cache.invalidate(profile.id)
+    return RuleProfileRead.model_validate(profile)
+
+
+@router.delete("/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_rule_profile(
+    *,
+    profile_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> Response:
+    profile = _owned_profile(db, current_user, profile_id)
+    db.delete(profile)
+    db.commit()
+    matcher_cache.invalidate(profile_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import date, datetime
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class Token(BaseModel):
@@ -14,6 +14,12 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: str
     exp: int
+    scope: Optional[str] = None
+
+
+class ExportLink(BaseModel):
+    token: str
+    expires_in: int
 
 
 class UserBase(BaseModel):
@@ -39,10 +45,16 @@ class LoginRequest(BaseModel):
     password: str
 
 
+SummarizerEngineName = Literal["frequency", "textrank", "lexrank", "lsa"]
+
+
 class RuleSectionConfig(BaseModel):
     enabled: bool = True
     keywords: List[str] = Field(default_factory=list)
     min_confidence: float = Field(default=0.2, ge=0, le=1)
+    # None falls back to SUMMARIZER_ENGINE / SUMMARIZER_BUDGET_MS.
+    summarizer: Optional[SummarizerEngineName] = None
+    summarizer_budget_ms: Optional[float] = Field(default=None, gt=0)
 
 
 class RuleConfig(BaseModel):
@@ -54,6 +66,31 @@ class RuleConfig(BaseModel):
     important_dates: RuleSectionConfig = RuleSectionConfig(keywords=["bid end", "submission", "opening"])
 
 
+class RuleProfileCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=255)
+    rule_config: RuleConfig = Field(default_factory=RuleConfig)
+    # Share with every user of the creator's organization.
+    shared: bool = False
+
+
+class RuleProfileUpdate(BaseModel):
+    name: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    rule_config: Optional[RuleConfig] = None
+    shared: Optional[bool] = None
+
+
+class RuleProfileRead(BaseModel):
+    id: int
+    name: str
+    owner_id: int
+    organization: Optional[str] = None
+    rule_config: RuleConfig
+    version: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class AnalysisMetadata(BaseModel):
     status: str
     uploaded_at: datetime
@@ -67,12 +104,45 @@ class SectionInsight(BaseModel):
     keywords_found: List[str]
 
 
+class BOQRow(BaseModel):
+    page: int
+    item_no: Optional[str] = None
+    description: str = ""
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    rate: Optional[float] = None
+    amount: Optional[float] = None
+
+
+class SectionDiff(BaseModel):
+    title: str
+    status: str  # "added", "removed" or "changed"
+    added_sentences: List[str] = Field(default_factory=list)
+    removed_sentences: List[str] = Field(default_factory=list)
+    added_keywords: List[str] = Field(default_factory=list)
+    removed_keywords: List[str] = Field(default_factory=list)
+    previous_summary: Optional[str] = None
+    summary: Optional[str] = None
+
+
+class VersionDiff(BaseModel):
+    previous_document_id: int
+    previous_analysis_id: Optional[int] = None
+    changed_pages: List[int] = Field(default_factory=list)
+    removed_pages: List[int] = Field(default_factory=list)
+    reused_pages: int = 0
+    sections: Dict[str, SectionDiff] = Field(default_factory=dict)
+
+
 class AnalysisResult(BaseModel):
     document_id: int
     analysis_id: int
     summary: str
     highlights: Dict[str, str]
     sections: Dict[str, SectionInsight]
+    boq_rows: List[BOQRow] = Field(default_factory=list)
+    version_diff: Optional[VersionDiff] = None
+    preview_pages: Optional[int] = None
     created_at: datetime
 
 
@@ -81,12 +151,47 @@ class DocumentRead(BaseModel):
     original_filename: str
     uploaded_at: datetime
     status: str
+    version: int = 1
+    parent_document_id: Optional[int] = None
+    rule_profile_id: Optional[int] = None
     latest_analysis: Optional[AnalysisResult]
 
 
 class DocumentListResponse(BaseModel):
     items: List[DocumentRead]
     total: int
+    cursor: int = 0
+
+
+class DocumentChangesResponse(BaseModel):
+    items: List[DocumentRead]
+    deleted: List[int]
+    cursor: int
+    has_more: bool = False
+
+
+class SectionStats(BaseModel):
+    documents: int
+    average_importance: float
+
+
+class KeywordStats(BaseModel):
+    keyword: str
+    documents: int
+
+
+class ActivityDay(BaseModel):
+    day: date
+    uploaded: int = 0
+    analyzed: int = 0
+
+
+class DocumentStats(BaseModel):
+    total_documents: int
+    status_counts: Dict[str, int]
+    sections: Dict[str, SectionStats]
+    top_keywords: List[KeywordStats]
+    recent_activity: List[ActivityDay]
 
 
 class EmailDispatchRequest(BaseModel):
@@ -97,9 +202,9 @@ class EmailDispatchRequest(BaseModel):
 
 class AnalysisCreateResponse(BaseModel):
     document_id: int
-    analysis_id: int
+    analysis_id: Optional[int] = None
     status: str
-    summary_preview: str
+    summary_preview: str = ""
 
 
 class ExportResponse(BaseModel):
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import fitz
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import get_settings
+
+
+LOGGER = logging.getLogger(__name__)
+settings = get_settings()
+
+
+# Rough pdfplumber footprint: interpreter baseline, per-page layout objects, and the raw file held by pdfminer.
+BASE_MEMORY_MB = 48.0
+MEMORY_PER_PAGE_MB = 1.2
+FILE_SIZE_MULTIPLIER = 3.0
+# A spawned BOQ table-pool process: ~36 MB idle after importing pdfplumber, plus heap it keeps from parsed pages.
+TABLE_WORKER_MEMORY_MB = 64.0
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class Ticket:
+    id: int
+    user_id: int
+    memory_mb: float
+    admitted: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # Event loop and event of the coroutine awaiting admission, woken by whichever thread dispatches the ticket.
+    waiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(default=None, repr=False, compare=False)
+
+
+def count_pages(pdf_path: Path) -> int:
+    """Page count from the xref via PyMuPDF, far cheaper than letting pdfminer walk the page tree."""
+    try:
+        with fitz.open(str(pdf_path)) as document:
+            return document.page_count
+    except Exception:  # pragma: no cover - malformed files are rejected later by the parser itself
+        LOGGER.warning("Could not count pages of %s", pdf_path)
+        return 0
+
+
+def estimate_memory_mb(page_count: int, file_size: int) -> float:
+    return BASE_MEMORY_MB + page_count * MEMORY_PER_PAGE_MB + FILE_SIZE_MULTIPLIER * file_size / (1024 * 1024)
+
+
+def table_pool_memory_mb(workers: int) -> float:
+    """Footprint of the process-wide BOQ table pool, which only exists when tables are extracted out of process."""
+    return workers * TABLE_WORKER_MEMORY_MB if workers > 1 else 0.0
+
+
+class AdmissionController:
+    """Bounds concurrent in-process analyses by slot count and an estimated memory budget.
+
+    Waiting tickets are queued per user and dispatched round-robin across users, so
+    one account uploading a batch cannot starve everyone else. When the queue is
+    full (or a user already has too many outstanding analyses) ``submit`` raises
+    ``AdmissionRejected`` with a Retry-After hint derived from recent run times.
+    """
+
+    def __init__(
+        self, max_concurrent: int, memory_budget_mb: float, max_queue_depth: int, max_per_user: int, reserved_memory_mb: float = 0.0
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        # Memory held outside any one analysis (the shared BOQ table pool) comes off the top of the budget.
+        self.reserved_memory_mb = reserved_memory_mb
+        self.memory_budget_mb = max(BASE_MEMORY_MB, memory_budget_mb - reserved_memory_mb)
+        self.max_queue_depth = max_queue_depth
+        self.max_per_user = max_per_user
+        self._condition = threading.Condition()
+        self._ids = itertools.count(1)
+        self._waiting: "OrderedDict[int, Deque[Ticket]]" = OrderedDict()
+        self._queued = 0
+        self._active: Dict[int, Ticket] = {}
+        self._outstanding: Counter[int] = Counter()
+        self._memory_in_use = 0.0
+        self._average_run_seconds = 30.0
+        self.rejections: Counter[str] = Counter()
+        self.admitted_total = 0
+
+    def _retry_after(self) -> int:
+        waves = (self._queued + len(self._active)) / self.max_concurrent
+        return max(1, math.ceil(self._average_run_seconds * max(1.0, waves)))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejections[reason] += 1
+        return AdmissionRejected(reason, self._retry_after())
+
+    def submit(self, user_id: int, memory_mb: float) -> Ticket:
+        with self._condition:
+            if self._outstanding[user_id] >= self.max_per_user:
+                raise self._reject("user_limit")
+            if self._queued >= self.max_queue_depth:
+                raise self._reject("queue_full")
+            # A single document larger than the whole budget still runs, just alone.
+            ticket = Ticket(id=next(self._ids), user_id=user_id, memory_mb=min(memory_mb, self.memory_budget_mb))
+            self._waiting.setdefault(user_id, deque()).append(ticket)
+            self._queued += 1
+            self._outstanding[user_id] += 1
+            self._dispatch()
+            return ticket
+
+    def _dispatch(self) -> None:
+        while self._waiting and len(self._active) < self.max_concurrent:
+            user_id, queue = next(iter(self._waiting.items()))
+            ticket = queue[0]
+            if self._active and self._memory_in_use + ticket.memory_mb > self.memory_budget_mb:
+                break  # wait for memory instead of letting smaller uploads overtake it forever
+            queue.popleft()
+            del self._waiting[user_id]
+            if queue:
+                self._waiting[user_id] = queue  # back of the rotation
+            self._queued -= 1
+            self._active[ticket.id] = ticket
+            self._memory_in_use += ticket.memory_mb
+            ticket.admitted = True
+            self.admitted_total += 1
+            if ticket.waiter is not None:
+                loop, event = ticket.waiter
+                loop.call_soon_threadsafe(event.set)
+        self._condition.notify_all()
+
+    async def wait_admitted(self, ticket: Ticket, timeout: Optional[float] = None) -> bool:
+        """Wait on the event loop, not a thread, until ``ticket`` holds a slot; ``False`` if ``timeout`` ran out first."""
+        with self._condition:
+            if ticket.admitted:
+                return True
+            event = asyncio.Event()
+            ticket.waiter = (asyncio.get_running_loop(), event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return ticket.admitted
+
+    def release(self, ticket: Ticket, run_seconds: Optional[float] = None) -> None:
+        with self._condition:
+            if self._active.pop(ticket.id, None) is not None:
+                self._memory_in_use = max(0.0, self._memory_in_use - ticket.memory_mb)
+            else:
+                queue = self._waiting.get(ticket.user_id)
+                if queue is not None and ticket in queue:
+                    queue.remove(ticket)
+                    self._queued -= 1
+                    if not queue:
+                        del self._waiting[ticket.user_id]
+            self._outstanding[ticket.user_id] -= 1
+            if self._outstanding[ticket.user_id] <= 0:
+                del self._outstanding[ticket.user_id]
+            if run_seconds is not None:
+                self._average_run_seconds = 0.8 * self._average_run_seconds + 0.2 * run_seconds
+            self._dispatch()
+
+    async def run(self, ticket: Ticket, func: Callable[..., Any], *args: Any) -> Any:
+        """Wait for ``ticket``, run ``func`` in the threadpool and free the slot; used as a background task.
+
+        Queued tickets only hold an event, so a full queue cannot tie up the
+        threadpool threads that sync routes need; only admitted analyses run there.
+        """
+        started: Optional[float] = None
+        try:
+            await self.wait_admitted(ticket)
+            started = time.monotonic()
+            return await run_in_threadpool(func, *args)
+        finally:
+            self.release(ticket, run_seconds=None if started is None else time.monotonic() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "active": len(self._active),
+                "queue_depth": self._queued,
+                "max_concurrent": self.max_concurrent,
+                "max_queue_depth": self.max_queue_depth,
+                "memory_in_use_mb": round(self._memory_in_use, 1),
+                "memory_budget_mb": self.memory_budget_mb,
+                "reserved_memory_mb": self.reserved_memory_mb,
+                "admitted_total": self.admitted_total,
+                "rejections": dict(self.rejections),
+            }
+
+
+admission_controller = AdmissionController(
+    max_concurrent=settings.analysis_max_concurrent,
+    memory_budget_mb=settings.analysis_memory_budget_mb,
+    max_queue_depth=settings.analysis_max_queue_depth,
+    max_per_user=settings.analysis_max_per_user,
+    reserved_memory_mb=table_pool_memory_mb(settings.boq_table_workers),
+)
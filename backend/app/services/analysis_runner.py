@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.database import session_scope
+from ..models import AnalysisReport, Document
+from ..schemas import RuleConfig
+from .pdf_analyzer import analyze_pdf, preview_pdf
+from .progress import BUNDLE_WRITTEN, COMPLETED, FAILED, ProgressCallback, progress_broker
+from .report_builder import create_export_bundle
+from .rule_matchers import CompiledRules, matcher_cache
+from .versioning import load_baseline, page_hashes, replace_document_pages
+
+
+LOGGER = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class DocumentDeleted(Exception):
+    """The document was deleted while it was being analyzed; nothing may be written for it."""
+
+
+def build_highlights(sections: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+    highlights: Dict[str, str] = {}
+    for key, section in sections.items():
+        summary = section.get("summary", "")
+        highlight = summary.split(".")[0][:240] if summary else "No insight detected."
+        highlights[key] = highlight
+    return highlights
+
+
+def run_preview(
+    stored_path: Path,
+    rule_model: RuleConfig,
+    page_budget: int,
+    rules: Optional[CompiledRules] = None,
+    deadline: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """Column values for a preview ``AnalysisReport`` of the leading pages; ``None`` if they cannot be read.
+
+    A failed preview is not an error for the upload: the full analysis still runs
+    and reports its own failure.
+    """
+    started = time.perf_counter()
+    try:
+        result = preview_pdf(stored_path, rule_model, page_budget, rules=rules, deadline=deadline)
+    except Exception:
+        LOGGER.warning("Preview of %s failed; only the full analysis will run", stored_path.name, exc_info=True)
+        return None
+    sections = {key: value.model_dump() for key, value in result.sections.items()}
+    LOGGER.info("Previewed %s pages of %s in %.2fs", result.page_count, stored_path.name, time.perf_counter() - started)
+    return {
+        "summary": result.summary,
+        "highlights": build_highlights(sections),
+        "sections": sections,
+        "boq_rows": [],
+        "rule_config": rule_model.model_dump(),
+        "preview_pages": result.page_count,
+    }
+
+
+def mark_document_failed(document_id: int, progress: ProgressCallback) -> None:
+    with session_scope() as db:
+        document = db.get(Document, document_id)
+        if document is not None:
+            document.status = "failed"
+    progress(FAILED, {"status": "failed", "detail": "Analysis failed"})
+
+
+def execute_document_analysis(
+    document_id: int,
+    rule_model: RuleConfig,
+    owner_email: str,
+    progress: ProgressCallback,
+    job_id: Optional[int] = None,
+    lease_check: Optional[Callable[[Session], None]] = None,
+) -> Optional[int]:
+    """Analyze a stored upload and persist the report; raises on failure so callers can retry.
+
+    Database sessions are only held while reading the document and writing the
+    result, never for the duration of the PDF parse. A new version of an earlier
+    document only re-extracts the pages whose text hash changed and records a
+    diff of section insights against the previous version.
+
+    Queue workers pass their ``job_id`` and a ``lease_check`` that runs inside the
+    report transaction and raises if the lease was lost; the report is then never
+    written. A job whose report already landed (a crash before the job was marked
+    complete) returns that report instead of analyzing again. A document deleted
+    while it was being parsed gets no report and ``None`` is returned.
+    """
+    with session_scope() as db:
+        document = db.get(Document, document_id)
+        if document is None:
+            LOGGER.warning("Document %s disappeared before analysis started", document_id)
+            return None
+        if job_id is not None:
+            existing_id = db.query(AnalysisReport.id).filter(AnalysisReport.job_id == job_id).scalar()
+            if existing_id is not None:
+                LOGGER.info("Job %s already produced analysis %s for document %s", job_id, existing_id, document_id)
+                progress(COMPLETED, {"status": "completed", "analysis_id": existing_id})
+                return existing_id
+        stored_path = settings.upload_dir / document.stored_filename
+        document_name = document.original_filename
+        parent_id = document.parent_document_id
+        baseline = load_baseline(db, parent_id) if parent_id is not None else None
+        profile_key = (document.rule_profile_id, document.rule_profile_version)
+
+    # Profile-based requests share one compiled matcher per (profile, version) in this process.
+    rules = matcher_cache.get(profile_key, rule_model.model_dump()) if None not in profile_key else None
+    hashes = page_hashes(stored_path)
+    known_pages = baseline.known_pages(hashes) if baseline is not None else None
+    result = analyze_pdf(stored_path, rule_model, progress=progress, known_pages=known_pages, rules=rules)
+    summary, section_models = result.summary, result.sections
+    sections_dict = {key: value.model_dump() for key, value in section_models.items()}
+    highlights = build_highlights(sections_dict)
+    boq_rows, version_diff = result.boq_rows, None
+    if baseline is not None:
+        boq_rows = baseline.merge_boq_rows(hashes, result.boq_rows)
+        version_diff = baseline.diff(hashes, result, rule_model)
+        LOGGER.info(
+            "Document %s: %s of %s pages changed since document %s",
+            document_id, len(version_diff.changed_pages), len(hashes), parent_id,
+        )
+
+    export_path = create_export_bundle(
+        document_name=document_name,
+        summary=summary,
+        highlights=highlights,
+        sections=section_models,
+        rule_config=rule_model.model_dump(),
+        owner_email=owner_email,
+        boq_rows=boq_rows,
+        version_diff=version_diff,
+    )
+    progress(BUNDLE_WRITTEN, {"bundle": export_path.name})
+
+    try:
+        with session_scope() as db:
+            if lease_check is not None:
+                lease_check(db)
+            document = db.get(Document, document_id)
+            if document is None:
+                raise DocumentDeleted(f"Document {document_id} was deleted during analysis")
+            analysis = AnalysisReport(
+                document_id=document_id,
+                job_id=job_id,
+                summary=summary,
+                highlights=highlights,
+                sections=sections_dict,
+                boq_rows=[row.model_dump() for row in boq_rows],
+                rule_config=rule_model.model_dump(),
+                zip_path=str(export_path),
+                export_path=str(export_path),
+                version_diff=version_diff.model_dump() if version_diff is not None else None,
+            )
+            db.add(analysis)
+            for preview in db.query(AnalysisReport).filter(
+                AnalysisReport.document_id == document_id, AnalysisReport.preview_pages.is_not(None)
+            ):
+                db.delete(preview)
+            replace_document_pages(db, document_id, hashes, result.pages)
+            document.status = "completed"
+            db.flush()
+            analysis_id = analysis.id
+    except Exception as exc:
+        # Nothing references the bundle once the report transaction rolled back.
+        shutil.rmtree(export_path.parent, ignore_errors=True)
+        if isinstance(exc, DocumentDeleted):
+            LOGGER.warning("Document %s was deleted during analysis; its result was discarded", document_id)
+            return None
+        raise
+
+    progress(COMPLETED, {"status": "completed", "analysis_id": analysis_id})
+    return analysis_id
+
+
+def run_document_analysis(document_id: int, rule_model: RuleConfig, owner_email: str) -> Optional[int]:
+    """In-process entry point used by the API's background tasks; failures are final."""
+    progress = progress_broker.callback_for(document_id)
+    try:
+        return execute_document_analysis(document_id, rule_model, owner_email, progress)
+    except Exception:
+        LOGGER.exception("Analysis failed for document %s", document_id)
+        mark_document_failed(document_id, progress)
+        return None
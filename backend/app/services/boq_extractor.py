@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import atexit
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pdfplumber
+
+from ..schemas import BOQRow
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+BOQ_TERMS = (
+    "bill of quantit",
+    "boq",
+    "qty",
+    "quantity",
+    "unit",
+    "rate",
+    "amount",
+    "item",
+    "price",
+    "uom",
+)
+
+HEADER_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "item_no": ("s.no", "s. no", "s no", "sl", "sr", "item no", "item code", "#"),
+    "description": ("description", "particular", "item", "specification", "name"),
+    "quantity": ("qty", "quantity"),
+    # Checked before "unit" so that "Unit Price" / "Rate per unit" land on the rate column.
+    "rate": ("rate", "price"),
+    "unit": ("unit", "uom"),
+    "amount": ("amount", "total", "value"),
+}
+
+CSV_COLUMNS = ("page", "item_no", "description", "quantity", "unit", "rate", "amount")
+
+_NUMERIC_TOKEN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def page_rule_counts(page: Any) -> Tuple[int, int]:
+    """Count horizontal and vertical ruling edges; reuses objects already parsed by ``extract_text``."""
+    horizontal = vertical = 0
+    for edge in page.edges:
+        if edge.get("orientation") == "h":
+            horizontal += 1
+        else:
+            vertical += 1
+    return horizontal, vertical
+
+
+def is_boq_candidate(text: str, horizontal_edges: int, vertical_edges: int) -> bool:
+    """Cheap prefilter: BOQ vocabulary plus either a ruled grid or a numbers-heavy page."""
+    if not text:
+        return False
+    lowered = text.lower()
+    distinct_terms = sum(1 for term in BOQ_TERMS if term in lowered)
+    if distinct_terms < 3:
+        return False
+
+    has_grid = horizontal_edges >= 4 and vertical_edges >= 3
+    tokens = lowered.split()
+    numeric_ratio = sum(1 for token in tokens if _NUMERIC_TOKEN.fullmatch(token)) / max(1, len(tokens))
+    return has_grid or numeric_ratio >= 0.2
+
+
+def _clean_cell(cell: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", cell or "").strip()
+
+
+def _parse_number(value: str) -> Optional[float]:
+    match = _NUMERIC_TOKEN.search(value)
+    if not match:
+        return None
+    try:
+        return float(match.group(0).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _header_mapping(row: Sequence[str]) -> Optional[Dict[str, int]]:
+    mapping: Dict[str, int] = {}
+    for index, cell in enumerate(row):
+        lowered = cell.lower()
+        if not lowered:
+            continue
+        for field_name, aliases in HEADER_ALIASES.items():
+            if field_name not in mapping and any(alias in lowered for alias in aliases):
+                mapping[field_name] = index
+                break
+    has_numbers = "quantity" in mapping or "rate" in mapping or "amount" in mapping
+    if len(mapping) >= 2 and has_numbers:
+        return mapping
+    return None
+
+
+def table_to_rows(
+    page_number: int,
+    table: Sequence[Sequence[Optional[str]]],
+    inherited: Optional[Dict[str, int]] = None,
+) -> Tuple[List[BOQRow], Optional[Dict[str, int]]]:
+    """Normalize one extracted table; continuation tables reuse the previous page's header."""
+    cleaned = [[_clean_cell(cell) for cell in row] for row in table if any(row)]
+    mapping: Optional[Dict[str, int]] = None
+    body_start = 0
+    for index, row in enumerate(cleaned[:3]):
+        mapping = _header_mapping(row)
+        if mapping:
+            body_start = index + 1
+            break
+    if mapping is None:
+        if not inherited or not cleaned or max(inherited.values()) >= len(cleaned[0]):
+            return [], inherited
+        mapping = inherited
+
+    def cell(row: Sequence[str], field_name: str) -> str:
+        index = mapping.get(field_name) if mapping else None
+        return row[index] if index is not None and index < len(row) else ""
+
+    rows: List[BOQRow] = []
+    for row in cleaned[body_start:]:
+        if _header_mapping(row):
+            continue
+        description = cell(row, "description")
+        quantity = _parse_number(cell(row, "quantity"))
+        rate = _parse_number(cell(row, "rate"))
+        amount = _parse_number(cell(row, "amount"))
+        if not description and quantity is None and rate is None and amount is None:
+            continue
+        rows.append(
+            BOQRow(
+                page=page_number,
+                item_no=cell(row, "item_no") or None,
+                description=description,
+                quantity=quantity,
+                unit=cell(row, "unit") or None,
+                rate=rate,
+                amount=amount,
+            )
+        )
+    return rows, mapping
+
+
+def _extract_page_tables(pdf_path: str, page_numbers: Sequence[int]) -> List[Tuple[int, List[List[List[Optional[str]]]]]]:
+    results: List[Tuple[int, List[List[List[Optional[str]]]]]] = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number in page_numbers:
+            page = pdf.pages[page_number - 1]
+            results.append((page_number, page.extract_tables()))
+            page.close()
+    return results
+
+
+class _TablePool:
+    """One lazily started process pool per process, shared by every analysis running in it.
+
+    Spawning interpreters that import pdfplumber takes seconds, so the pool outlives
+    single calls. A pool inherited across ``fork`` (the ``app.worker`` children) or
+    broken by a crashed worker is replaced on next use.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._owner_pid = 0
+        self._workers = 0
+
+    def get(self, workers: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._owner_pid != os.getpid() or self._workers != workers:
+                if self._pool is not None and self._owner_pid == os.getpid():
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                self._owner_pid = os.getpid()
+                self._workers = workers
+            return self._pool
+
+    def discard(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._owner_pid == os.getpid():
+            pool.shutdown(wait=True)
+
+
+table_pool = _TablePool()
+atexit.register(table_pool.shutdown)
+
+
+def extract_boq_rows(pdf_path: Path, candidate_pages: Sequence[int], workers: int = 1, parallel_min_pages: int = 4) -> List[BOQRow]:
+    """Run table extraction on the prefiltered pages only, fanning out to the shared table pool for larger sets."""
+    if not candidate_pages:
+        return []
+
+    pages = sorted(candidate_pages)
+    if workers <= 1 or len(pages) < parallel_min_pages:
+        page_tables = _extract_page_tables(str(pdf_path), pages)
+    else:
+        worker_count = min(workers, len(pages))
+        chunks = [pages[index::worker_count] for index in range(worker_count)]
+        # pdfminer state is not shareable and the GIL serializes its parsing, so each worker reopens the file.
+        pool = table_pool.get(workers)
+        try:
+            page_tables = [item for chunk in pool.map(_extract_page_tables, [str(pdf_path)] * worker_count, chunks) for item in chunk]
+        except BrokenProcessPool:
+            LOGGER.warning("BOQ table pool broke while reading %s; extracting inline", pdf_path)
+            table_pool.discard(pool)
+            page_tables = _extract_page_tables(str(pdf_path), pages)
+        page_tables.sort(key=lambda item: item[0])
+
+    rows: List[BOQRow] = []
+    header: Optional[Dict[str, int]] = None
+    for page_number, tables in page_tables:
+        for table in tables:
+            table_rows, header = table_to_rows(page_number, table, header)
+            rows.extend(table_rows)
+
+    LOGGER.info("Extracted %d BOQ rows from %d candidate pages of %s", len(rows), len(pages), pdf_path)
+    return rows
+
+
+def boq_rows_to_csv(rows: Sequence[BOQRow]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row.model_dump(include=set(CSV_COLUMNS)))
+    return buffer.getvalue()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zipfile import ZIP_DEFLATED, BadZipFile, ZipFile
+
+import orjson
+from sqlalchemy import Select, func, select
+
+from ..core.config import get_settings
+from ..core.database import session_scope
+from ..core.responses import dumps
+from ..models import AnalysisReport, Document
+
+
+LOGGER = logging.getLogger(__name__)
+settings = get_settings()
+
+# Responses are flushed to the client in chunks of roughly this size.
+CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    owner_id: int
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None  # inclusive
+    statuses: Tuple[str, ...] = ()
+    latest_only: bool = False
+    include_previews: bool = False
+
+
+def _filtered(query: Select, filters: ExportFilter) -> Select:
+    query = query.join(Document, Document.id == AnalysisReport.document_id).where(Document.owner_id == filters.owner_id)
+    if filters.date_from is not None:
+        query = query.where(AnalysisReport.created_at >= datetime.combine(filters.date_from, datetime.min.time()))
+    if filters.date_to is not None:
+        query = query.where(AnalysisReport.created_at < datetime.combine(filters.date_to + timedelta(days=1), datetime.min.time()))
+    if filters.statuses:
+        query = query.where(Document.status.in_(filters.statuses))
+    if not filters.include_previews:
+        query = query.where(AnalysisReport.preview_pages.is_(None))
+    if filters.latest_only:
+        latest = select(func.max(AnalysisReport.id)).where(AnalysisReport.document_id == Document.id)
+        if not filters.include_previews:
+            latest = latest.where(AnalysisReport.preview_pages.is_(None))
+        query = query.where(AnalysisReport.id == latest.correlate(Document).scalar_subquery())
+    return query
+
+
+def _query(filters: ExportFilter, after_id: int, limit: int) -> Select:
+    query = select(
+        AnalysisReport.id,
+        AnalysisReport.document_id,
+        AnalysisReport.created_at,
+        AnalysisReport.summary,
+        AnalysisReport.highlights,
+        AnalysisReport.sections,
+        AnalysisReport.boq_rows,
+        AnalysisReport.rule_config,
+        AnalysisReport.version_diff,
+        AnalysisReport.preview_pages,
+        AnalysisReport.emailed_to,
+        AnalysisReport.export_path,
+        Document.original_filename,
+        Document.status,
+        Document.version,
+        Document.parent_document_id,
+        Document.uploaded_at,
+    )
+    return _filtered(query, filters).where(AnalysisReport.id > after_id).order_by(AnalysisReport.id).limit(limit)
+
+
+def count_analyses(filters: ExportFilter) -> int:
+    with session_scope() as db:
+        return db.scalar(_filtered(select(func.count(AnalysisReport.id)), filters)) or 0
+
+
+def iter_analyses(filters: ExportFilter, batch_size: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+    """``(record, bundle path)`` for every matching analysis in id order.
+
+    Rows are read in keyset batches, each in its own short transaction, so an
+    export of any size holds one batch in memory and never pins a read lock that
+    would stall concurrent analysis writes on SQLite.
+    """
+    batch_size = batch_size or settings.export_batch_size
+    after_id = 0
+    while True:
+        with session_scope() as db:
+            rows = db.execute(_query(filters, after_id, batch_size)).all()
+        for row in rows:
+            record = {
+                "analysis_id": row.id,
+                "document_id": row.document_id,
+                "created_at": row.created_at,
+                "document": {
+                    "filename": row.original_filename,
+                    "status": row.status,
+                    "version": row.version,
+                    "parent_document_id": row.parent_document_id,
+                    "uploaded_at": row.uploaded_at,
+                },
+                "summary": row.summary,
+                "highlights": row.highlights or {},
+                "sections": row.sections or {},
+                "boq_rows": row.boq_rows or [],
+                "rule_config": row.rule_config or {},
+                "version_diff": row.version_diff,
+                "preview_pages": row.preview_pages,
+                "emailed_to": row.emailed_to or [],
+            }
+            yield record, row.export_path
+        if len(rows) < batch_size:
+            return
+        after_id = rows[-1].id
+
+
+def ndjson_stream(filters: ExportFilter) -> Iterator[bytes]:
+    buffer: List[bytes] = []
+    size = 0
+    for record, _ in iter_analyses(filters):
+        line = dumps(record) + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+class _StreamSink:
+    """Write-only target for ``ZipFile``: with no ``tell``/``seek`` it streams entries using data descriptors."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _entry_folder(record: Dict[str, Any]) -> str:
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", Path(record["document"]["filename"]).stem).strip("_")[:80] or "document"
+    return f"{record['created_at']:%Y-%m}/{record['document_id']}-{stem}/analysis-{record['analysis_id']}"
+
+
+def _copy_bundle(archive: ZipFile, sink: _StreamSink, bundle_path: Path, folder: str) -> Iterator[bytes]:
+    """Re-stream the members of an analysis's report bundle into ``archive`` chunk by chunk."""
+    try:
+        bundle = ZipFile(bundle_path)
+    except (OSError, BadZipFile):
+        LOGGER.warning("Report bundle %s is missing or unreadable; exporting the analysis JSON only", bundle_path)
+        return
+    with bundle:
+        for member in bundle.infolist():
+            if member.is_dir():
+                continue
+            with bundle.open(member) as source, archive.open(f"{folder}/{member.filename}", mode="w") as target:
+                while chunk := source.read(CHUNK_BYTES):
+                    target.write(chunk)
+                    if sink.size >= CHUNK_BYTES:
+                        yield sink.drain()
+
+
+def zip_stream(filters: ExportFilter) -> Iterator[bytes]:
+    """One ZIP with ``analysis.json`` and the report files of every matching analysis, grouped by month and document.
+
+    Entry data is streamed, but ``ZipFile`` keeps a ``ZipInfo`` (about 0.5 KB) for every
+    member until the central directory is written at the end, so memory grows with the
+    number of entries. Callers bound that with ``EXPORT_ZIP_MAX_ANALYSES``; NDJSON has no
+    such limit.
+    """
+    sink = _StreamSink()
+    with ZipFile(sink, mode="w", compression=ZIP_DEFLATED) as archive:
+        for record, export_path in iter_analyses(filters):
+            folder = _entry_folder(record)
+            archive.writestr(f"{folder}/analysis.json", orjson.dumps(record, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            if export_path:
+                yield from _copy_bundle(archive, sink, Path(export_path), folder)
+            if sink.size >= CHUNK_BYTES:
+                yield sink.drain()
+    # Closing the archive appends the central directory.
+    yield sink.drain()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.orm import Session
+
+from ..models import AnalysisReport, DashboardCounter, Document, analysis_counters
+from ..schemas import ActivityDay, DocumentStats, KeywordStats, SectionStats
+
+
+DAY_KINDS = ("uploaded", "analyzed")
+
+Counters = Dict[Tuple[str, str], Tuple[int, float]]
+
+
+def read_stats(db: Session, owner_id: int, *, days: int = 14, top_keywords: int = 10) -> DocumentStats:
+    """Dashboard summary straight from the owner's counters; the row count depends on the rule vocabulary, not the library size."""
+    today = datetime.utcnow().date()
+    window = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    rows = (
+        db.query(DashboardCounter)
+        .filter(
+            DashboardCounter.owner_id == owner_id,
+            DashboardCounter.count != 0,
+            or_(DashboardCounter.kind.not_in(DAY_KINDS), DashboardCounter.key >= window[0].isoformat()),
+        )
+        .all()
+    )
+
+    status_counts: Dict[str, int] = {}
+    sections: Dict[str, SectionStats] = {}
+    keywords: List[KeywordStats] = []
+    activity = {day.isoformat(): ActivityDay(day=day) for day in window}
+    for row in rows:
+        if row.kind == "status":
+            status_counts[row.key] = row.count
+        elif row.kind == "section":
+            sections[row.key] = SectionStats(documents=row.count, average_importance=round(row.total / row.count, 4))
+        elif row.kind == "keyword":
+            keywords.append(KeywordStats(keyword=row.key, documents=row.count))
+        elif row.key in activity:
+            setattr(activity[row.key], row.kind, row.count)
+
+    keywords.sort(key=lambda item: (-item.documents, item.keyword))
+    return DocumentStats(
+        total_documents=sum(status_counts.values()),
+        status_counts=status_counts,
+        sections=sections,
+        top_keywords=keywords[:top_keywords],
+        recent_activity=list(activity.values()),
+    )
+
+
+def stored_counters(db: Session, owner_id: int) -> Counters:
+    rows = db.query(DashboardCounter).filter(DashboardCounter.owner_id == owner_id, DashboardCounter.count != 0)
+    return {(row.kind, row.key): (row.count, row.total) for row in rows}
+
+
+def compute_counters(db: Session, owner_id: int) -> Counters:
+    """The slow path: derive the counters from every document and analysis the owner has."""
+    totals: Dict[Tuple[str, str], List[float]] = {}
+
+    def bump(kind: str, key: str, total: float = 0.0) -> None:
+        entry = totals.setdefault((kind, key[:255]), [0, 0.0])
+        entry[0] += 1
+        entry[1] += total
+
+    documents = db.query(Document.status, Document.uploaded_at).filter(Document.owner_id == owner_id)
+    for status, uploaded_at in documents.yield_per(1000):
+        bump("status", status)
+        bump("uploaded", uploaded_at.date().isoformat())
+
+    reports = (
+        db.query(AnalysisReport.document_id, AnalysisReport.created_at, AnalysisReport.sections)
+        .join(Document, Document.id == AnalysisReport.document_id)
+        .filter(Document.owner_id == owner_id)
+        .order_by(AnalysisReport.document_id, AnalysisReport.created_at, AnalysisReport.id)
+    )
+    latest: Dict[int, Dict] = {}
+    for document_id, created_at, sections in reports.yield_per(500):
+        bump("analyzed", created_at.date().isoformat())
+        latest[document_id] = sections
+    for sections in latest.values():
+        for kind, key, total in analysis_counters(sections):
+            bump(kind, key, total)
+
+    return {key: (int(count), total) for key, (count, total) in totals.items()}
+
+
+def counter_drift(stored: Counters, expected: Counters) -> List[str]:
+    drift = []
+    for kind, key in sorted(set(stored) | set(expected)):
+        have, want = stored.get((kind, key), (0, 0.0)), expected.get((kind, key), (0, 0.0))
+        if have[0] != want[0] or abs(have[1] - want[1]) > 1e-6:
+            drift.append(f"{kind}:{key} stored {have[0]}/{have[1]:.4f}, expected {want[0]}/{want[1]:.4f}")
+    return drift
+
+
+def rebuild_counters(db: Session, owner_id: int, *, dry_run: bool = False) -> List[str]:
+    """Recompute the owner's counters, replacing the stored ones unless ``dry_run``; returns what had drifted."""
+    expected = compute_counters(db, owner_id)
+    drift = counter_drift(stored_counters(db, owner_id), expected)
+    if drift and not dry_run:
+        db.execute(delete(DashboardCounter).where(DashboardCounter.owner_id == owner_id))
+        rows = [
+            {"owner_id": owner_id, "kind": kind, "key": key, "count": count, "total": total}
+            for (kind, key), (count, total) in expected.items()
+        ]
+        if rows:
+            db.execute(insert(DashboardCounter), rows)
+    return drift
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.responses import dumps
+from ..models import AnalysisReport, Document
+
+
+settings = get_settings()
+
+# SQLite's default bound-parameter limit is 999 on older builds.
+_ID_CHUNK = 500
+
+# (document id, stored filename, status, latest analysis id); the random stored filename is never reused.
+CacheKey = Tuple[int, str, str, Optional[int]]
+
+
+class PayloadCache:
+    """LRU of serialized ``DocumentRead`` fragments.
+
+    The key carries everything that can change about a listed document (its status and
+    latest analysis id), so a stale entry is simply never looked up again and ages out.
+    Deleted documents are evicted outright.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+            return fragment
+
+    def put(self, key: CacheKey, fragment: bytes) -> None:
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, document_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == document_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+payload_cache = PayloadCache(settings.document_payload_cache_size)
+
+
+def _chunks(values: Sequence[int]) -> Iterable[Sequence[int]]:
+    for start in range(0, len(values), _ID_CHUNK):
+        yield values[start:start + _ID_CHUNK]
+
+
+def _latest_analysis_ids(db: Session, document_ids: Sequence[int]) -> Dict[int, int]:
+    latest: Dict[int, int] = {}
+    for chunk in _chunks(document_ids):
+        rows = (
+            db.query(AnalysisReport.document_id, func.max(AnalysisReport.id))
+            .filter(AnalysisReport.document_id.in_(chunk))
+            .group_by(AnalysisReport.document_id)
+            .all()
+        )
+        latest.update({document_id: analysis_id for document_id, analysis_id in rows})
+    return latest
+
+
+def _analysis_payload(analysis: AnalysisReport) -> Dict[str, Any]:
+    # Stored JSON already has the AnalysisResult/SectionInsight shape, so it is emitted as-is.
+    return {
+        "document_id": analysis.document_id,
+        "analysis_id": analysis.id,
+        "summary": analysis.summary,
+        "highlights": analysis.highlights or {},
+        "sections": analysis.sections or {},
+        "boq_rows": analysis.boq_rows or [],
+        "version_diff": analysis.version_diff,
+        "preview_pages": analysis.preview_pages,
+        "created_at": analysis.created_at,
+    }
+
+
+def document_fragments(db: Session, documents: Sequence[Document]) -> List[bytes]:
+    """Serialized ``DocumentRead`` objects in ``documents`` order; only cache misses load analysis JSON."""
+    latest = _latest_analysis_ids(db, [doc.id for doc in documents])
+    keys = [(doc.id, doc.stored_filename, doc.status, latest.get(doc.id)) for doc in documents]
+    fragments: List[Optional[bytes]] = [payload_cache.get(key) for key in keys]
+
+    missing = [key[3] for key, fragment in zip(keys, fragments) if fragment is None and key[3] is not None]
+    analyses: Dict[int, AnalysisReport] = {}
+    for chunk in _chunks(missing):
+        analyses.update({analysis.id: analysis for analysis in db.query(AnalysisReport).filter(AnalysisReport.id.in_(chunk))})
+
+    for index, (doc, key) in enumerate(zip(documents, keys)):
+        if fragments[index] is not None:
+            continue
+        analysis = analyses.get(key[3]) if key[3] is not None else None
+        fragment = dumps(
+            {
+                "id": doc.id,
+                "original_filename": doc.original_filename,
+                "uploaded_at": doc.uploaded_at,
+                "status": doc.status,
+                "version": doc.version,
+                "parent_document_id": doc.parent_document_id,
+                "rule_profile_id": doc.rule_profile_id,
+                "latest_analysis": _analysis_payload(analysis) if analysis is not None else None,
+            }
+        )
+        payload_cache.put(key, fragment)
+        fragments[index] = fragment
+    return [fragment for fragment in fragments if fragment is not None]
+
+
+def join_fragments(fragments: Sequence[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import get_settings
+from ..core.database import session_scope
+from ..models import AnalysisJob, Document
+from ..schemas import RuleConfig
+from .progress import FAILED, TERMINAL_EVENTS, ProgressBroker, ProgressCallback, ProgressEvent, progress_broker
+
+
+LOGGER = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    document_id: int
+    owner_email: str
+    rule_config: RuleConfig
+    attempts: int
+
+
+def enqueue_analysis(db: Union[Session, AsyncSession], document: Document, rule_model: RuleConfig, owner_email: str) -> AnalysisJob:
+    job = AnalysisJob(
+        document_id=document.id,
+        owner_email=owner_email,
+        rule_config=rule_model.model_dump(),
+        max_attempts=settings.job_max_attempts,
+        available_at=datetime.utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(AnalysisJob.status == "queued", AnalysisJob.available_at <= now),
+        # A running job whose lease lapsed belongs to a crashed or partitioned worker.
+        and_(AnalysisJob.status == "running", AnalysisJob.lease_expires_at < now),
+    )
+
+
+def claim_next_job(db: Session, worker_id: str, lease_seconds: int) -> Optional[ClaimedJob]:
+    """Lease the oldest claimable job to ``worker_id``.
+
+    PostgreSQL skips rows other workers have locked; on SQLite writers are
+    serialized anyway. Either way the conditional UPDATE is what makes the claim
+    exclusive, so a lost race simply returns ``None``.
+    """
+    now = datetime.utcnow()
+    query = (
+        db.query(AnalysisJob.id)
+        .filter(_claimable(now))
+        .order_by(AnalysisJob.available_at, AnalysisJob.id)
+        .limit(1)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+    job_id = query.scalar()
+    if job_id is None:
+        db.rollback()
+        return None
+
+    claimed = (
+        db.query(AnalysisJob)
+        .filter(AnalysisJob.id == job_id, _claimable(now))
+        .update(
+            {
+                AnalysisJob.status: "running",
+                AnalysisJob.lease_owner: worker_id,
+                AnalysisJob.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                AnalysisJob.heartbeat_at: now,
+                AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                AnalysisJob.updated_at: now,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if not claimed:
+        return None
+
+    job = db.get(AnalysisJob, job_id)
+    if job is None:
+        return None
+    if job.attempts > job.max_attempts:
+        LOGGER.warning("Job %s exhausted %s attempts after lease expiry", job.id, job.max_attempts)
+        _finalize_failure(db, job, "Lease expired too many times")
+        return None
+    return ClaimedJob(
+        id=job.id,
+        document_id=job.document_id,
+        owner_email=job.owner_email,
+        rule_config=RuleConfig(**job.rule_config),
+        attempts=job.attempts,
+    )
+
+
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker; whatever this one computed must not be persisted."""
+
+
+def _extend_lease(db: Session, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+    now = datetime.utcnow()
+    extended = (
+        db.query(AnalysisJob)
+        .filter(AnalysisJob.id == job_id, AnalysisJob.lease_owner == worker_id, AnalysisJob.status == "running")
+        .update(
+            {
+                AnalysisJob.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                AnalysisJob.heartbeat_at: now,
+            },
+            synchronize_session=False,
+        )
+    )
+    return bool(extended)
+
+
+def heartbeat(db: Session, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+    extended = _extend_lease(db, job_id, worker_id, lease_seconds)
+    db.commit()
+    return extended
+
+
+def confirm_lease(db: Session, job_id: int, worker_id: str, lease_seconds: int) -> None:
+    """Raise ``LeaseLost`` unless ``worker_id`` still holds the job, renewing the lease in the caller's transaction.
+
+    The conditional UPDATE locks the job row (the whole database on SQLite) until
+    the caller commits, so a concurrent reclaim either finds the renewed lease or
+    waits, and a report written in the same transaction belongs to the lease holder.
+    """
+    if not _extend_lease(db, job_id, worker_id, lease_seconds):
+        raise LeaseLost(f"Job {job_id} is no longer leased to {worker_id}")
+
+
+def complete_job(db: Session, job_id: int, worker_id: str) -> None:
+    db.query(AnalysisJob).filter(AnalysisJob.id == job_id, AnalysisJob.lease_owner == worker_id).update(
+        {
+            AnalysisJob.status: "completed",
+            AnalysisJob.lease_owner: None,
+            AnalysisJob.lease_expires_at: None,
+            AnalysisJob.updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def _finalize_failure(db: Session, job: AnalysisJob, error: str) -> None:
+    job.status = "failed"
+    job.last_error = error
+    job.lease_owner = None
+    job.lease_expires_at = None
+    job.progress = _progress_payload(job.progress, FAILED, {"status": "failed", "detail": "Analysis failed"})
+    document = db.get(Document, job.document_id)
+    if document is not None:
+        document.status = "failed"
+    db.commit()
+
+
+def fail_job(db: Session, job_id: int, worker_id: str, error: str, retry_delay_seconds: int) -> bool:
+    """Record a failed attempt; returns True when the job will not be retried."""
+    job = db.get(AnalysisJob, job_id)
+    if job is None or job.lease_owner != worker_id:
+        db.rollback()
+        return False
+    if job.attempts >= job.max_attempts:
+        _finalize_failure(db, job, error)
+        return True
+
+    job.status = "queued"
+    job.last_error = error
+    job.lease_owner = None
+    job.lease_expires_at = None
+    # Linear backoff keeps a poison document from monopolising workers.
+    job.available_at = datetime.utcnow() + timedelta(seconds=retry_delay_seconds * job.attempts)
+    db.commit()
+    return False
+
+
+def _progress_payload(previous: Optional[Dict[str, Any]], event: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    sequence = int((previous or {}).get("sequence", 0)) + 1
+    return {"sequence": sequence, "event": event, "data": data}
+
+
+def job_progress_callback(job_id: int, worker_id: str) -> ProgressCallback:
+    """Persist the latest progress event on the job row so API processes can relay it over SSE.
+
+    The write is conditional on ``worker_id`` still holding the lease, so a worker that
+    stalled and lost the job cannot overwrite the new owner's progress. Terminal
+    failures are written by ``fail_job`` once retries are exhausted, not per attempt.
+    """
+
+    def _callback(event: str, data: Dict[str, Any]) -> None:
+        if event == FAILED:
+            return
+        with session_scope() as db:
+            previous = db.query(AnalysisJob.progress).filter(AnalysisJob.id == job_id, AnalysisJob.lease_owner == worker_id).first()
+            if previous is None:
+                return
+            db.query(AnalysisJob).filter(AnalysisJob.id == job_id, AnalysisJob.lease_owner == worker_id).update(
+                {AnalysisJob.progress: _progress_payload(previous.progress, event, data)},
+                synchronize_session=False,
+            )
+
+    return _callback
+
+
+def _latest_job_progress(document_id: int) -> Optional[Dict[str, Any]]:
+    with session_scope() as db:
+        job = (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.document_id == document_id)
+            .order_by(AnalysisJob.id.desc())
+            .first()
+        )
+        return dict(job.progress or {}) if job is not None else None
+
+
+class JobProgressRelay:
+    """Relays progress that queue workers write to job rows into ``progress_broker``.
+
+    Each document followed from this process gets one poller, however many SSE
+    connections follow it; they all subscribe to the broker. The poller stops after a
+    terminal event or when the last follower disconnects.
+    """
+
+    def __init__(self, broker: ProgressBroker, poll_interval_seconds: float = 1.0):
+        self.broker = broker
+        self.poll_interval_seconds = poll_interval_seconds
+        self._pollers: Dict[int, asyncio.Task] = {}
+        self._followers: Counter[int] = Counter()
+
+    async def follow(self, document_id: int, keepalive_seconds: float = 15.0) -> AsyncIterator[Optional[ProgressEvent]]:
+        """Mirrors ``ProgressBroker.subscribe``: events until a terminal one, ``None`` for keepalive ticks."""
+        self._followers[document_id] += 1
+        if document_id not in self._pollers:
+            # History from an earlier run or job would replay its terminal event.
+            self.broker.reset(document_id)
+            self._pollers[document_id] = asyncio.create_task(self._poll(document_id))
+        try:
+            async for event in self.broker.subscribe(document_id, keepalive_seconds=keepalive_seconds):
+                yield event
+        finally:
+            self._followers[document_id] -= 1
+            if self._followers[document_id] <= 0:
+                del self._followers[document_id]
+                poller = self._pollers.pop(document_id, None)
+                if poller is not None:
+                    poller.cancel()
+
+    async def _poll(self, document_id: int) -> None:
+        last_sequence = 0
+        try:
+            while True:
+                try:
+                    progress = await run_in_threadpool(_latest_job_progress, document_id)
+                except Exception:  # pragma: no cover - e.g. database briefly unavailable; retried next tick
+                    LOGGER.exception("Could not read job progress for document %s", document_id)
+                    progress = None
+                sequence = int((progress or {}).get("sequence", 0))
+                if progress and sequence > last_sequence:
+                    last_sequence = sequence
+                    self.broker.publish(document_id, progress["event"], progress.get("data", {}))
+                    if progress["event"] in TERMINAL_EVENTS:
+                        return
+                await asyncio.sleep(self.poll_interval_seconds)
+        finally:
+            if self._pollers.get(document_id) is asyncio.current_task():
+                del self._pollers[document_id]
+
+
+job_progress_relay = JobProgressRelay(progress_broker)
+
+
+def follow_job_progress(document_id: int, keepalive_seconds: float = 15.0) -> AsyncIterator[Optional[ProgressEvent]]:
+    return job_progress_relay.follow(document_id, keepalive_seconds=keepalive_seconds)
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
 import logging
-import re
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set
 
 import pdfplumber
 
-from ..schemas import RuleConfig, SectionInsight
-from .summarizer import summarize_text
+from ..core.config import get_settings
+from ..schemas import BOQRow, RuleConfig, SectionInsight
+from .boq_extractor import extract_boq_rows, is_boq_candidate, page_rule_counts
+from .progress import PAGES_EXTRACTED, SECTIONS_MATCHED, SUMMARY_DONE, TABLES_EXTRACTED, ProgressCallback
+from .rule_matchers import CompiledRules, compile_rules
+from .segmentation import SegmentedText, normalize_text, segment_pages, segment_text
+from .summarizer import summarize_spans
 
 
 LOGGER = logging.getLogger(__name__)
+settings = get_settings()
 
 
 SECTION_TITLES = {
@@ -28,77 +34,178 @@ SECTION_TITLES = {
 @dataclass
 class SectionMatch:
     key: str
-    sentences: List[str]
+    sentence_indices: List[int]
     keywords_found: List[str]
 
 
-def _normalize_text(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+@dataclass
+class PageSnapshot:
+    """Normalized text and keyword hit offsets of one page, as recorded by an earlier analysis.
+
+    ``scanned_keywords`` lists every keyword that analysis searched for, so a keyword
+    missing from ``keyword_hits`` is a known miss rather than a reason to rescan.
+    """
 
+    text: str
+    keyword_hits: Dict[str, List[int]] = field(default_factory=dict)
+    scanned_keywords: FrozenSet[str] = frozenset()
 
-def _extract_sentences(text: str) -> List[str]:
-    text = _normalize_text(text)
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    return [sentence.strip() for sentence in sentences if sentence.strip()]
+
+@dataclass
+class PDFAnalysisResult:
+    summary: str
+    sections: Dict[str, SectionInsight]
+    boq_rows: List[BOQRow] = field(default_factory=list)
+    page_count: int = 0
+    pages: List[PageSnapshot] = field(default_factory=list)
+    matches: Dict[str, SectionMatch] = field(default_factory=dict)
+    segments: Optional[SegmentedText] = None
+
+
+# Upper bound on page progress events per document, so large tenders do not flood subscribers.
+MAX_PAGE_EVENTS = 50
 
 
 class PDFAnalyzer:
-    def __init__(self, rule_config: RuleConfig):
+    def __init__(
+        self,
+        rule_config: RuleConfig,
+        progress: Optional[ProgressCallback] = None,
+        known_pages: Optional[Mapping[int, PageSnapshot]] = None,
+        rules: Optional[CompiledRules] = None,
+        page_limit: Optional[int] = None,
+        deadline: Optional[float] = None,
+        table_workers: Optional[int] = None,
+    ):
         self.rule_config = rule_config
+        # Saved rule profiles arrive precompiled from the matcher cache; ad-hoc configs are compiled here.
+        self.rules = rules if rules is not None else compile_rules(rule_config)
+        self.progress = progress
+        # Pages whose text is unchanged since an earlier version: neither extracted nor rescanned.
+        self.known_pages: Mapping[int, PageSnapshot] = known_pages or {}
+        # Previews only read the leading pages; pdfplumber skips building Page objects for the rest.
+        self.page_limit = page_limit
+        # ``time.monotonic()`` after which extraction stops at the last page read; at least one page is always read.
+        self.deadline = deadline
+        # Processes for BOQ table extraction; ``None`` uses BOQ_TABLE_WORKERS, 1 keeps it in this process.
+        self.table_workers = table_workers if table_workers is not None else settings.boq_table_workers
+        self.boq_candidate_pages: List[int] = []
+        self.page_count = 0
+        self.page_texts: List[str] = []
+        self.page_hits: Dict[int, Dict[str, List[int]]] = {}
+        self.matches: Dict[str, SectionMatch] = {}
 
-    def load_pdf_text(self, pdf_path: Path) -> str:
+    def _emit(self, event: str, **data: Any) -> None:
+        if self.progress is None:
+            return
+        try:
+            self.progress(event, data)
+        except Exception:  # pragma: no cover - progress reporting must never break analysis
+            LOGGER.exception("Progress callback failed for event %s", event)
+
+    def load_segments(self, pdf_path: Path) -> SegmentedText:
         LOGGER.info("Extracting text from %s", pdf_path)
-        text_parts: List[str] = []
-        with pdfplumber.open(str(pdf_path)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text_parts.append(page_text)
-        combined = "\n".join(text_parts)
-        return _normalize_text(combined)
-
-    def _match_section(self, sentences: Iterable[str], section_key: str, keywords: Iterable[str]) -> SectionMatch:
-        matched_sentences: List[str] = []
-        keywords_found: List[str] = []
+        page_texts: List[str] = []
+        detect_boq = self.rule_config.boq.enabled
+        self.boq_candidate_pages = []
+        pages = range(1, self.page_limit + 1) if self.page_limit else None
+        with pdfplumber.open(str(pdf_path), pages=pages) as pdf:
+            total_pages = self.page_count = len(pdf.pages)
+            step = max(1, total_pages // MAX_PAGE_EVENTS)
+            for page_number, page in enumerate(pdf.pages, start=1):
+                known = self.known_pages.get(page_number)
+                if known is not None:
+                    page_texts.append(known.text)
+                else:
+                    page_text = page.extract_text() or ""
+                    page_texts.append(normalize_text(page_text))
+                    if detect_boq and is_boq_candidate(page_text, *page_rule_counts(page)):
+                        self.boq_candidate_pages.append(page_number)
+                page.close()
+                if page_number % step == 0 or page_number == total_pages:
+                    self._emit(PAGES_EXTRACTED, pages=page_number, total_pages=total_pages)
+                if self.deadline is not None and page_number < total_pages and time.monotonic() >= self.deadline:
+                    LOGGER.info("Stopped reading %s after %s of %s pages at the deadline", pdf_path.name, page_number, total_pages)
+                    self.page_count = page_number
+                    break
+        self.page_texts = page_texts
+        return segment_pages(page_texts)
 
-        keyword_patterns: List[Tuple[str, re.Pattern[str]]] = [
-            (keyword, re.compile(rf"\b{re.escape(keyword)}\b", re.IGNORECASE)) for keyword in keywords
-        ]
+    def load_pdf_text(self, pdf_path: Path) -> str:
+        return self.load_segments(pdf_path).text
+
+    def _keyword_hits(self, segments: SegmentedText, keyword: str) -> List[int]:
+        """Buffer offsets of ``keyword``; known pages contribute their recorded hits instead of a rescan."""
+        pattern = self.rules.patterns[keyword]
+        hits: List[int] = []
+        for page_number, start, end in segments.page_ranges():
+            known = self.known_pages.get(page_number)
+            if known is not None and keyword in known.scanned_keywords:
+                local = known.keyword_hits.get(keyword, [])
+            else:
+                local = [found.start() - start for found in pattern.finditer(segments.text, start, end)]
+            if local:
+                self.page_hits.setdefault(page_number, {})[keyword] = local
+                hits.extend(start + offset for offset in local)
+        return hits
+
+    def _match_section(self, segments: SegmentedText, section_key: str, keywords: Iterable[str]) -> SectionMatch:
+        matched: Set[int] = set()
+        keywords_found: List[str] = []
 
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            hits = [keyword for keyword, pattern in keyword_patterns if pattern.search(sentence_lower)]
+        # Hits are mapped back to sentence spans by offset.
+        for keyword in keywords:
+            hits = {segments.index_at(offset) for offset in self._keyword_hits(segments, keyword)}
             if hits:
-                matched_sentences.append(sentence)
-                keywords_found.extend(hits)
+                matched.update(hits)
+                keywords_found.append(keyword)
 
         unique_keywords = sorted(set(keywords_found), key=str.lower)
-        return SectionMatch(key=section_key, sentences=matched_sentences, keywords_found=unique_keywords)
+        return SectionMatch(key=section_key, sentence_indices=sorted(matched), keywords_found=unique_keywords)
 
     def analyze(self, pdf_path: Path) -> Dict[str, SectionInsight]:
-        full_text = self.load_pdf_text(pdf_path)
-        sentences = _extract_sentences(full_text)
-        if not sentences:
+        return self.analyze_segments(self.load_segments(pdf_path))
+
+    def analyze_text(self, full_text: str) -> Dict[str, SectionInsight]:
+        return self.analyze_segments(segment_text(full_text))
+
+    def match_sections(self, segments: SegmentedText) -> Dict[str, SectionMatch]:
+        """Sentence matches of every enabled section that has at least one keyword hit."""
+        self.page_hits = {}
+        matches: Dict[str, SectionMatch] = {}
+        for section in self.rules.sections:
+            match = self._match_section(segments, section.key, section.keywords)
+            if match.sentence_indices:
+                matches[section.key] = match
+        return matches
+
+    def analyze_segments(self, segments: SegmentedText) -> Dict[str, SectionInsight]:
+        if not len(segments):
             return {}
 
         section_results: Dict[str, SectionInsight] = {}
-        total_sentences = len(sentences)
+        total_sentences = len(segments)
+        self.matches = self.match_sections(segments)
 
-        for section_key, config in self.rule_config.model_dump().items():
-            if not config.get("enabled", True):
-                continue
-            keywords = config.get("keywords", [])
-            match = self._match_section(sentences, section_key, keywords)
-            if not match.sentences:
+        for section in self.rules.sections:
+            section_key, keywords = section.key, section.keywords
+            match = self.matches.get(section_key)
+            if match is None:
                 continue
 
-            summary = summarize_text(" ".join(match.sentences), max_sentences=4)
             keyword_coverage = len(set(match.keywords_found)) / max(1, len(keywords)) if keywords else 0
-            sentence_ratio = len(match.sentences) / max(1, total_sentences)
+            sentence_ratio = len(match.sentence_indices) / max(1, total_sentences)
             confidence = keyword_coverage if keywords else sentence_ratio
-            min_confidence = config.get("min_confidence", 0.2)
-            if confidence < min_confidence:
+            if confidence < section.min_confidence:
                 continue
 
+            summary = summarize_spans(
+                segments,
+                match.sentence_indices,
+                max_sentences=4,
+                engine=section.summarizer,
+                budget_ms=section.summarizer_budget_ms,
+            )
             importance = min(1.0, max(sentence_ratio, confidence))
             section_results[section_key] = SectionInsight(
                 title=SECTION_TITLES.get(section_key, section_key.replace("_", " ").title()),
@@ -107,15 +214,88 @@ class PDFAnalyzer:
                 keywords_found=match.keywords_found,
             )
 
+        self._emit(SECTIONS_MATCHED, sections=sorted(section_results))
         return section_results
 
+    def extract_boq(self, pdf_path: Path) -> List[BOQRow]:
+        """Extract BOQ tables from the candidate pages found by the last ``load_pdf_text`` call."""
+        rows = extract_boq_rows(
+            pdf_path,
+            self.boq_candidate_pages,
+            workers=self.table_workers,
+            parallel_min_pages=settings.boq_parallel_min_pages,
+        )
+        self._emit(TABLES_EXTRACTED, pages=len(self.boq_candidate_pages), rows=len(rows))
+        return rows
+
     def summarize(self, pdf_path: Path) -> str:
-        text = self.load_pdf_text(pdf_path)
-        return summarize_text(text, max_sentences=8)
+        return self.summarize_segments(self.load_segments(pdf_path))
+
+    def summarize_text(self, full_text: str) -> str:
+        return self.summarize_segments(segment_text(full_text))
+
+    def summarize_segments(self, segments: SegmentedText) -> str:
+        summary = summarize_spans(segments, max_sentences=8)
+        self._emit(SUMMARY_DONE, characters=len(summary))
+        return summary
+
+    def scanned_keywords(self) -> FrozenSet[str]:
+        return self.rules.scanned_keywords
+
+    def page_snapshots(self) -> List[PageSnapshot]:
+        """Per-page state of the last ``load_segments``/``analyze_segments`` run, for reuse by later versions."""
+        scanned = self.scanned_keywords()
+        return [
+            PageSnapshot(text=text, keyword_hits=self.page_hits.get(page_number, {}), scanned_keywords=scanned)
+            for page_number, text in enumerate(self.page_texts, start=1)
+        ]
+
+
+def analyze_pdf(
+    pdf_path: Path,
+    rule_config: RuleConfig,
+    progress: Optional[ProgressCallback] = None,
+    known_pages: Optional[Mapping[int, PageSnapshot]] = None,
+    rules: Optional[CompiledRules] = None,
+    table_workers: Optional[int] = None,
+) -> PDFAnalysisResult:
+    """Full analysis of ``pdf_path``; pages in ``known_pages`` skip text extraction, keyword scans and BOQ detection."""
+    analyzer = PDFAnalyzer(rule_config, progress=progress, known_pages=known_pages, rules=rules, table_workers=table_workers)
+    segments = analyzer.load_segments(pdf_path)
+    summary = analyzer.summarize_segments(segments)
+    sections = analyzer.analyze_segments(segments)
+    boq_rows = analyzer.extract_boq(pdf_path)
+    return PDFAnalysisResult(
+        summary=summary,
+        sections=sections,
+        boq_rows=boq_rows,
+        page_count=analyzer.page_count,
+        pages=analyzer.page_snapshots(),
+        matches=analyzer.matches,
+        segments=segments,
+    )
+
 
+def preview_pdf(
+    pdf_path: Path,
+    rule_config: RuleConfig,
+    page_budget: int,
+    rules: Optional[CompiledRules] = None,
+    deadline: Optional[float] = None,
+) -> PDFAnalysisResult:
+    """Summary and section insights from the first ``page_budget`` pages only, for triage while the full run is queued.
 
-def analyze_pdf(pdf_path: Path, rule_config: RuleConfig) -> Tuple[str, Dict[str, SectionInsight]]:
-    analyzer = PDFAnalyzer(rule_config)
-    summary = analyzer.summarize(pdf_path)
-    sections = analyzer.analyze(pdf_path)
-    return summary, sections
+    BOQ tables are left to the full analysis: table extraction dominates the cost
+    and bills of quantity rarely sit in the leading bid-data pages. Past
+    ``deadline`` the preview covers only the pages read so far.
+    """
+    analyzer = PDFAnalyzer(rule_config, rules=rules, page_limit=page_budget, deadline=deadline)
+    segments = analyzer.load_segments(pdf_path)
+    return PDFAnalysisResult(
+        summary=analyzer.summarize_segments(segments),
+        sections=analyzer.analyze_segments(segments),
+        boq_rows=[],
+        page_count=analyzer.page_count,
+        matches=analyzer.matches,
+        segments=segments,
+    )
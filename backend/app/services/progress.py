@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+PAGES_EXTRACTED = "pages_extracted"
+SECTIONS_MATCHED = "sections_matched"
+SUMMARY_DONE = "summary_done"
+TABLES_EXTRACTED = "tables_extracted"
+BUNDLE_WRITTEN = "bundle_written"
+COMPLETED = "completed"
+FAILED = "failed"
+
+TERMINAL_EVENTS = frozenset({COMPLETED, FAILED})
+
+
+@dataclass
+class ProgressEvent:
+    document_id: int
+    event: str
+    sequence: int
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_sse(self) -> str:
+        payload = json.dumps(self.data, separators=(",", ":"), default=str)
+        return f"id: {self.sequence}\nevent: {self.event}\ndata: {payload}\n\n"
+
+
+class ProgressBroker:
+    """In-process fan-out of analysis progress events to SSE subscribers.
+
+    Publishers run in worker threads, subscribers on the event loop, so events are
+    handed over with ``call_soon_threadsafe``. A short per-document history lets a
+    client that connects mid-analysis (or just after it finished) catch up.
+    """
+
+    def __init__(self, history_size: int = 32, max_documents: int = 256):
+        self.history_size = history_size
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._history: "OrderedDict[int, Deque[ProgressEvent]]" = OrderedDict()
+        self._subscribers: Dict[int, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue[ProgressEvent]]]] = {}
+
+    def publish(self, document_id: int, event: str, data: Optional[Dict[str, Any]] = None) -> ProgressEvent:
+        with self._lock:
+            progress_event = ProgressEvent(document_id=document_id, event=event, sequence=next(self._sequence), data=data or {})
+            history = self._history.get(document_id)
+            if history is None:
+                history = self._history[document_id] = deque(maxlen=self.history_size)
+                while len(self._history) > self.max_documents:
+                    self._history.popitem(last=False)
+            else:
+                self._history.move_to_end(document_id)
+            history.append(progress_event)
+            subscribers = list(self._subscribers.get(document_id, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, progress_event)
+            except RuntimeError:  # pragma: no cover - subscriber loop already closed
+                continue
+        return progress_event
+
+    def reset(self, document_id: int) -> None:
+        """Forget a document's history when a new run is scheduled, so its old terminal event is not replayed."""
+        with self._lock:
+            self._history.pop(document_id, None)
+
+    def callback_for(self, document_id: int) -> ProgressCallback:
+        def _callback(event: str, data: Dict[str, Any]) -> None:
+            self.publish(document_id, event, data)
+
+        return _callback
+
+    async def subscribe(self, document_id: int, keepalive_seconds: float = 15.0) -> AsyncIterator[Optional[ProgressEvent]]:
+        """Yield events for ``document_id`` until a terminal event; ``None`` marks a keepalive tick."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[ProgressEvent] = asyncio.Queue()
+        subscriber = (loop, queue)
+
+        with self._lock:
+            backlog = list(self._history.get(document_id, ()))
+            self._subscribers.setdefault(document_id, []).append(subscriber)
+
+        try:
+            last_sequence = 0
+            for progress_event in backlog:
+                last_sequence = progress_event.sequence
+                yield progress_event
+                if progress_event.event in TERMINAL_EVENTS:
+                    return
+
+            while True:
+                try:
+                    progress_event = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if progress_event.sequence <= last_sequence:
+                    continue
+                yield progress_event
+                if progress_event.event in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(document_id, [])
+                if subscriber in subscribers:
+                    subscribers.remove(subscriber)
+                if not subscribers:
+                    self._subscribers.pop(document_id, None)
+
+
+progress_broker = ProgressBroker()
@@ -1,16 +1,18 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import secrets
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from zipfile import ZipFile, ZIP_DEFLATED
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from ..core.config import get_settings
-from ..schemas import SectionInsight
+from ..core.responses import dumps
+from ..schemas import BOQRow, SectionInsight, VersionDiff
+from .boq_extractor import boq_rows_to_csv
 
 
 settings = get_settings()
@@ -31,12 +33,15 @@ class ReportContext:
     sections: Dict[str, SectionInsight]
     rule_config: Dict[str, dict]
     owner_email: str
+    boq_rows: List[BOQRow] = field(default_factory=list)
+    version_diff: Optional[VersionDiff] = None
 
 
 def _ensure_export_dir() -> Path:
     settings.export_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    export_folder = settings.export_dir / timestamp
+    # Bundles from concurrent analyses of same-named files may land in the same second.
+    export_folder = settings.export_dir / f"{timestamp}_{secrets.token_hex(4)}"
     export_folder.mkdir(parents=True, exist_ok=True)
     return export_folder
 
@@ -51,6 +56,8 @@ def render_html_report(context: ReportContext) -> str:
         sections=context.sections,
         rule_config=context.rule_config,
         owner_email=context.owner_email,
+        boq_rows=context.boq_rows,
+        version_diff=context.version_diff,
     )
 
 
@@ -82,6 +89,28 @@ def build_markdown_report(context: ReportContext) -> str:
             f"**Keywords found:** {', '.join(section.keywords_found) if section.keywords_found else 'None'}",
         ])
 
+    if context.version_diff is not None:
+        diff = context.version_diff
+        lines.extend([
+            "",
+            "## Changes Since Previous Version",
+            f"{len(diff.changed_pages)} changed or new page(s), {len(diff.removed_pages)} removed, {diff.reused_pages} unchanged.",
+        ])
+        for change in diff.sections.values():
+            lines.extend(["", f"### {change.title} ({change.status})"])
+            lines.extend(f"- Added: {sentence}" for sentence in change.added_sentences)
+            lines.extend(f"- Removed: {sentence}" for sentence in change.removed_sentences)
+        if not diff.sections:
+            lines.append("No section insights changed.")
+
+    if context.boq_rows:
+        pages = sorted({row.page for row in context.boq_rows})
+        lines.extend([
+            "",
+            "## Bill of Quantities Tables",
+            f"{len(context.boq_rows)} line items extracted from pages {', '.join(str(page) for page in pages)}; see boq.csv.",
+        ])
+
     return "\n".join(lines)
 
 
@@ -93,6 +122,8 @@ def generate_report_assets(
     sections: Dict[str, SectionInsight],
     rule_config: Dict[str, dict],
     owner_email: str,
+    boq_rows: Optional[List[BOQRow]] = None,
+    version_diff: Optional[VersionDiff] = None,
 ) -> Dict[str, str]:
     context = ReportContext(
         document_name=document_name,
@@ -102,28 +133,34 @@ def generate_report_assets(
         sections=sections,
         rule_config=rule_config,
         owner_email=owner_email,
+        boq_rows=list(boq_rows or []),
+        version_diff=version_diff,
     )
 
     html_content = render_html_report(context)
     markdown_content = build_markdown_report(context)
-    json_payload = json.dumps(
+    json_payload = dumps(
         {
             "document_name": context.document_name,
             "generated_at": context.generated_at.isoformat() + "Z",
             "summary": context.summary,
             "highlights": context.highlights,
             "sections": {key: section.model_dump() for key, section in sections.items()},
+            "boq_rows": [row.model_dump() for row in context.boq_rows],
+            "version_diff": version_diff.model_dump() if version_diff is not None else None,
             "rule_config": rule_config,
             "owner_email": context.owner_email,
-        },
-        indent=2,
-    )
+        }
+    ).decode()
 
-    return {
+    assets = {
         "report.html": html_content,
         "report.md": markdown_content,
         "report.json": json_payload,
     }
+    if context.boq_rows:
+        assets["boq.csv"] = boq_rows_to_csv(context.boq_rows)
+    return assets
 
 
 def create_export_bundle(
@@ -134,6 +171,8 @@ def create_export_bundle(
     sections: Dict[str, SectionInsight],
     rule_config: Dict[str, dict],
     owner_email: str,
+    boq_rows: Optional[List[BOQRow]] = None,
+    version_diff: Optional[VersionDiff] = None,
 ) -> Path:
     export_dir = _ensure_export_dir()
     bundle_name = f"{Path(document_name).stem}_analysis.zip"
@@ -146,6 +185,8 @@ def create_export_bundle(
         sections=sections,
         rule_config=rule_config,
         owner_email=owner_email,
+        boq_rows=boq_rows,
+        version_diff=version_diff,
     )
 
     with ZipFile(bundle_path, mode="w", compression=ZIP_DEFLATED) as archive:
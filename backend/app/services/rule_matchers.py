@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Pattern, Tuple
+
+from ..core.config import get_settings
+from ..schemas import RuleConfig
+
+
+settings = get_settings()
+
+MatcherKey = Tuple[int, int]  # (rule profile id, profile version)
+
+
+@dataclass(frozen=True)
+class CompiledSection:
+    key: str
+    keywords: Tuple[str, ...]
+    min_confidence: float
+    summarizer: Optional[str] = None
+    summarizer_budget_ms: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """A rule config with every keyword regex compiled once, in section order."""
+
+    config: RuleConfig
+    sections: Tuple[CompiledSection, ...]
+    patterns: Dict[str, Pattern[str]]
+
+    @property
+    def scanned_keywords(self) -> FrozenSet[str]:
+        return frozenset(self.patterns)
+
+
+def keyword_pattern(keyword: str) -> Pattern[str]:
+    return re.compile(rf"\b{re.escape(keyword)}\b", re.IGNORECASE)
+
+
+def compile_rules(rule_config: RuleConfig) -> CompiledRules:
+    sections = []
+    patterns: Dict[str, Pattern[str]] = {}
+    for key, config in rule_config.model_dump().items():
+        if not config.get("enabled", True):
+            continue
+        keywords = tuple(config.get("keywords", []))
+        for keyword in keywords:
+            if keyword not in patterns:
+                patterns[keyword] = keyword_pattern(keyword)
+        sections.append(
+            CompiledSection(
+                key=key,
+                keywords=keywords,
+                min_confidence=config.get("min_confidence", 0.2),
+                summarizer=config.get("summarizer"),
+                summarizer_budget_ms=config.get("summarizer_budget_ms"),
+            )
+        )
+    return CompiledRules(config=rule_config, sections=tuple(sections), patterns=patterns)
+
+
+class MatcherCache:
+    """LRU of compiled rule profiles keyed by ``(profile id, version)``.
+
+    Editing a profile bumps its version and profile ids are never reused, so a
+    stale matcher can never be served, even by processes that did not see the
+    edit; ``invalidate`` just frees the superseded entries early.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[MatcherKey, CompiledRules]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: MatcherKey, rule_config: Dict[str, Any]) -> CompiledRules:
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        # Compile outside the lock; a concurrent miss on the same key only duplicates work.
+        compiled = compile_rules(RuleConfig(**rule_config))
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def invalidate(self, profile_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == profile_id]:
+                del self._entries[key]
+
+
+matcher_cache = MatcherCache(settings.rule_matcher_cache_size)
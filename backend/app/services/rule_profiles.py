@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from sqlalchemy import Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models import RuleProfile, User
+from .rule_matchers import CompiledRules, matcher_cache
+
+
+def _accessible(user: User) -> Select:
+    scope = RuleProfile.owner_id == user.id
+    if user.organization:
+        scope = or_(scope, RuleProfile.organization == user.organization)
+    return select(RuleProfile).where(scope)
+
+
+def list_profiles(db: Session, user: User) -> List[RuleProfile]:
+    return list(db.scalars(_accessible(user).order_by(RuleProfile.name, RuleProfile.id)))
+
+
+def get_accessible_profile(db: Session, user: User, profile_id: int) -> Optional[RuleProfile]:
+    """A profile the user owns or one shared with the user's organization."""
+    return db.scalar(_accessible(user).where(RuleProfile.id == profile_id))
+
+
+async def get_accessible_profile_async(db: AsyncSession, user: User, profile_id: int) -> Optional[RuleProfile]:
+    return await db.scalar(_accessible(user).where(RuleProfile.id == profile_id))
+
+
+def compiled_profile(profile: RuleProfile) -> CompiledRules:
+    return matcher_cache.get((profile.id, profile.version), profile.rule_config or {})
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?]) ")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class SegmentedText:
+    """One normalized text buffer plus parallel ``(start, end, page)`` arrays, one entry per sentence.
+
+    Sentences are never materialized up front; consumers search the buffer with
+    ``pattern.search(text, start, end)`` and only slice the spans they keep.
+    ``page_numbers``/``page_starts`` record where each non-empty page begins.
+    """
+
+    __slots__ = ("text", "starts", "ends", "pages", "page_numbers", "page_starts")
+
+    def __init__(self, text: str, starts: array, ends: array, pages: array, page_numbers: array, page_starts: array):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.pages = pages
+        self.page_numbers = page_numbers
+        self.page_starts = page_starts
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def sentence(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def sentences(self, indices: Optional[Iterable[int]] = None) -> Iterator[str]:
+        for index in range(len(self)) if indices is None else indices:
+            yield self.sentence(index)
+
+    def join(self, indices: Optional[Iterable[int]] = None) -> str:
+        return " ".join(self.sentences(indices))
+
+    def index_at(self, position: int) -> int:
+        """Index of the sentence containing character ``position`` (or the one before a gap)."""
+        return bisect_right(self.starts, position) - 1
+
+    def page_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """``(page_number, start, end)`` of every non-empty page; pages are separated by one space."""
+        count = len(self.page_starts)
+        for position in range(count):
+            end = self.page_starts[position + 1] - 1 if position + 1 < count else len(self.text)
+            yield self.page_numbers[position], self.page_starts[position], end
+
+    def nbytes(self) -> int:
+        arrays = (self.starts, self.ends, self.pages, self.page_numbers, self.page_starts)
+        return sum(values.itemsize * len(values) for values in arrays)
+
+
+def segment_pages(page_texts: Iterable[str]) -> SegmentedText:
+    """Normalize and join page texts, then split the buffer into sentence spans in a single pass."""
+    parts = []
+    page_offsets = array("q")
+    page_numbers = array("i")
+    offset = 0
+    for page_number, raw_text in enumerate(page_texts, start=1):
+        normalized = normalize_text(raw_text)
+        if not normalized:
+            continue
+        if parts:
+            offset += 1
+        page_offsets.append(offset)
+        page_numbers.append(page_number)
+        parts.append(normalized)
+        offset += len(normalized)
+
+    text = " ".join(parts)
+    starts, ends, pages = array("q"), array("q"), array("i")
+    page_cursor = 0
+
+    def add_span(start: int, end: int) -> None:
+        nonlocal page_cursor
+        if end <= start:
+            return
+        while page_cursor + 1 < len(page_offsets) and page_offsets[page_cursor + 1] <= start:
+            page_cursor += 1
+        starts.append(start)
+        ends.append(end)
+        pages.append(page_numbers[page_cursor] if page_numbers else 0)
+
+    position = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        add_span(position, match.start())
+        position = match.end()
+    add_span(position, len(text))
+
+    return SegmentedText(text, starts, ends, pages, page_numbers, page_offsets)
+
+
+def segment_text(text: str) -> SegmentedText:
+    return segment_pages([text])
+
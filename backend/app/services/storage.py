@@ -1,4 +1,5 @@
 import secrets
+import shutil
 from pathlib import Path
 from typing import Optional
 
@@ -30,6 +31,27 @@ async def save_upload_file(upload: UploadFile) -> Path:
     return file_path
 
 
+def store_local_file(source: Path) -> Path:
+    target_dir = settings.upload_dir
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    file_path = target_dir / _generate_filename(source.name)
+    shutil.copyfile(source, file_path)
+    return file_path
+
+
 def delete_file(path: Optional[Path]) -> None:
     if path and path.exists():
         path.unlink()
+
+
+def delete_export_bundle(bundle_path: Path) -> None:
+    """Remove a report bundle and the export folder it was written to, once that folder is empty."""
+    delete_file(bundle_path)
+    if bundle_path.parent == settings.export_dir:
+        return
+    try:
+        bundle_path.parent.rmdir()
+    except OSError:
+        # Timestamp folders from before the random suffix may hold bundles of other analyses.
+        pass
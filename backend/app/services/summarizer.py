@@ -1,19 +1,34 @@
 from __future__ import annotations
 
+import heapq
 import logging
-from typing import List
+import math
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 import nltk
+import numpy as np
 from nltk.corpus import stopwords
-from nltk.tokenize import sent_tokenize, word_tokenize
+from scipy import sparse
+from scipy.sparse.linalg import ArpackNoConvergence, svds
+
+from ..core.config import get_settings
+from .segmentation import SegmentedText, segment_text
 
 
 LOGGER = logging.getLogger(__name__)
+settings = get_settings()
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+DEFAULT_ENGINE = "frequency"
 
 
 def _ensure_nltk_data() -> None:
     resources = [
-        ("punkt", "tokenizers/punkt"),
         ("stopwords", "corpora/stopwords"),
     ]
     for resource, path in resources:
@@ -24,42 +39,220 @@ def _ensure_nltk_data() -> None:
             nltk.download(resource)
 
 
-def _rank_sentences(sentences: List[str], stop_words: List[str]) -> List[tuple[int, float]]:
-    word_freq = {}
-    for sentence in sentences:
-        words = word_tokenize(sentence.lower())
-        for word in words:
-            if word.isalpha() and word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
+@lru_cache(maxsize=1)
+def _stop_words() -> FrozenSet[str]:
+    _ensure_nltk_data()
+    return frozenset(stopwords.words("english"))
 
-    if not word_freq:
-        return [(index, 0.0) for index, _ in enumerate(sentences)]
 
-    max_freq = max(word_freq.values())
-    for word in word_freq:
-        word_freq[word] = word_freq[word] / max_freq
+class BudgetExceeded(Exception):
+    pass
 
-    sentence_scores = []
-    for index, sentence in enumerate(sentences):
-        words = word_tokenize(sentence.lower())
-        score = sum(word_freq.get(word, 0) for word in words)
-        sentence_scores.append((index, score))
 
-    return sentence_scores
+class Deadline:
+    """Cooperative time budget: engines call ``check`` between iterations and phases."""
 
+    __slots__ = ("expires_at",)
 
-def summarize_text(text: str, max_sentences: int = 5) -> str:
-    if not text:
-        return ""
+    def __init__(self, budget_ms: Optional[float]):
+        self.expires_at = time.perf_counter() + budget_ms / 1000 if budget_ms else math.inf
+
+    def check(self) -> None:
+        if time.perf_counter() > self.expires_at:
+            raise BudgetExceeded
+
+
+@dataclass
+class SentenceMatrix:
+    """Sparse sentence-by-term counts of the spans being summarized, built once and shared by every engine."""
+
+    counts: sparse.csr_matrix
+
+    @classmethod
+    def build(cls, segments: SegmentedText, indices: Sequence[int], stop_words: FrozenSet[str]) -> "SentenceMatrix":
+        text, starts, ends = segments.text, segments.starts, segments.ends
+        vocabulary: Dict[str, int] = {}
+        columns: List[int] = []
+        values: List[int] = []
+        indptr: List[int] = [0]
+        for index in indices:
+            row: Dict[int, int] = {}
+            for match in _WORD.finditer(text, starts[index], ends[index]):
+                word = match.group(0).lower()
+                if word in stop_words:
+                    continue
+                column = vocabulary.setdefault(word, len(vocabulary))
+                row[column] = row.get(column, 0) + 1
+            columns.extend(row)
+            values.extend(row.values())
+            indptr.append(len(columns))
+        counts = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float64), np.asarray(columns, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(indices), len(vocabulary)),
+        )
+        return cls(counts=counts)
+
+    @property
+    def sentence_count(self) -> int:
+        return self.counts.shape[0]
+
+    def binary(self) -> sparse.csr_matrix:
+        binary = self.counts.copy()
+        binary.data[:] = 1.0
+        return binary
+
+    def tfidf(self) -> sparse.csr_matrix:
+        document_frequency = np.bincount(self.counts.indices, minlength=self.counts.shape[1])
+        idf = np.log(self.sentence_count / np.maximum(document_frequency, 1)) + 1.0
+        return sparse.csr_matrix(self.counts.multiply(idf[np.newaxis, :]))
+
+
+def _l2_normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return sparse.csr_matrix(sparse.diags(inverse) @ matrix)
+
+
+def _frequency_scores(matrix: SentenceMatrix, deadline: Deadline) -> np.ndarray:
+    word_freq = np.asarray(matrix.counts.sum(axis=0)).ravel()
+    if not word_freq.size or word_freq.max() == 0:
+        return np.zeros(matrix.sentence_count)
+    return matrix.counts @ word_freq / word_freq.max()
+
+
+def _rank_graph(
+    normalized: sparse.csr_matrix,
+    deadline: Deadline,
+    damping: float = 0.85,
+    tolerance: float = 1e-6,
+    max_iterations: int = 100,
+) -> np.ndarray:
+    """PageRank over the cosine-similarity graph of ``normalized`` rows, without building the n x n matrix.
+
+    Similarities are ``S = N @ N.T`` minus self-loops, so each product ``S @ x`` is
+    evaluated as ``N @ (N.T @ x)`` at the cost of the non-zeros of ``N``.
+    """
+    n = normalized.shape[0]
+    transposed = sparse.csr_matrix(normalized.T)
+    self_similarity = np.asarray(normalized.multiply(normalized).sum(axis=1)).ravel()
+    degree = normalized @ (transposed @ np.ones(n)) - self_similarity
+    connected = degree > 1e-12
+    inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=connected)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        deadline.check()
+        weighted = scores * inverse_degree
+        spread = normalized @ (transposed @ weighted) - self_similarity * weighted
+        # Isolated sentences spread their mass uniformly instead of leaking it.
+        dangling = scores[~connected].sum()
+        updated = (1 - damping) / n + damping * (spread + dangling / n)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def _textrank_scores(matrix: SentenceMatrix, deadline: Deadline) -> np.ndarray:
+    return _rank_graph(_l2_normalize_rows(matrix.binary()), deadline)
 
-    _ensure_nltk_data()
 
-    sentences = sent_tokenize(text)
-    if len(sentences) <= max_sentences:
-        return " ".join(sentences)
+def _lexrank_scores(matrix: SentenceMatrix, deadline: Deadline) -> np.ndarray:
+    # Continuous LexRank: tf-idf cosine weights rather than a thresholded graph.
+    return _rank_graph(_l2_normalize_rows(matrix.tfidf()), deadline)
 
-    stop_words = stopwords.words("english")
-    ranked = sorted(_rank_sentences(sentences, stop_words), key=lambda item: item[1], reverse=True)
-    selected_indices = sorted(index for index, _ in ranked[:max_sentences])
-    summary_sentences = [sentences[index] for index in selected_indices]
-    return " ".join(summary_sentences)
+
+LSA_MAX_TOPICS = 5
+
+
+def _lsa_scores(matrix: SentenceMatrix, deadline: Deadline) -> np.ndarray:
+    term_sentence = sparse.csc_matrix(matrix.tfidf().T)
+    topics = min(LSA_MAX_TOPICS, min(term_sentence.shape) - 1)
+    if topics < 1:
+        return _frequency_scores(matrix, deadline)
+    deadline.check()
+    _, singular_values, sentence_topics = svds(term_sentence, k=topics)
+    deadline.check()
+    # Steinberger & Jezek sentence length in the reduced topic space.
+    return np.sqrt(((singular_values[:, np.newaxis] * sentence_topics) ** 2).sum(axis=0))
+
+
+@dataclass(frozen=True)
+class SummarizerEngine:
+    name: str
+    score: Callable[[SentenceMatrix, Deadline], np.ndarray]
+    # Cheaper engine used when this one runs out of budget; ``None`` marks an engine that always finishes.
+    fallback: Optional[str] = None
+
+
+ENGINES: Dict[str, SummarizerEngine] = {}
+
+
+def register_engine(engine: SummarizerEngine) -> None:
+    ENGINES[engine.name] = engine
+
+
+for _engine in (
+    SummarizerEngine("frequency", _frequency_scores),
+    SummarizerEngine("textrank", _textrank_scores, fallback="frequency"),
+    SummarizerEngine("lexrank", _lexrank_scores, fallback="textrank"),
+    SummarizerEngine("lsa", _lsa_scores, fallback="textrank"),
+):
+    register_engine(_engine)
+
+
+def select_sentences(
+    segments: SegmentedText,
+    indices: Sequence[int],
+    max_sentences: int,
+    engine: Optional[str] = None,
+    budget_ms: Optional[float] = None,
+) -> Tuple[str, List[int]]:
+    """Positions in ``indices`` of the top ``max_sentences`` sentences, in document order, and the engine that ranked them.
+
+    ``engine`` and ``budget_ms`` default to the application settings. An engine
+    that exceeds the budget hands over to its cheaper fallback with whatever
+    budget remains, ending at the frequency engine, which is never interrupted.
+    """
+    name = engine or settings.summarizer_engine
+    if name not in ENGINES:
+        LOGGER.warning("Unknown summarizer engine %r, using %s", name, DEFAULT_ENGINE)
+        name = DEFAULT_ENGINE
+    deadline = Deadline(settings.summarizer_budget_ms if budget_ms is None else budget_ms)
+    matrix = SentenceMatrix.build(segments, indices, _stop_words())
+
+    while True:
+        current = ENGINES[name]
+        try:
+            scores = current.score(matrix, deadline if current.fallback else Deadline(None))
+            break
+        except (BudgetExceeded, ArpackNoConvergence) as exc:
+            reason = "ran out of budget" if isinstance(exc, BudgetExceeded) else "did not converge"
+            LOGGER.info("%s summarizer %s on %s sentences; falling back to %s", name, reason, len(indices), current.fallback)
+            name = current.fallback
+
+    top_positions = heapq.nlargest(max_sentences, range(len(indices)), key=scores.__getitem__)
+    return name, sorted(top_positions)
+
+
+def summarize_spans(
+    segments: SegmentedText,
+    indices: Optional[Sequence[int]] = None,
+    max_sentences: int = 5,
+    engine: Optional[str] = None,
+    budget_ms: Optional[float] = None,
+) -> str:
+    """Extractive summary over a subset of sentence spans, without re-tokenizing or copying sentences."""
+    if indices is None:
+        indices = range(len(segments))
+    if len(indices) <= max_sentences:
+        return segments.join(indices)
+
+    _, positions = select_sentences(segments, indices, max_sentences, engine=engine, budget_ms=budget_ms)
+    return segments.join(indices[position] for position in positions)
+
+
+def summarize_text(text: str, max_sentences: int = 5, engine: Optional[str] = None) -> str:
+    if not text:
+        return ""
+    return summarize_spans(segment_text(text), max_sentences=max_sentences, engine=engine)
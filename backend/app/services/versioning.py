@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import fitz
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from ..models import AnalysisReport, DocumentPage
+from ..schemas import BOQRow, RuleConfig, SectionDiff, VersionDiff
+from .pdf_analyzer import SECTION_TITLES, PageSnapshot, PDFAnalysisResult, PDFAnalyzer
+from .rule_matchers import compile_rules
+from .segmentation import SegmentedText, normalize_text, segment_pages
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def page_hashes(pdf_path: Path) -> List[str]:
+    """One digest of the normalized text of every page, read through PyMuPDF.
+
+    MuPDF extracts text an order of magnitude faster than pdfplumber's layout
+    analysis, so hashing every page is cheap next to re-parsing the changed ones.
+    """
+    hashes: List[str] = []
+    with fitz.open(str(pdf_path)) as document:
+        for page in document:
+            text = normalize_text(page.get_text("text"))
+            hashes.append(hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest())
+    return hashes
+
+
+@dataclass
+class StoredPage:
+    page_number: int
+    text_hash: str
+    snapshot: PageSnapshot
+
+
+@dataclass
+class VersionBaseline:
+    """What is known about the previous version of a document: its pages and its latest analysis."""
+
+    document_id: int
+    analysis_id: Optional[int]
+    sections: Dict[str, Any]
+    boq_rows: List[Dict[str, Any]]
+    pages: List[StoredPage] = field(default_factory=list)
+
+    def _pages_by_hash(self) -> Dict[str, StoredPage]:
+        by_hash: Dict[str, StoredPage] = {}
+        for page in self.pages:
+            by_hash.setdefault(page.text_hash, page)
+        return by_hash
+
+    def known_pages(self, hashes: Sequence[str]) -> Dict[int, PageSnapshot]:
+        """Snapshots for the new version's pages, keyed by new page number, whose text hash already existed.
+
+        Matching is by hash rather than position, so an inserted corrigendum page
+        does not make every following page look changed.
+        """
+        by_hash = self._pages_by_hash()
+        return {
+            page_number: by_hash[text_hash].snapshot
+            for page_number, text_hash in enumerate(hashes, start=1)
+            if text_hash in by_hash
+        }
+
+    def merge_boq_rows(self, hashes: Sequence[str], new_rows: Sequence[BOQRow]) -> List[BOQRow]:
+        """Rows from unchanged pages of the previous version, renumbered, plus rows from re-extracted pages."""
+        by_hash = self._pages_by_hash()
+        renumbered: Dict[int, int] = {}
+        for page_number, text_hash in enumerate(hashes, start=1):
+            if text_hash in by_hash:
+                renumbered.setdefault(by_hash[text_hash].page_number, page_number)
+        rows = [
+            BOQRow(**{**row, "page": renumbered[row["page"]]})
+            for row in self.boq_rows
+            if row.get("page") in renumbered
+        ]
+        rows.extend(new_rows)
+        rows.sort(key=lambda row: row.page)
+        return rows
+
+    def diff(self, hashes: Sequence[str], result: PDFAnalysisResult, rule_config: RuleConfig) -> VersionDiff:
+        """Section-level changes between the previous version and ``result``.
+
+        Sentences on unchanged pages are identical in both versions, so only the
+        new version's changed pages and the previous version's vanished pages are
+        compared, both matched with the current rule config.
+        """
+        previous_hashes = {page.text_hash for page in self.pages}
+        current_hashes = set(hashes)
+        changed_pages = [number for number, text_hash in enumerate(hashes, start=1) if text_hash not in previous_hashes]
+        removed = [page for page in self.pages if page.text_hash not in current_hashes]
+
+        added_sentences: Dict[str, List[str]] = {}
+        removed_sentences: Dict[str, List[str]] = {}
+        if self.pages:  # without page records of the previous version only section-level changes are known
+            added_sentences = _matched_sentences_on_pages(result, set(changed_pages))
+            removed_sentences = _matched_sentences(segment_pages(page.snapshot.text for page in removed), rule_config)
+
+        sections: Dict[str, SectionDiff] = {}
+        for key in sorted(set(self.sections) | set(result.sections) | set(added_sentences) | set(removed_sentences)):
+            previous = self.sections.get(key)
+            current = result.sections.get(key)
+            previous_keywords = set(previous.get("keywords_found", [])) if previous else set()
+            current_keywords = set(current.keywords_found) if current else set()
+            # A sentence that merely moved to another page appears on both sides and is not a change.
+            before, after = removed_sentences.get(key, []), added_sentences.get(key, [])
+            before_set, after_set = set(before), set(after)
+            gained = [sentence for sentence in after if sentence not in before_set]
+            lost = [sentence for sentence in before if sentence not in after_set]
+
+            if previous is None and current is None:
+                if not gained and not lost:
+                    continue
+                status = "changed"  # matched clauses changed without crossing the confidence threshold
+            elif previous is None:
+                status = "added"
+            elif current is None:
+                status = "removed"
+            elif gained or lost or previous_keywords != current_keywords:
+                status = "changed"
+            else:
+                continue
+
+            sections[key] = SectionDiff(
+                title=SECTION_TITLES.get(key, key.replace("_", " ").title()),
+                status=status,
+                added_sentences=gained,
+                removed_sentences=lost,
+                added_keywords=sorted(current_keywords - previous_keywords, key=str.lower),
+                removed_keywords=sorted(previous_keywords - current_keywords, key=str.lower),
+                previous_summary=previous.get("summary") if previous else None,
+                summary=current.summary if current else None,
+            )
+
+        return VersionDiff(
+            previous_document_id=self.document_id,
+            previous_analysis_id=self.analysis_id,
+            changed_pages=changed_pages,
+            removed_pages=[page.page_number for page in removed],
+            reused_pages=len(hashes) - len(changed_pages),
+            sections=sections,
+        )
+
+
+def _matched_sentences_on_pages(result: PDFAnalysisResult, page_numbers: Set[int]) -> Dict[str, List[str]]:
+    segments = result.segments
+    if segments is None or not page_numbers:
+        return {}
+    sentences: Dict[str, List[str]] = {}
+    for key, match in result.matches.items():
+        kept = [segments.sentence(index) for index in match.sentence_indices if segments.pages[index] in page_numbers]
+        if kept:
+            sentences[key] = kept
+    return sentences
+
+
+def _matched_sentences(segments: SegmentedText, rule_config: RuleConfig) -> Dict[str, List[str]]:
+    if not len(segments):
+        return {}
+    matches = PDFAnalyzer(rule_config).match_sections(segments)
+    return {key: list(segments.sentences(match.sentence_indices)) for key, match in matches.items()}
+
+
+def load_baseline(db: Session, document_id: int) -> Optional[VersionBaseline]:
+    """Pages and latest analysis of ``document_id``; ``None`` until that version has been analyzed."""
+    analysis = (
+        db.query(AnalysisReport)
+        .filter(AnalysisReport.document_id == document_id, AnalysisReport.preview_pages.is_(None))
+        .order_by(AnalysisReport.id.desc())
+        .first()
+    )
+    if analysis is None:
+        return None
+    scanned = compile_rules(RuleConfig(**(analysis.rule_config or {}))).scanned_keywords
+    rows = db.query(DocumentPage).filter(DocumentPage.document_id == document_id).order_by(DocumentPage.page_number)
+    pages = [
+        StoredPage(
+            page_number=row.page_number,
+            text_hash=row.text_hash,
+            snapshot=PageSnapshot(text=row.text or "", keyword_hits=row.keyword_hits or {}, scanned_keywords=scanned),
+        )
+        for row in rows
+    ]
+    if not pages:
+        LOGGER.info("Document %s has no page records; its next version is analyzed in full", document_id)
+    return VersionBaseline(
+        document_id=document_id,
+        analysis_id=analysis.id,
+        sections=analysis.sections or {},
+        boq_rows=analysis.boq_rows or [],
+        pages=pages,
+    )
+
+
+def replace_document_pages(db: Session, document_id: int, hashes: Sequence[str], snapshots: Sequence[PageSnapshot]) -> None:
+    db.execute(delete(DocumentPage).where(DocumentPage.document_id == document_id))
+    rows = [
+        {
+            "document_id": document_id,
+            "page_number": page_number,
+            "text_hash": text_hash,
+            "text": snapshot.text,
+            "keyword_hits": snapshot.keyword_hits,
+        }
+        for page_number, (text_hash, snapshot) in enumerate(zip(hashes, snapshots), start=1)
+    ]
+    if rows:
+        db.execute(insert(DocumentPage), rows)
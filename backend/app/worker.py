@@ -0,0 +1,130 @@
+"""Standalone analysis worker: ``python -m app.worker --concurrency 4``.
+
+Each worker process leases jobs from the ``analysis_jobs`` table, keeps the lease
+alive with heartbeats while the PDF is parsed, and hands failed or abandoned jobs
+back to the queue. Workers on several hosts can share one PostgreSQL database and
+storage volume; a single host can run against SQLite.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from typing import List, Optional
+
+from .core.config import get_settings
+from .core.database import engine, session_scope
+from .core.migrations import upgrade_database
+from .services.analysis_runner import execute_document_analysis
+from .services.job_queue import ClaimedJob, LeaseLost, claim_next_job, complete_job, confirm_lease, fail_job, heartbeat, job_progress_callback
+
+
+LOGGER = logging.getLogger("gem_analyzer.worker")
+settings = get_settings()
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, job_id: int, worker_id: str, lease_seconds: int):
+        super().__init__(name=f"heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+        self.lease_lost = False
+
+    def run(self) -> None:
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self.stopped.wait(interval):
+            try:
+                with session_scope() as db:
+                    if not heartbeat(db, self.job_id, self.worker_id, self.lease_seconds):
+                        self.lease_lost = True
+                        LOGGER.warning("Worker %s lost the lease on job %s", self.worker_id, self.job_id)
+                        return
+            except Exception:  # pragma: no cover - transient database errors are retried on the next beat
+                LOGGER.exception("Heartbeat failed for job %s", self.job_id)
+
+
+def _process_job(job: ClaimedJob, worker_id: str, lease_seconds: int) -> None:
+    LOGGER.info("Worker %s processing job %s (document %s, attempt %s)", worker_id, job.id, job.document_id, job.attempts)
+    beat = _Heartbeat(job.id, worker_id, lease_seconds)
+    beat.start()
+    try:
+        execute_document_analysis(
+            job.document_id,
+            job.rule_config,
+            job.owner_email,
+            job_progress_callback(job.id, worker_id),
+            job_id=job.id,
+            lease_check=lambda db: confirm_lease(db, job.id, worker_id, lease_seconds),
+        )
+    except LeaseLost:
+        # Another worker reclaimed the job after a stall (GC pause, partition); it owns the result now.
+        LOGGER.warning("Worker %s discarded its result for job %s after losing the lease", worker_id, job.id)
+    except Exception as exc:
+        LOGGER.exception("Job %s failed on worker %s", job.id, worker_id)
+        with session_scope() as db:
+            final = fail_job(db, job.id, worker_id, f"{exc.__class__.__name__}: {exc}", settings.job_retry_delay_seconds)
+        if not final:
+            LOGGER.info("Job %s re-queued for another attempt", job.id)
+    else:
+        with session_scope() as db:
+            complete_job(db, job.id, worker_id)
+    finally:
+        beat.stopped.set()
+        beat.join()
+
+
+def run_worker(worker_id: str, stop: "multiprocessing.synchronize.Event", poll_interval: float, lease_seconds: int) -> None:
+    # Connections inherited from the parent must not be reused across a fork.
+    engine.dispose(close=False)
+    LOGGER.info("Worker %s started", worker_id)
+    while not stop.is_set():
+        try:
+            with session_scope() as db:
+                job = claim_next_job(db, worker_id, lease_seconds)
+        except Exception:  # pragma: no cover - e.g. database briefly unavailable
+            LOGGER.exception("Worker %s could not claim a job", worker_id)
+            job = None
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        _process_job(job, worker_id, lease_seconds)
+    LOGGER.info("Worker %s stopped", worker_id)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run analysis workers that lease jobs from the database queue.")
+    parser.add_argument("--concurrency", type=int, default=settings.worker_concurrency, help="worker processes on this host")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}", help="prefix for lease owner ids")
+    parser.add_argument("--poll-interval", type=float, default=settings.worker_poll_interval_seconds)
+    parser.add_argument("--lease-seconds", type=int, default=settings.job_lease_seconds)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    upgrade_database()
+
+    stop = multiprocessing.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    processes = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(f"{args.worker_id}-{index}", stop, args.poll_interval, args.lease_seconds),
+            name=f"analysis-worker-{index}",
+        )
+        for index in range(max(1, args.concurrency))
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Compare the legacy pydantic document listing with cached orjson fragments.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_listing --documents 1000
+
+An in-memory SQLite database is filled with documents that each carry one
+analysis. The legacy path builds ``DocumentListResponse`` models and encodes them
+with ``json.dumps``; the fragment path is what ``GET /documents`` now serves,
+measured with a cold and a warm payload cache. Payload sizes are reported raw,
+gzip-compressed and brotli-compressed at the configured levels.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import time
+from typing import Callable, List, Tuple
+
+import brotli
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import get_settings
+from app.models import AnalysisReport, Base, Document, User
+from app.schemas import AnalysisResult, DocumentListResponse, DocumentRead, RuleConfig, SectionInsight
+from app.services.analysis_runner import build_highlights
+from app.services.document_payloads import document_fragments, join_fragments, payload_cache
+
+
+def build_database(document_count: int, seed: int = 7) -> Session:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(seed)
+    rule_config = RuleConfig().model_dump()
+
+    user = User(email="bench@example.com", full_name="Bench", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for index in range(document_count):
+        document = Document(
+            owner_id=user.id,
+            original_filename=f"tender-{index:05d}.pdf",
+            stored_filename=f"stored-{index:05d}.pdf",
+            content_type="application/pdf",
+            file_size=rng.randint(100_000, 5_000_000),
+            status="completed",
+            rule_config=rule_config,
+        )
+        db.add(document)
+        db.flush()
+        sections = {
+            key: {
+                "title": key.replace("_", " ").title(),
+                "summary": " ".join(f"Clause {rng.randint(1, 99)} on {keyword}." for keyword in config["keywords"]),
+                "importance_score": round(rng.random(), 3),
+                "keywords_found": config["keywords"][:2],
+            }
+            for key, config in rule_config.items()
+        }
+        db.add(
+            AnalysisReport(
+                document_id=document.id,
+                summary="Tender summary. " * 20,
+                highlights=build_highlights(sections),
+                sections=sections,
+                boq_rows=[],
+                rule_config=rule_config,
+                zip_path="bundle.zip",
+                export_path="bundle",
+            )
+        )
+    db.commit()
+    return db
+
+
+def legacy_listing(db: Session) -> bytes:
+    """The pre-fragment implementation: one latest-analysis query and one pydantic model per document."""
+    items = []
+    for doc in db.query(Document).order_by(Document.uploaded_at.desc()).all():
+        latest = (
+            db.query(AnalysisReport)
+            .filter(AnalysisReport.document_id == doc.id)
+            .order_by(AnalysisReport.created_at.desc())
+            .first()
+        )
+        analysis = None
+        if latest:
+            analysis = AnalysisResult(
+                document_id=doc.id,
+                analysis_id=latest.id,
+                summary=latest.summary,
+                highlights=latest.highlights,
+                sections={key: SectionInsight(**value) for key, value in latest.sections.items()},
+                boq_rows=latest.boq_rows or [],
+                created_at=latest.created_at,
+            )
+        items.append(
+            DocumentRead(
+                id=doc.id,
+                original_filename=doc.original_filename,
+                uploaded_at=doc.uploaded_at,
+                status=doc.status,
+                latest_analysis=analysis,
+            )
+        )
+    payload = DocumentListResponse(items=items, total=len(items))
+    return json.dumps(payload.model_dump(mode="json")).encode("utf-8")
+
+
+def fragment_listing(db: Session) -> bytes:
+    documents = db.query(Document).order_by(Document.uploaded_at.desc()).all()
+    fragments = document_fragments(db, documents)
+    return b'{"items":%s,"total":%d,"cursor":%d}' % (join_fragments(fragments), len(fragments), 0)
+
+
+def measure(label: str, func: Callable[[], bytes], repeat: int) -> Tuple[str, float, bytes]:
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        best = min(best, time.perf_counter() - started)
+    return label, best, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    db = build_database(args.documents)
+    db.expire_all()
+
+    def cold() -> bytes:
+        payload_cache.clear()
+        db.expire_all()
+        return fragment_listing(db)
+
+    def warm() -> bytes:
+        db.expire_all()
+        return fragment_listing(db)
+
+    def legacy() -> bytes:
+        db.expire_all()
+        return legacy_listing(db)
+
+    results: List[Tuple[str, float, bytes]] = [
+        measure("pydantic + json.dumps", legacy, args.repeat),
+        measure("orjson fragments (cold)", cold, args.repeat),
+        measure("orjson fragments (warm)", warm, args.repeat),
+    ]
+    print(f"{args.documents} documents, best of {args.repeat}")
+    print(f"{'serializer':<28}{'time (ms)':>12}")
+    for label, elapsed, _ in results:
+        print(f"{label:<28}{elapsed * 1000:>12.1f}")
+
+    body = results[-1][2]
+    print(f"\n{'encoding':<28}{'bytes':>12}")
+    print(f"{'identity':<28}{len(body):>12}")
+    print(f"{f'gzip (level {settings.gzip_level})':<28}{len(gzip.compress(body, compresslevel=settings.gzip_level)):>12}")
+    print(f"{f'brotli (quality {settings.brotli_quality})':<28}{len(brotli.compress(body, quality=settings.brotli_quality)):>12}")
+
+
+if __name__ == "__main__":
+    main()
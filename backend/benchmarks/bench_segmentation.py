@@ -0,0 +1,124 @@
+"""Compare the legacy double tokenization with offset-based sentence spans.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_segmentation --pages 1000
+
+Both pipelines match every default rule section and summarize the matches over
+the same synthetic tender; wall time comes from ``perf_counter`` and peak
+allocations from ``tracemalloc``.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.tokenize import sent_tokenize, word_tokenize
+
+from app.schemas import RuleConfig
+from app.services.pdf_analyzer import PDFAnalyzer
+from app.services.segmentation import segment_pages
+from app.services.summarizer import _ensure_nltk_data
+
+
+FILLER = (
+    "The bidder shall furnish all documents as per the terms of the contract",
+    "Payment will be released after satisfactory inspection by the consignee",
+    "The buyer reserves the right to cancel the bid without assigning reasons",
+    "All items must be delivered within the stipulated delivery period",
+    "The seller shall provide warranty support for the complete duration",
+)
+
+
+def build_pages(page_count: int, sentences_per_page: int = 40, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    keywords = [keyword for section in RuleConfig().model_dump().values() for keyword in section["keywords"]]
+    pages = []
+    for _ in range(page_count):
+        sentences = []
+        for _ in range(sentences_per_page):
+            sentence = rng.choice(FILLER)
+            if rng.random() < 0.3:
+                sentence = f"{sentence} including {rng.choice(keywords)} clause {rng.randint(1, 99)}"
+            sentences.append(sentence + ".")
+        pages.append("\n".join(sentences))
+    return pages
+
+
+def legacy_pipeline(pages: List[str], rule_config: RuleConfig) -> Dict[str, str]:
+    """The pre-span implementation: regex split, lowercase copies, then ``sent_tokenize`` per section."""
+    text = re.sub(r"\s+", " ", "\n".join(pages)).strip()
+    sentences = [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+", text) if sentence.strip()]
+    stop_words = stopwords.words("english")
+    summaries: Dict[str, str] = {}
+    for key, config in rule_config.model_dump().items():
+        patterns = [re.compile(rf"\b{re.escape(keyword)}\b", re.IGNORECASE) for keyword in config["keywords"]]
+        matched = [sentence for sentence in sentences if any(pattern.search(sentence.lower()) for pattern in patterns)]
+        if not matched:
+            continue
+        section_sentences = sent_tokenize(" ".join(matched))
+        word_freq: Dict[str, int] = {}
+        for sentence in section_sentences:
+            for word in word_tokenize(sentence.lower()):
+                if word.isalpha() and word not in stop_words:
+                    word_freq[word] = word_freq.get(word, 0) + 1
+        max_freq = max(word_freq.values()) if word_freq else 1
+        scored = [
+            (index, sum(word_freq.get(word, 0) / max_freq for word in word_tokenize(sentence.lower())))
+            for index, sentence in enumerate(section_sentences)
+        ]
+        top = sorted(index for index, _ in sorted(scored, key=lambda item: item[1], reverse=True)[:4])
+        summaries[key] = " ".join(section_sentences[index] for index in top)
+    return summaries
+
+
+def span_pipeline(pages: List[str], rule_config: RuleConfig) -> Dict[str, str]:
+    segments = segment_pages(pages)
+    sections = PDFAnalyzer(rule_config).analyze_segments(segments)
+    return {key: insight.summary for key, insight in sections.items()}
+
+
+def measure(label: str, func: Callable[[], Dict[str, str]]) -> Tuple[str, float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return label, elapsed, peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--sentences-per-page", type=int, default=40)
+    args = parser.parse_args()
+
+    _ensure_nltk_data()
+    try:
+        nltk.data.find("tokenizers/punkt")
+    except LookupError:
+        nltk.download("punkt")  # only the legacy pipeline still needs it
+    pages = build_pages(args.pages, args.sentences_per_page)
+    rule_config = RuleConfig()
+    segments = segment_pages(pages)
+    print(f"{args.pages} pages, {len(segments)} sentences, {len(segments.text) / 1e6:.1f}M characters")
+    print(f"span arrays: {segments.nbytes() / 1024:.0f} KiB")
+
+    results = [
+        measure("legacy (split + sent_tokenize)", lambda: legacy_pipeline(pages, rule_config)),
+        measure("offset spans", lambda: span_pipeline(pages, rule_config)),
+    ]
+    print(f"{'pipeline':<32}{'time (s)':>10}{'peak MiB':>10}")
+    for label, elapsed, peak in results:
+        print(f"{label:<32}{elapsed:>10.2f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare summarizer engines on latency and on how much their selections overlap.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_summarizers --pages 200 --budget-ms 250
+
+Every registered engine summarizes the same synthetic tender twice: once over a
+section's matched sentences and once over the whole document. Latency is the
+best of ``--repeat`` unbudgeted runs; overlap is the Jaccard index of the chosen
+sentences. With sumy importable, its reference TextRank/LexRank/LSA are timed on
+the same sentences for comparison. A last pass reports which engine actually
+answered under ``--budget-ms``.
+
+sumy's TextRank and LexRank compare every sentence pair in pure Python: about 4 s
+and 6 s for 800 sentences, so the 8,000-sentence default document takes hours.
+Pass ``--no-sumy`` at that size and compare against sumy with ``--pages 20``.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Sequence, Set, Tuple
+
+from app.schemas import RuleConfig
+from app.services.pdf_analyzer import PDFAnalyzer
+from app.services.segmentation import SegmentedText, segment_pages
+from app.services.summarizer import ENGINES, _stop_words, select_sentences
+
+from .bench_segmentation import build_pages
+
+
+def run_engine(segments: SegmentedText, indices: Sequence[int], engine: str, sentences: int, repeat: int) -> Tuple[float, Set[str]]:
+    best = float("inf")
+    positions: List[int] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _, positions = select_sentences(segments, indices, sentences, engine=engine, budget_ms=0)
+        best = min(best, time.perf_counter() - started)
+    return best, {segments.sentence(indices[position]) for position in positions}
+
+
+def run_sumy(segments: SegmentedText, indices: Sequence[int], sentences: int) -> Dict[str, Tuple[float, Set[str]]]:
+    try:
+        from sumy.models.dom import ObjectDocumentModel, Paragraph, Sentence
+        from sumy.nlp.stemmers import null_stemmer
+        from sumy.nlp.tokenizers import Tokenizer
+        from sumy.summarizers.lex_rank import LexRankSummarizer
+        from sumy.summarizers.lsa import LsaSummarizer
+        from sumy.summarizers.text_rank import TextRankSummarizer
+    except ImportError:
+        return {}
+
+    # Feed sumy the same sentence spans so only the ranking differs, not sentence splitting.
+    tokenizer = Tokenizer("english")
+    document = ObjectDocumentModel([Paragraph([Sentence(segments.sentence(index), tokenizer) for index in indices])])
+    results: Dict[str, Tuple[float, Set[str]]] = {}
+    for label, summarizer_class in (("sumy textrank", TextRankSummarizer), ("sumy lexrank", LexRankSummarizer), ("sumy lsa", LsaSummarizer)):
+        summarizer = summarizer_class(null_stemmer)
+        summarizer.stop_words = _stop_words()
+        started = time.perf_counter()
+        chosen = summarizer(document, sentences)
+        results[label] = (time.perf_counter() - started, {str(sentence) for sentence in chosen})
+    return results
+
+
+def jaccard(left: Set[str], right: Set[str]) -> float:
+    return len(left & right) / len(left | right) if left or right else 1.0
+
+
+def report(title: str, segments: SegmentedText, indices: Sequence[int], args: argparse.Namespace) -> None:
+    print(f"\n== {title}: {len(indices)} sentences, top {args.sentences} ==")
+    results = {name: run_engine(segments, indices, name, args.sentences, args.repeat) for name in ENGINES}
+    if args.sumy:
+        results.update(run_sumy(segments, indices, args.sentences))
+
+    names = list(results)
+    print(f"{'engine':<16}{'latency (ms)':>14}")
+    for name in names:
+        print(f"{name:<16}{results[name][0] * 1000:>14.1f}")
+
+    print("\noverlap (Jaccard)")
+    print(" " * 16 + "".join(f"{name[:10]:>12}" for name in names))
+    for row in names:
+        print(f"{row:<16}" + "".join(f"{jaccard(results[row][1], results[column][1]):>12.2f}" for column in names))
+
+    answered = {name: select_sentences(segments, indices, args.sentences, engine=name, budget_ms=args.budget_ms)[0] for name in ENGINES}
+    print(f"\nunder a {args.budget_ms:g} ms budget: " + ", ".join(f"{name} -> {used}" for name, used in answered.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--sentences-per-page", type=int, default=40)
+    parser.add_argument("--sentences", type=int, default=8, help="sentences per summary")
+    parser.add_argument("--section", default="eligibility", help="rule section whose matches form the section scenario")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("--no-sumy", dest="sumy", action="store_false", help="skip the sumy reference implementations")
+    args = parser.parse_args()
+
+    segments = segment_pages(build_pages(args.pages, args.sentences_per_page))
+    matches = PDFAnalyzer(RuleConfig()).match_sections(segments)
+    section = matches.get(args.section)
+    if section is not None:
+        report(f"section '{args.section}'", segments, section.sentence_indices, args)
+    report("whole document", segments, range(len(segments)), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+"""Drive a local API instance with mixed traffic and report per-endpoint latency.
+
+Run from ``backend/``::
+
+    python -m benchmarks.load_test --users 20 --duration 60 --output results.json
+
+A uvicorn server is started on a throwaway SQLite database and storage directory,
+with SMTP pointed at an in-process stand-in that accepts and discards mail. Each
+virtual user registers, logs in, and then loops over a weighted mix of listing,
+change polling, tender uploads, bundle downloads, email dispatch and re-login,
+pausing for an exponential think time between requests. Uploads draw from a
+pre-rendered pool of short, standard and large synthetic tenders so PDF
+generation never competes with the server for CPU.
+
+Throughput, p50/p95/p99 latency and error rates are printed per endpoint. Upload
+rejections from admission control (503) are counted as shed load rather than
+errors. ``--output`` writes the same figures as JSON, and ``--compare`` prints
+the deltas against an earlier results file. The server's event-loop lag over
+the measured window (``/health/loop``) is reported alongside, which is where
+blocking work on async request paths shows up. Pass ``--base-url`` to target an
+already running server instead; the SMTP stand-in is then only useful if that
+server is configured to use it.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+import httpx
+
+from .bench_segmentation import build_pages
+
+
+API_PREFIX = "/api/v1"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# (label, share of uploads, pages, BOQ grid pages)
+TENDER_MIX: Tuple[Tuple[str, float, int, int], ...] = (
+    ("short", 0.5, 3, 0),
+    ("standard", 0.35, 12, 1),
+    ("large", 0.15, 40, 3),
+)
+
+# Relative weight of each operation in a virtual user's loop.
+OPERATION_MIX: Dict[str, float] = {
+    "list": 40,
+    "changes": 20,
+    "upload": 12,
+    "download": 15,
+    "email": 5,
+    "login": 8,
+}
+
+
+class SmtpSink:
+    """Just enough SMTP for ``smtplib.SMTP.send_message`` without TLS; messages are counted and dropped."""
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.bytes = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"220 loadtest ESMTP\r\n")
+        try:
+            while True:
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                verb = line[:4].upper()
+                if verb == b"EHLO":
+                    writer.write(b"250-loadtest\r\n250 SIZE 268435456\r\n")
+                elif verb == b"DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk == b".\r\n":
+                            break
+                        self.bytes += len(chunk)
+                    self.messages += 1
+                    writer.write(b"250 OK queued\r\n")
+                elif verb == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"250 OK\r\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def render_tender(pages: Sequence[str], boq_pages: int, rng: random.Random) -> bytes:
+    document = fitz.open()
+    for text in pages:
+        page = document.new_page()
+        page.insert_textbox(page.rect + (54, 54, -54, -54), text, fontsize=9)
+    for _ in range(boq_pages):
+        page = document.new_page()
+        page.insert_text((54, 60), "Bill of Quantity", fontsize=12)
+        columns = (54, 94, 334, 414, 494, 554)
+        top, row_height = 80, 18
+        rows = [("S.No", "Item description", "Quantity", "Unit", "Rate")]
+        rows += [
+            (str(index), f"Item {rng.randint(100, 999)} as per specification", str(rng.randint(1, 500)), "Nos", f"{rng.uniform(10, 9999):.2f}")
+            for index in range(1, rng.randint(8, 25))
+        ]
+        bottom = top + row_height * len(rows)
+        for x in columns:
+            page.draw_line((x, top), (x, bottom))
+        for row_index, row in enumerate(rows):
+            y = top + row_height * row_index
+            page.draw_line((columns[0], y), (columns[-1], y))
+            for x, value in zip(columns, row):
+                page.insert_text((x + 3, y + 12), value, fontsize=8)
+        page.draw_line((columns[0], bottom), (columns[-1], bottom))
+    return document.tobytes()
+
+
+def build_tender_pool(variants: int, seed: int) -> Dict[str, List[bytes]]:
+    rng = random.Random(seed)
+    pool: Dict[str, List[bytes]] = {}
+    for label, _, page_count, boq_pages in TENDER_MIX:
+        pool[label] = [
+            render_tender(build_pages(page_count, sentences_per_page=30, seed=rng.randint(0, 2**31)), boq_pages, rng)
+            for _ in range(variants)
+        ]
+    return pool
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Linear interpolation between closest ranks, as ``numpy.percentile`` does by default."""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+    shed: int = 0
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 3) if elapsed else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "shed_rate": round(self.shed / count, 4) if count else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        stats = self.endpoints[endpoint]
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+        except httpx.HTTPError as exc:
+            stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+            stats.statuses[type(exc).__name__] += 1
+            stats.errors += 1
+            return None
+        stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+        stats.statuses[str(response.status_code)] += 1
+        if endpoint == "upload" and response.status_code == 503:
+            stats.shed += 1
+        elif response.status_code >= 400:
+            stats.errors += 1
+        return response
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        index: int,
+        run_id: str,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        pool: Dict[str, List[bytes]],
+        rng: random.Random,
+        operation_mix: Dict[str, float] = OPERATION_MIX,
+    ):
+        self.email = f"load-{run_id}-{index}@example.com"
+        self.password = f"load-test-{index:04d}"
+        self.client = client
+        self.recorder = recorder
+        self.pool = pool
+        self.rng = rng
+        self.operation_mix = operation_mix
+        self.cursor = 0
+        self.document_ids: List[int] = []
+        self.analysis_ids: Dict[int, int] = {}
+
+    async def register(self) -> bool:
+        response = await self.recorder.request(
+            self.client,
+            "register",
+            "POST",
+            f"{API_PREFIX}/auth/register",
+            json={"email": self.email, "password": self.password, "full_name": "Load Test", "organization": "Load Test"},
+        )
+        return response is not None and response.status_code in (201, 400)
+
+    async def login(self) -> bool:
+        response = await self.recorder.request(
+            self.client,
+            "login",
+            "POST",
+            f"{API_PREFIX}/auth/login",
+            data={"username": self.email, "password": self.password},
+        )
+        if response is None or response.status_code != 200:
+            return False
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        return True
+
+    def _remember(self, items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            if item["id"] not in self.document_ids:
+                self.document_ids.append(item["id"])
+            if item.get("latest_analysis"):
+                self.analysis_ids[item["id"]] = item["latest_analysis"]["analysis_id"]
+
+    async def list_documents(self) -> None:
+        response = await self.recorder.request(self.client, "list", "GET", f"{API_PREFIX}/documents")
+        if response is not None and response.status_code == 200:
+            payload = response.json()
+            self.cursor = payload.get("cursor", self.cursor)
+            self._remember(payload["items"])
+
+    async def poll_changes(self) -> None:
+        response = await self.recorder.request(
+            self.client, "changes", "GET", f"{API_PREFIX}/documents/changes", params={"since": self.cursor}
+        )
+        if response is not None and response.status_code == 200:
+            payload = response.json()
+            self.cursor = payload["cursor"]
+            self._remember(payload["items"])
+            for document_id in payload["deleted"]:
+                self.analysis_ids.pop(document_id, None)
+
+    async def upload(self) -> None:
+        labels = [label for label, _, _, _ in TENDER_MIX]
+        weights = [share for _, share, _, _ in TENDER_MIX]
+        label = self.rng.choices(labels, weights)[0]
+        body = self.rng.choice(self.pool[label])
+        response = await self.recorder.request(
+            self.client,
+            "upload",
+            "POST",
+            f"{API_PREFIX}/documents/analyze",
+            files={"file": (f"{label}-tender.pdf", body, "application/pdf")},
+        )
+        if response is not None and response.status_code == 202:
+            self.document_ids.append(response.json()["document_id"])
+
+    async def download(self) -> None:
+        if not self.analysis_ids:
+            await self.poll_changes()
+            return
+        document_id = self.rng.choice(list(self.analysis_ids))
+        await self.recorder.request(self.client, "download", "GET", f"{API_PREFIX}/documents/{document_id}/download")
+
+    async def email(self) -> None:
+        if not self.analysis_ids:
+            await self.poll_changes()
+            return
+        analysis_id = self.rng.choice(list(self.analysis_ids.values()))
+        await self.recorder.request(
+            self.client,
+            "email",
+            "POST",
+            f"{API_PREFIX}/documents/{analysis_id}/email",
+            params={"recipients": "procurement@example.com"},
+        )
+
+    async def run(self, deadline: float, think_ms: float) -> None:
+        operations = {
+            "list": self.list_documents,
+            "changes": self.poll_changes,
+            "upload": self.upload,
+            "download": self.download,
+            "email": self.email,
+            "login": self.login,
+        }
+        names = [name for name, weight in self.operation_mix.items() if weight > 0]
+        weights = [self.operation_mix[name] for name in names]
+        while time.perf_counter() < deadline:
+            await operations[self.rng.choices(names, weights)[0]]()
+            if think_ms > 0:
+                await asyncio.sleep(self.rng.expovariate(1000 / think_ms))
+
+
+async def wait_until_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"server at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+async def loop_lag(base_url: str, reset: bool = False) -> Optional[Dict[str, Any]]:
+    """Event-loop lag from ``/health/loop``; with several uvicorn workers this is whichever one answers."""
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        try:
+            response = await client.get("/health/loop", params={"reset": str(reset).lower()})
+        except httpx.HTTPError:
+            return None
+    return response.json() if response.status_code == 200 else None
+
+
+async def start_server(port: int, workers: int, smtp_port: int, workdir: Path, extra_env: Dict[str, str]) -> asyncio.subprocess.Process:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir / 'loadtest.db'}",
+        "UPLOAD_DIR": str(workdir / "uploads"),
+        "EXPORT_DIR": str(workdir / "exports"),
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USE_TLS": "false",
+        **extra_env,
+    }
+    return await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    print("rendering synthetic tenders ...", flush=True)
+    pool = build_tender_pool(args.tender_variants, args.seed)
+    sink = SmtpSink()
+    smtp_port = await sink.start()
+    server: Optional[asyncio.subprocess.Process] = None
+    workdir = tempfile.TemporaryDirectory(prefix="gem-loadtest-")
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            extra_env = dict(item.split("=", 1) for item in args.env)
+            server = await start_server(args.port, args.workers, smtp_port, Path(workdir.name), extra_env)
+            base_url = f"http://127.0.0.1:{args.port}"
+        await wait_until_healthy(base_url)
+
+        recorder = Recorder()
+        operation_mix = {**OPERATION_MIX, **{name: float(weight) for name, weight in (item.split("=", 1) for item in args.weight)}}
+        run_id = f"{int(time.time())}-{os.getpid()}"
+        limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users)
+        clients = [httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) for _ in range(args.users)]
+        users = [
+            VirtualUser(index, run_id, client, recorder, pool, random.Random(args.seed + index), operation_mix)
+            for index, client in enumerate(clients)
+        ]
+        try:
+            print(f"registering {len(users)} users ...", flush=True)
+            await asyncio.gather(*(user.register() for user in users))
+            ready = [user for user, ok in zip(users, await asyncio.gather(*(user.login() for user in users))) if ok]
+            if not ready:
+                raise RuntimeError("no virtual user could log in")
+
+            print(f"running {len(ready)} users for {args.duration:.0f}s ...", flush=True)
+            await loop_lag(base_url, reset=True)
+            started = time.perf_counter()
+            deadline = started + args.duration
+
+            async def staggered(user: VirtualUser, delay: float) -> None:
+                await asyncio.sleep(delay)
+                await user.run(deadline, args.think_ms)
+
+            ramp = min(args.ramp, args.duration)
+            await asyncio.gather(*(staggered(user, ramp * index / len(ready)) for index, user in enumerate(ready)))
+            elapsed = time.perf_counter() - started
+            lag = await loop_lag(base_url)
+        finally:
+            await asyncio.gather(*(client.aclose() for client in clients))
+    finally:
+        if server is not None:
+            server.terminate()
+            await server.wait()
+        await sink.stop()
+        workdir.cleanup()
+
+    endpoints = {name: stats.summary(elapsed) for name, stats in sorted(recorder.endpoints.items())}
+    measured = {name: stats for name, stats in recorder.endpoints.items() if name != "register"}
+    total = EndpointStats()
+    for stats in measured.values():
+        total.latencies_ms.extend(stats.latencies_ms)
+        total.errors += stats.errors
+        total.shed += stats.shed
+        for code, count in stats.statuses.items():
+            total.statuses[code] += count
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_url": base_url if args.base_url else "local",
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_ms": args.think_ms,
+            "workers": args.workers,
+            "seed": args.seed,
+            "operation_mix": operation_mix,
+            "tender_mix": {label: {"share": share, "pages": pages, "boq_pages": boq} for label, share, pages, boq in TENDER_MIX},
+            "emails_delivered": sink.messages,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "event_loop_lag": lag,
+        "total": total.summary(elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"\n{results['elapsed_s']:.1f}s, {results['meta']['users']} users, revision {results['meta']['revision'] or 'unknown'}")
+    header = f"{'endpoint':<12}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}{'shed':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(results["endpoints"].items()) + [("total", results["total"])]
+    for name, stats in rows:
+        print(
+            f"{name:<12}{stats['requests']:>10}{stats['throughput_rps']:>10.1f}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['error_rate']:>9.1%}{stats['shed_rate']:>8.1%}"
+        )
+    lag = results.get("event_loop_lag")
+    if lag:
+        print(
+            f"\nevent-loop lag over {lag['window_samples']} samples: p50 {lag['p50_ms']:.1f} ms, "
+            f"p95 {lag['p95_ms']:.1f} ms, p99 {lag['p99_ms']:.1f} ms, max {lag['max_ms']:.1f} ms"
+        )
+    print(f"\nstand-in SMTP accepted {results['meta']['emails_delivered']} messages")
+
+
+def print_comparison(baseline: Dict[str, Any], results: Dict[str, Any]) -> None:
+    print(f"\nagainst {baseline['meta'].get('revision') or 'baseline'} ({baseline['meta'].get('timestamp', '?')})")
+    header = f"{'endpoint':<12}{'req/s':>12}{'p50':>12}{'p95':>12}{'p99':>12}{'errors':>12}"
+    print(header)
+    print("-" * len(header))
+
+    def delta(before: float, after: float) -> str:
+        return f"{(after - before) / before:+.1%}" if before else "n/a"
+
+    rows = [(name, stats, baseline["endpoints"].get(name)) for name, stats in results["endpoints"].items()]
+    rows.append(("total", results["total"], baseline.get("total")))
+    for name, stats, before in rows:
+        if not before:
+            continue
+        print(
+            f"{name:<12}{delta(before['throughput_rps'], stats['throughput_rps']):>12}"
+            f"{delta(before['p50_ms'], stats['p50_ms']):>12}{delta(before['p95_ms'], stats['p95_ms']):>12}"
+            f"{delta(before['p99_ms'], stats['p99_ms']):>12}{stats['error_rate'] - before['error_rate']:>+12.1%}"
+        )
+    lag_before, lag_after = baseline.get("event_loop_lag"), results.get("event_loop_lag")
+    if lag_before and lag_after:
+        print(
+            f"{'loop lag':<12}{'':>12}{delta(lag_before['p50_ms'], lag_after['p50_ms']):>12}"
+            f"{delta(lag_before['p95_ms'], lag_after['p95_ms']):>12}{delta(lag_before['p99_ms'], lag_after['p99_ms']):>12}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds after login")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=250.0, help="mean pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument(
+        "--weight", action="append", default=[], metavar="OPERATION=N",
+        help=f"override an operation's weight, repeatable (operations: {', '.join(OPERATION_MIX)})",
+    )
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra server environment, repeatable")
+    parser.add_argument("--base-url", help="target a running server instead of starting one")
+    parser.add_argument("--tender-variants", type=int, default=3, help="pre-rendered PDFs per tender size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="earlier JSON results to diff against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args))
+    print_report(results)
+    if args.compare:
+        print_comparison(json.loads(args.compare.read_text()), results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nresults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
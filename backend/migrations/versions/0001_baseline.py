@@ -0,0 +1,81 @@
+"""Baseline: users, documents and analysis reports
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+Databases created by ``Base.metadata.create_all`` before migrations existed
+already have this schema and are stamped at this revision instead.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=True),
+        sa.Column("organization", sa.String(length=255), nullable=True),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("original_filename", sa.String(length=512), nullable=False),
+        sa.Column("stored_filename", sa.String(length=512), nullable=False),
+        sa.Column("content_type", sa.String(length=128), nullable=False),
+        sa.Column("file_size", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=64), nullable=False),
+        sa.Column("rule_config", sa.JSON(), nullable=False),
+        sa.Column("metadata_notes", sa.Text(), nullable=True),
+        sa.Column("uploaded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("stored_filename"),
+    )
+    op.create_index("ix_documents_owner_id", "documents", ["owner_id"])
+
+    op.create_table(
+        "analysis_reports",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("highlights", sa.JSON(), nullable=False),
+        sa.Column("sections", sa.JSON(), nullable=False),
+        sa.Column("rule_config", sa.JSON(), nullable=False),
+        sa.Column("zip_path", sa.String(length=512), nullable=True),
+        sa.Column("export_path", sa.String(length=512), nullable=True),
+        sa.Column("emailed_to", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_analysis_reports_document_id", "analysis_reports", ["document_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_reports_document_id", table_name="analysis_reports")
+    op.drop_table("analysis_reports")
+    op.drop_index("ix_documents_owner_id", table_name="documents")
+    op.drop_table("documents")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,40 @@
+"""Change log behind GET /documents/changes
+
+Revision ID: 0002_document_changes
+Revises: 0001_baseline
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_document_changes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_changes",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_document_changes_owner_id", "document_changes", ["owner_id"])
+    op.create_index("ix_document_changes_document_id", "document_changes", ["document_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_changes_document_id", table_name="document_changes")
+    op.drop_index("ix_document_changes_owner_id", table_name="document_changes")
+    op.drop_table("document_changes")
@@ -0,0 +1,28 @@
+"""Structured BOQ rows on analysis reports
+
+Revision ID: 0003_boq_rows
+Revises: 0002_document_changes
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_boq_rows"
+down_revision: Union[str, None] = "0002_document_changes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.add_column(sa.Column("boq_rows", sa.JSON(), nullable=False, server_default=sa.text("'[]'")))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.drop_column("boq_rows")
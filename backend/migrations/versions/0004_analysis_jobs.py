@@ -0,0 +1,53 @@
+"""Leased job table for the worker fleet
+
+Revision ID: 0004_analysis_jobs
+Revises: 0003_boq_rows
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_analysis_jobs"
+down_revision: Union[str, None] = "0003_boq_rows"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("owner_email", sa.String(length=255), nullable=False),
+        sa.Column("rule_config", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("lease_owner", sa.String(length=128), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("progress", sa.JSON(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_analysis_jobs_document_id", "analysis_jobs", ["document_id"])
+    op.create_index("ix_analysis_jobs_status", "analysis_jobs", ["status"])
+    op.create_index("ix_analysis_jobs_available_at", "analysis_jobs", ["available_at"])
+    op.create_index("ix_analysis_jobs_lease_expires_at", "analysis_jobs", ["lease_expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_jobs_lease_expires_at", table_name="analysis_jobs")
+    op.drop_index("ix_analysis_jobs_available_at", table_name="analysis_jobs")
+    op.drop_index("ix_analysis_jobs_status", table_name="analysis_jobs")
+    op.drop_index("ix_analysis_jobs_document_id", table_name="analysis_jobs")
+    op.drop_table("analysis_jobs")
@@ -0,0 +1,59 @@
+"""Document versions, per-page hashes and version diffs
+
+Revision ID: 0005_document_versions
+Revises: 0004_analysis_jobs
+Create Date: 2026-10-19 09:00:00
+
+Existing documents become version 1 of their own lineage.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_document_versions"
+down_revision: Union[str, None] = "0004_analysis_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("parent_document_id", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")))
+        batch.create_foreign_key(
+            "fk_documents_parent_document_id", "documents", ["parent_document_id"], ["id"], ondelete="SET NULL"
+        )
+        batch.create_index("ix_documents_parent_document_id", ["parent_document_id"])
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.add_column(sa.Column("version_diff", sa.JSON(), nullable=True))
+
+    op.create_table(
+        "document_pages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("page_number", sa.Integer(), nullable=False),
+        sa.Column("text_hash", sa.String(length=64), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("keyword_hits", sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_document_pages_document_id", "document_pages", ["document_id"])
+    op.create_index("ix_document_pages_text_hash", "document_pages", ["text_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_pages_text_hash", table_name="document_pages")
+    op.drop_index("ix_document_pages_document_id", table_name="document_pages")
+    op.drop_table("document_pages")
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.drop_column("version_diff")
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_index("ix_documents_parent_document_id")
+        batch.drop_constraint("fk_documents_parent_document_id", type_="foreignkey")
+        batch.drop_column("version")
+        batch.drop_column("parent_document_id")
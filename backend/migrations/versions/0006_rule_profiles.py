@@ -0,0 +1,56 @@
+"""Saved rule profiles
+
+Revision ID: 0006_rule_profiles
+Revises: 0005_document_versions
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_rule_profiles"
+down_revision: Union[str, None] = "0005_document_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rule_profiles",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("organization", sa.String(length=255), nullable=True),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("rule_config", sa.JSON(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_rule_profiles_owner_id", "rule_profiles", ["owner_id"])
+    op.create_index("ix_rule_profiles_organization", "rule_profiles", ["organization"])
+
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("rule_profile_id", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("rule_profile_version", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_documents_rule_profile_id", "rule_profiles", ["rule_profile_id"], ["id"], ondelete="SET NULL"
+        )
+        batch.create_index("ix_documents_rule_profile_id", ["rule_profile_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_index("ix_documents_rule_profile_id")
+        batch.drop_constraint("fk_documents_rule_profile_id", type_="foreignkey")
+        batch.drop_column("rule_profile_version")
+        batch.drop_column("rule_profile_id")
+    op.drop_index("ix_rule_profiles_organization", table_name="rule_profiles")
+    op.drop_index("ix_rule_profiles_owner_id", table_name="rule_profiles")
+    op.drop_table("rule_profiles")
@@ -0,0 +1,57 @@
+"""Per-user dashboard counters
+
+Revision ID: 0007_dashboard_counters
+Revises: 0006_rule_profiles
+Create Date: 2026-10-19 09:00:00
+
+Existing documents and analyses are counted during the upgrade, so the
+dashboard is right immediately and later incremental updates never apply
+to missing rows.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.services.dashboard_stats import compute_counters
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_dashboard_counters"
+down_revision: Union[str, None] = "0006_rule_profiles"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    counters = op.create_table(
+        "dashboard_counters",
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("owner_id", "kind", "key"),
+    )
+    _backfill(counters)
+
+
+def _backfill(counters: sa.Table) -> None:
+    # compute_counters only reads document and report columns that exist at this revision.
+    db = Session(bind=op.get_bind())
+    try:
+        for owner_id in db.execute(sa.text("SELECT id FROM users ORDER BY id")).scalars().all():
+            rows = [
+                {"owner_id": owner_id, "kind": kind, "key": key, "count": count, "total": total}
+                for (kind, key), (count, total) in compute_counters(db, owner_id).items()
+            ]
+            if rows:
+                op.bulk_insert(counters, rows)
+    finally:
+        db.close()
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_counters")
@@ -0,0 +1,28 @@
+"""Preview reports of the leading pages
+
+Revision ID: 0008_preview_pages
+Revises: 0007_dashboard_counters
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_preview_pages"
+down_revision: Union[str, None] = "0007_dashboard_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.add_column(sa.Column("preview_pages", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.drop_column("preview_pages")
@@ -0,0 +1,33 @@
+"""Link analysis reports to the queue job that wrote them
+
+Revision ID: 0009_report_job_id
+Revises: 0008_preview_pages
+Create Date: 2026-10-19 09:00:00
+
+The unique index makes report writes idempotent per job.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_report_job_id"
+down_revision: Union[str, None] = "0008_preview_pages"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.add_column(sa.Column("job_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_analysis_reports_job_id", "analysis_jobs", ["job_id"], ["id"], ondelete="SET NULL")
+        batch.create_index("ix_analysis_reports_job_id", ["job_id"], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("analysis_reports") as batch:
+        batch.drop_index("ix_analysis_reports_job_id")
+        batch.drop_constraint("fk_analysis_reports_job_id", type_="foreignkey")
+        batch.drop_column("job_id")
@@ -0,0 +1,38 @@
+"""Never reuse document and analysis report ids on SQLite
+
+Revision ID: 0010_monotonic_ids
+Revises: 0009_report_job_id
+Create Date: 2026-10-19 09:00:00
+
+Without AUTOINCREMENT SQLite hands the id of the newest deleted row to the next
+insert, and cached listing fragments keyed by id would then describe the wrong
+document. PostgreSQL sequences never go back, so this is a no-op there.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_monotonic_ids"
+down_revision: Union[str, None] = "0009_report_job_id"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("documents", "analysis_reports")
+
+
+def _recreate(autoincrement: bool) -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+            pass
+
+
+def upgrade() -> None:
+    _recreate(True)
+
+
+def downgrade() -> None:
+    _recreate(False)
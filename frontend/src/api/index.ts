@@ -1,5 +1,17 @@
 import { apiClient } from "./client";
-import { DocumentListResponse, RuleConfig, TokenResponse, UserResponse } from "./types";
+import {
+  AnalysisCreateResponse,
+  AnalysisProgressEvent,
+  AnalysisProgressEventName,
+  DocumentChangesResponse,
+  DocumentListResponse,
+  DocumentStats,
+  ExportLink,
+  RuleConfig,
+  RuleProfile,
+  TokenResponse,
+  UserResponse
+} from "./types";
 
 interface RegisterPayload {
   email: string;
@@ -28,20 +40,61 @@ export const fetchDocuments = async (): Promise<DocumentListResponse> => {
   return response.data;
 };
 
+export const fetchDocumentChanges = async (since: number): Promise<DocumentChangesResponse> => {
+  const response = await apiClient.get<DocumentChangesResponse>("/documents/changes", { params: { since } });
+  return response.data;
+};
+
+export const fetchDocumentStats = async (days = 14): Promise<DocumentStats> => {
+  const response = await apiClient.get<DocumentStats>("/documents/stats", { params: { days } });
+  return response.data;
+};
+
+export const deleteDocument = async (documentId: number): Promise<void> => {
+  await apiClient.delete(`/documents/${documentId}`);
+};
+
+export interface AnalyzeOptions {
+  previousDocumentId?: number;
+  // A saved profile replaces the inline rule config; the server caches its compiled matcher.
+  profileId?: number;
+  // Analyze the leading pages inline and return a preview while the full run continues.
+  preview?: boolean;
+}
+
 export const analyzeDocument = async (
   file: File,
-  ruleConfig: RuleConfig
-): Promise<{ document_id: number; analysis_id: number; status: string; summary_preview: string }> => {
+  ruleConfig: RuleConfig,
+  { previousDocumentId, profileId, preview }: AnalyzeOptions = {}
+): Promise<AnalysisCreateResponse> => {
   const formData = new FormData();
   formData.append("file", file);
-  formData.append("rule_config", JSON.stringify(ruleConfig));
+  if (!profileId) formData.append("rule_config", JSON.stringify(ruleConfig));
+
+  const response = await apiClient.post<AnalysisCreateResponse>("/documents/analyze", formData, {
+    headers: { "Content-Type": "multipart/form-data" },
+    params: { previous_document_id: previousDocumentId, profile_id: profileId, mode: preview ? "preview" : undefined }
+  });
+  return response.data;
+};
 
-  const response = await apiClient.post("/documents/analyze", formData, {
-    headers: { "Content-Type": "multipart/form-data" }
+export const reanalyzeDocument = async (documentId: number, profileId?: number): Promise<AnalysisCreateResponse> => {
+  const response = await apiClient.post<AnalysisCreateResponse>(`/documents/${documentId}/reanalyze`, null, {
+    params: { profile_id: profileId }
   });
   return response.data;
 };
 
+export const fetchRuleProfiles = async (): Promise<RuleProfile[]> => {
+  const response = await apiClient.get<RuleProfile[]>("/rule-profiles");
+  return response.data;
+};
+
+export const createRuleProfile = async (name: string, ruleConfig: RuleConfig, shared = false): Promise<RuleProfile> => {
+  const response = await apiClient.post<RuleProfile>("/rule-profiles", { name, rule_config: ruleConfig, shared });
+  return response.data;
+};
+
 export const downloadBundle = async (documentId: number): Promise<Blob> => {
   const response = await apiClient.get(`/documents/${documentId}/download`, {
     responseType: "blob"
@@ -49,6 +102,28 @@ export const downloadBundle = async (documentId: number): Promise<Blob> => {
   return response.data;
 };
 
+export interface ExportFilters {
+  dateFrom?: string;
+  dateTo?: string;
+  statuses?: string[];
+  latestOnly?: boolean;
+}
+
+// A signed link lets the browser stream the archive straight to disk instead of buffering it as a Blob.
+export const createExportUrl = async (
+  format: "ndjson" | "zip",
+  { dateFrom, dateTo, statuses, latestOnly }: ExportFilters = {}
+): Promise<string> => {
+  const params = new URLSearchParams({ format });
+  if (dateFrom) params.set("date_from", dateFrom);
+  if (dateTo) params.set("date_to", dateTo);
+  statuses?.forEach((status) => params.append("status", status));
+  if (latestOnly) params.set("latest_only", "true");
+  const response = await apiClient.post<ExportLink>(`/documents/export/link?${params.toString()}`);
+  params.set("token", response.data.token);
+  return `${apiClient.defaults.baseURL}/documents/export?${params.toString()}`;
+};
+
 export const emailAnalysis = async (
   analysisId: number,
   recipients: string[],
@@ -61,3 +136,51 @@ export const emailAnalysis = async (
   if (message) params.set("message", message);
   await apiClient.post(`/documents/${analysisId}/email?${params.toString()}`);
 };
+
+const TERMINAL_PROGRESS_EVENTS: AnalysisProgressEventName[] = ["completed", "failed"];
+
+// EventSource cannot send the bearer token, so the SSE stream is read through fetch.
+export const streamDocumentEvents = async (
+  documentId: number,
+  onEvent: (event: AnalysisProgressEvent) => void,
+  signal: AbortSignal
+): Promise<void> => {
+  const headers: Record<string, string> = { Accept: "text/event-stream" };
+  const authorization = apiClient.defaults.headers.common.Authorization;
+  if (authorization) headers.Authorization = String(authorization);
+
+  const response = await fetch(`${apiClient.defaults.baseURL}/documents/${documentId}/events`, { headers, signal });
+  if (!response.ok || !response.body) {
+    throw new Error(`Event stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += value;
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let eventName = "";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event:")) eventName = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (!eventName) continue;
+
+      const name = eventName as AnalysisProgressEventName;
+      onEvent({ event: name, data: data ? JSON.parse(data) : {} });
+      if (TERMINAL_PROGRESS_EVENTS.includes(name)) {
+        await reader.cancel();
+        return;
+      }
+    }
+  }
+};
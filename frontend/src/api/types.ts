@@ -3,6 +3,11 @@ export interface TokenResponse {
   token_type: string;
 }
 
+export interface ExportLink {
+  token: string;
+  expires_in: number;
+}
+
 export interface UserResponse {
   id: number;
   email: string;
@@ -18,12 +23,46 @@ export interface SectionInsight {
   keywords_found: string[];
 }
 
+export interface BOQRow {
+  page: number;
+  item_no?: string | null;
+  description: string;
+  quantity?: number | null;
+  unit?: string | null;
+  rate?: number | null;
+  amount?: number | null;
+}
+
+export interface SectionDiff {
+  title: string;
+  status: "added" | "removed" | "changed";
+  added_sentences: string[];
+  removed_sentences: string[];
+  added_keywords: string[];
+  removed_keywords: string[];
+  previous_summary?: string | null;
+  summary?: string | null;
+}
+
+export interface VersionDiff {
+  previous_document_id: number;
+  previous_analysis_id?: number | null;
+  changed_pages: number[];
+  removed_pages: number[];
+  reused_pages: number;
+  sections: Record<string, SectionDiff>;
+}
+
 export interface AnalysisResult {
   document_id: number;
   analysis_id: number;
   summary: string;
   highlights: Record<string, string>;
   sections: Record<string, SectionInsight>;
+  boq_rows: BOQRow[];
+  version_diff?: VersionDiff | null;
+  // Pages covered by a quick preview; absent once the full analysis has replaced it.
+  preview_pages?: number | null;
   created_at: string;
 }
 
@@ -32,18 +71,87 @@ export interface DocumentRecord {
   original_filename: string;
   uploaded_at: string;
   status: string;
+  version: number;
+  parent_document_id?: number | null;
+  rule_profile_id?: number | null;
   latest_analysis?: AnalysisResult | null;
 }
 
 export interface DocumentListResponse {
   items: DocumentRecord[];
   total: number;
+  cursor: number;
+}
+
+export interface SectionStats {
+  documents: number;
+  average_importance: number;
+}
+
+export interface KeywordStats {
+  keyword: string;
+  documents: number;
+}
+
+export interface ActivityDay {
+  day: string;
+  uploaded: number;
+  analyzed: number;
 }
 
+export interface DocumentStats {
+  total_documents: number;
+  status_counts: Record<string, number>;
+  sections: Record<string, SectionStats>;
+  top_keywords: KeywordStats[];
+  recent_activity: ActivityDay[];
+}
+
+export interface DocumentChangesResponse {
+  items: DocumentRecord[];
+  deleted: number[];
+  cursor: number;
+  has_more: boolean;
+}
+
+export interface AnalysisCreateResponse {
+  document_id: number;
+  analysis_id?: number | null;
+  status: string;
+  summary_preview: string;
+}
+
+export type AnalysisProgressEventName =
+  | "pages_extracted"
+  | "sections_matched"
+  | "summary_done"
+  | "tables_extracted"
+  | "bundle_written"
+  | "completed"
+  | "failed";
+
+export interface AnalysisProgressEvent {
+  event: AnalysisProgressEventName;
+  data: {
+    pages?: number;
+    total_pages?: number;
+    sections?: string[];
+    rows?: number;
+    bundle?: string;
+    status?: string;
+    analysis_id?: number;
+    detail?: string;
+  };
+}
+
+export type SummarizerEngineName = "frequency" | "textrank" | "lexrank" | "lsa";
+
 export interface RuleSectionConfig {
   enabled: boolean;
   keywords: string[];
   min_confidence: number;
+  summarizer?: SummarizerEngineName | null;
+  summarizer_budget_ms?: number | null;
 }
 
 export interface RuleConfig {
@@ -55,6 +163,16 @@ export interface RuleConfig {
   important_dates: RuleSectionConfig;
 }
 
+export interface RuleProfile {
+  id: number;
+  name: string;
+  owner_id: number;
+  organization?: string | null;
+  rule_config: RuleConfig;
+  version: number;
+  updated_at: string;
+}
+
 export const defaultRuleConfig: RuleConfig = {
   technical_specifications: {
     enabled: true,
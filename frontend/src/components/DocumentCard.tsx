@@ -1,18 +1,46 @@
 import { useMemo, useState } from "react";
 
-import { DocumentRecord } from "../api/types";
+import { AnalysisProgressEvent, DocumentRecord } from "../api/types";
 
 interface Props {
   document: DocumentRecord;
+  progress?: AnalysisProgressEvent;
   onDownload: (documentId: number) => Promise<void>;
   onEmail: (analysisId: number, recipients: string[]) => Promise<void>;
+  onReanalyze: (documentId: number) => Promise<void>;
+  onDelete: (documentId: number) => Promise<void>;
 }
 
-export const DocumentCard: React.FC<Props> = ({ document, onDownload, onEmail }) => {
+const describeProgress = (progress?: AnalysisProgressEvent): string => {
+  if (!progress) return "Analysis is being prepared.";
+  const { event, data } = progress;
+  switch (event) {
+    case "pages_extracted":
+      return `Extracting text: page ${data.pages} of ${data.total_pages}`;
+    case "summary_done":
+      return "Executive summary ready. Matching sections...";
+    case "sections_matched":
+      return `Matched ${data.sections?.length ?? 0} sections. Building report bundle...`;
+    case "tables_extracted":
+      return `Extracted ${data.rows ?? 0} BOQ rows from ${data.pages ?? 0} candidate pages...`;
+    case "bundle_written":
+      return "Report bundle written. Finalizing...";
+    case "failed":
+      return "Analysis failed. Please re-upload the tender.";
+    default:
+      return "Analysis complete. Loading results...";
+  }
+};
+
+export const DocumentCard: React.FC<Props> = ({ document, progress, onDownload, onEmail, onReanalyze, onDelete }) => {
   const [isEmailing, setEmailing] = useState(false);
   const [isDownloading, setDownloading] = useState(false);
 
   const highlights = useMemo(() => Object.entries(document.latest_analysis?.highlights ?? {}), [document]);
+  const versionDiff = document.latest_analysis?.version_diff;
+  const previewPages = document.latest_analysis?.preview_pages;
+  const hasBundle = Boolean(document.latest_analysis) && !previewPages;
+  const sectionChanges = useMemo(() => Object.entries(versionDiff?.sections ?? {}), [versionDiff]);
 
   const handleDownload = async () => {
     setDownloading(true);
@@ -23,6 +51,11 @@ export const DocumentCard: React.FC<Props> = ({ document, onDownload, onEmail })
     }
   };
 
+  const handleDelete = async () => {
+    if (!confirm(`Delete ${document.original_filename} and all of its reports?`)) return;
+    await onDelete(document.id);
+  };
+
   const handleEmail = async () => {
     if (!document.latest_analysis) return;
     const recipients = prompt("Enter recipient emails separated by commas")?.split(",").map((item) => item.trim()).filter(Boolean);
@@ -44,7 +77,10 @@ export const DocumentCard: React.FC<Props> = ({ document, onDownload, onEmail })
     <div className="card document-card">
       <div className="document-card__header">
         <div>
-          <h3>{document.original_filename}</h3>
+          <h3>
+            {document.original_filename}
+            {document.version > 1 && <span className="badge"> v{document.version}</span>}
+          </h3>
           <p>Uploaded on {new Date(document.uploaded_at).toLocaleString()}</p>
         </div>
         <span className={`status status--${document.status}`}>{document.status}</span>
@@ -52,6 +88,16 @@ export const DocumentCard: React.FC<Props> = ({ document, onDownload, onEmail })
 
       {document.latest_analysis ? (
         <div className="document-card__content">
+          {previewPages && (
+            <p className="card__note">
+              Preview of the first {previewPages} page(s).{" "}
+              {document.status === "processing"
+                ? describeProgress(progress)
+                : document.status === "failed"
+                ? "The full analysis failed."
+                : ""}
+            </p>
+          )}
           <p className="document-card__summary">{document.latest_analysis.summary}</p>
           <div className="document-card__highlights">
             {highlights.map(([key, value]) => (
@@ -62,22 +108,54 @@ export const DocumentCard: React.FC<Props> = ({ document, onDownload, onEmail })
             ))}
             {highlights.length === 0 && <p>No highlights extracted.</p>}
           </div>
+          {versionDiff && (
+            <div className="document-card__changes">
+              <p>
+                {versionDiff.changed_pages.length} changed page(s), {versionDiff.removed_pages.length} removed,{" "}
+                {versionDiff.reused_pages} unchanged since the previous version.
+              </p>
+              {sectionChanges.map(([key, change]) => (
+                <div className="pill" key={key}>
+                  <strong>
+                    {change.title.toUpperCase()} ({change.status})
+                  </strong>
+                  {change.added_sentences.map((sentence) => (
+                    <span key={`+${sentence}`}>+ {sentence}</span>
+                  ))}
+                  {change.removed_sentences.map((sentence) => (
+                    <span key={`-${sentence}`}>- {sentence}</span>
+                  ))}
+                </div>
+              ))}
+              {sectionChanges.length === 0 && <p>No section insights changed.</p>}
+            </div>
+          )}
         </div>
       ) : (
-        <p>Analysis is being prepared. Refresh in a moment.</p>
+        <p>{document.status === "failed" ? describeProgress({ event: "failed", data: {} }) : describeProgress(progress)}</p>
       )}
 
       <div className="document-card__actions">
-        <button className="btn" onClick={handleDownload} disabled={isDownloading || !document.latest_analysis}>
+        <button className="btn" onClick={handleDownload} disabled={isDownloading || !hasBundle}>
           {isDownloading ? "Preparing..." : "Download bundle"}
         </button>
         <button
           className="btn btn--ghost"
           onClick={handleEmail}
-          disabled={isEmailing || !document.latest_analysis}
+          disabled={isEmailing || !hasBundle}
         >
           {isEmailing ? "Sending..." : "Email summary"}
         </button>
+        <button
+          className="btn btn--ghost"
+          onClick={() => onReanalyze(document.id)}
+          disabled={document.status === "processing"}
+        >
+          Re-run analysis
+        </button>
+        <button className="btn btn--ghost" onClick={handleDelete}>
+          Delete
+        </button>
       </div>
     </div>
   );
@@ -1,6 +1,6 @@
 import { ChangeEvent } from "react";
 
-import { RuleConfig, RuleSectionConfig } from "../api/types";
+import { RuleConfig, RuleSectionConfig, SummarizerEngineName } from "../api/types";
 
 interface Props {
   value: RuleConfig;
@@ -25,6 +25,13 @@ const descriptionMap: Partial<Record<keyof RuleConfig, string>> = {
   important_dates: "Summarise bid submission, pre-bid, and opening milestones."
 };
 
+const summarizerOptions: Array<{ value: SummarizerEngineName; label: string }> = [
+  { value: "frequency", label: "Word frequency (fastest)" },
+  { value: "textrank", label: "TextRank" },
+  { value: "lexrank", label: "LexRank" },
+  { value: "lsa", label: "LSA" }
+];
+
 const updateSection = (
   config: RuleConfig,
   key: keyof RuleConfig,
@@ -54,6 +61,11 @@ export const RuleConfigForm: React.FC<Props> = ({ value, onChange }) => {
     onChange(updateSection(value, key, { min_confidence: Number(event.target.value) }));
   };
 
+  const handleSummarizer = (key: keyof RuleConfig) => (event: ChangeEvent<HTMLSelectElement>) => {
+    const summarizer = (event.target.value || null) as SummarizerEngineName | null;
+    onChange(updateSection(value, key, { summarizer }));
+  };
+
   return (
     <div className="card">
       <div className="card__header">
@@ -100,6 +112,17 @@ export const RuleConfigForm: React.FC<Props> = ({ value, onChange }) => {
                     onChange={handleConfidence(sectionKey)}
                   />
                 </label>
+                <label>
+                  Summarizer
+                  <select value={section.summarizer ?? ""} onChange={handleSummarizer(sectionKey)}>
+                    <option value="">Server default</option>
+                    {summarizerOptions.map((option) => (
+                      <option key={option.value} value={option.value}>
+                        {option.label}
+                      </option>
+                    ))}
+                  </select>
+                </label>
               </div>
             </div>
           );
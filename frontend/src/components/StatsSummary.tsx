@@ -0,0 +1,69 @@
+import { useEffect, useState } from "react";
+
+import { fetchDocumentStats } from "../api";
+import { DocumentStats } from "../api/types";
+
+interface StatsSummaryProps {
+  // Bumped by the dashboard whenever its document list changes, so the counters are re-read.
+  revision: string;
+}
+
+const formatLabel = (value: string) => value.replace(/_/g, " ");
+
+export const StatsSummary: React.FC<StatsSummaryProps> = ({ revision }) => {
+  const [stats, setStats] = useState<DocumentStats | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    fetchDocumentStats()
+      .then((response) => {
+        if (!cancelled) setStats(response);
+      })
+      .catch((error) => console.error(error));
+    return () => {
+      cancelled = true;
+    };
+  }, [revision]);
+
+  if (!stats || stats.total_documents === 0) return null;
+
+  const uploaded = stats.recent_activity.reduce((sum, day) => sum + day.uploaded, 0);
+  const analyzed = stats.recent_activity.reduce((sum, day) => sum + day.analyzed, 0);
+
+  return (
+    <div className="card card--inline stats-summary">
+      <div className="card__header">
+        <div>
+          <h3>Overview</h3>
+          <p>
+            {uploaded} uploaded and {analyzed} analyzed in the last {stats.recent_activity.length} days
+          </p>
+        </div>
+        <span className="badge">{stats.total_documents}</span>
+      </div>
+      <div className="stats-summary__grid">
+        <ul>
+          {Object.entries(stats.status_counts).map(([status, count]) => (
+            <li key={status}>
+              <strong>{count}</strong> {status}
+            </li>
+          ))}
+        </ul>
+        <ul>
+          {Object.entries(stats.sections).map(([key, section]) => (
+            <li key={key}>
+              {formatLabel(key)}: <strong>{Math.round(section.average_importance * 100)}%</strong> avg. importance
+            </li>
+          ))}
+        </ul>
+        <ul>
+          {stats.top_keywords.map((item) => (
+            <li key={item.keyword}>
+              {item.keyword} <strong>{item.documents}</strong>
+            </li>
+          ))}
+        </ul>
+      </div>
+    </div>
+  );
+};
@@ -1,44 +1,155 @@
-import { useCallback, useEffect, useState } from "react";
+import { isAxiosError } from "axios";
+import { useCallback, useEffect, useRef, useState } from "react";
 import toast from "react-hot-toast";
 
-import { analyzeDocument, downloadBundle, emailAnalysis, fetchDocuments } from "../api";
-import { DocumentRecord, RuleConfig } from "../api/types";
+import {
+  AnalyzeOptions,
+  analyzeDocument,
+  createExportUrl,
+  deleteDocument,
+  downloadBundle,
+  emailAnalysis,
+  ExportFilters,
+  fetchDocumentChanges,
+  fetchDocuments,
+  reanalyzeDocument,
+  streamDocumentEvents
+} from "../api";
+import { AnalysisProgressEvent, DocumentChangesResponse, DocumentRecord, RuleConfig } from "../api/types";
 
 interface UseDocumentsState {
   items: DocumentRecord[];
+  progress: Record<number, AnalysisProgressEvent>;
   isLoading: boolean;
   isUploading: boolean;
 }
 
+const mergeChanges = (items: DocumentRecord[], changes: DocumentChangesResponse): DocumentRecord[] => {
+  const byId = new Map(items.map((item) => [item.id, item]));
+  changes.deleted.forEach((documentId) => byId.delete(documentId));
+  changes.items.forEach((item) => byId.set(item.id, item));
+  return Array.from(byId.values()).sort((a, b) => b.uploaded_at.localeCompare(a.uploaded_at));
+};
+
 export const useDocuments = () => {
-  const [state, setState] = useState<UseDocumentsState>({ items: [], isLoading: false, isUploading: false });
+  const [state, setState] = useState<UseDocumentsState>({
+    items: [],
+    progress: {},
+    isLoading: false,
+    isUploading: false
+  });
+  const streams = useRef(new Map<number, AbortController>());
+  const cursor = useRef<number | null>(null);
+  const syncRef = useRef<() => Promise<void>>(async () => undefined);
+
+  const watch = useCallback((documentId: number) => {
+    if (streams.current.has(documentId)) return;
+    const controller = new AbortController();
+    streams.current.set(documentId, controller);
+
+    const handleEvent = (event: AnalysisProgressEvent) => {
+      setState((prev) => ({ ...prev, progress: { ...prev.progress, [documentId]: event } }));
+      if (event.event === "completed") {
+        syncRef.current();
+      } else if (event.event === "failed") {
+        toast.error("Analysis failed for one of your tenders.");
+        setState((prev) => ({
+          ...prev,
+          items: prev.items.map((item) => (item.id === documentId ? { ...item, status: "failed" } : item))
+        }));
+      }
+    };
+
+    streamDocumentEvents(documentId, handleEvent, controller.signal)
+      .catch((error) => {
+        if (!controller.signal.aborted) console.error(error);
+      })
+      .finally(() => {
+        streams.current.delete(documentId);
+      });
+  }, []);
 
   const load = useCallback(async () => {
     setState((prev) => ({ ...prev, isLoading: true }));
     try {
       const response = await fetchDocuments();
+      cursor.current = response.cursor;
       setState((prev) => ({ ...prev, items: response.items }));
+      response.items.filter((item) => item.status === "processing").forEach((item) => watch(item.id));
     } catch (error) {
       console.error(error);
       toast.error("Failed to load documents");
     } finally {
       setState((prev) => ({ ...prev, isLoading: false }));
     }
-  }, []);
+  }, [watch]);
+
+  // Pulls only what changed since the last cursor; falls back to a full load before the first one.
+  const sync = useCallback(async () => {
+    if (cursor.current === null) {
+      await load();
+      return;
+    }
+    try {
+      let changes: DocumentChangesResponse;
+      do {
+        changes = await fetchDocumentChanges(cursor.current);
+        cursor.current = changes.cursor;
+        const delta = changes;
+        setState((prev) => ({ ...prev, items: mergeChanges(prev.items, delta) }));
+        delta.items.filter((item) => item.status === "processing").forEach((item) => watch(item.id));
+      } while (changes.has_more);
+    } catch (error) {
+      console.error(error);
+      toast.error("Failed to refresh documents");
+    }
+  }, [load, watch]);
+  syncRef.current = sync;
 
-  const upload = useCallback(async (file: File, ruleConfig: RuleConfig) => {
+  const upload = useCallback(async (file: File, ruleConfig: RuleConfig, options: AnalyzeOptions = {}) => {
     setState((prev) => ({ ...prev, isUploading: true }));
     try {
-      await analyzeDocument(file, ruleConfig);
-      toast.success("Tender uploaded. Analysis will be ready shortly.");
-      await load();
+      await analyzeDocument(file, ruleConfig, options);
+      toast.success("Tender uploaded. Live progress will appear on its card.");
+      await sync();
     } catch (error) {
       console.error(error);
-      toast.error("Upload failed. Please retry.");
+      if (isAxiosError(error) && error.response?.status === 503) {
+        const retryAfter = error.response.headers["retry-after"];
+        toast.error(`Analysis capacity is busy. Please retry in about ${retryAfter ?? 30} seconds.`);
+      } else {
+        toast.error("Upload failed. Please retry.");
+      }
     } finally {
       setState((prev) => ({ ...prev, isUploading: false }));
     }
-  }, [load]);
+  }, [sync]);
+
+  const reanalyze = useCallback(async (documentId: number, profileId?: number) => {
+    try {
+      await reanalyzeDocument(documentId, profileId);
+      toast.success("Re-analysis started.");
+      await sync();
+    } catch (error) {
+      console.error(error);
+      if (isAxiosError(error) && error.response?.status === 409) {
+        toast.error("This document is already being analyzed.");
+      } else {
+        toast.error("Unable to start re-analysis.");
+      }
+    }
+  }, [sync]);
+
+  const remove = useCallback(async (documentId: number) => {
+    try {
+      await deleteDocument(documentId);
+      streams.current.get(documentId)?.abort();
+      await sync();
+    } catch (error) {
+      console.error(error);
+      toast.error("Unable to delete document.");
+    }
+  }, [sync]);
 
   const download = useCallback(async (documentId: number) => {
     try {
@@ -57,6 +168,24 @@ export const useDocuments = () => {
     }
   }, []);
 
+  const exportHistory = useCallback(async (format: "ndjson" | "zip", filters: ExportFilters = {}) => {
+    try {
+      const url = await createExportUrl(format, filters);
+      const link = document.createElement("a");
+      link.href = url;
+      document.body.appendChild(link);
+      link.click();
+      link.remove();
+    } catch (error) {
+      console.error(error);
+      if (isAxiosError(error) && error.response?.status === 400) {
+        toast.error(error.response.data?.detail ?? "Unable to export analyses.");
+      } else {
+        toast.error("Unable to export analyses.");
+      }
+    }
+  }, []);
+
   const email = useCallback(async (analysisId: number, recipients: string[]) => {
     try {
       await emailAnalysis(analysisId, recipients);
@@ -71,13 +200,25 @@ export const useDocuments = () => {
     load();
   }, [load]);
 
+  useEffect(() => {
+    const active = streams.current;
+    return () => {
+      active.forEach((controller) => controller.abort());
+      active.clear();
+    };
+  }, []);
+
   return {
     documents: state.items,
+    progress: state.progress,
     isLoading: state.isLoading,
     isUploading: state.isUploading,
-    refresh: load,
+    refresh: sync,
     upload,
+    reanalyze,
+    remove,
     download,
+    exportHistory,
     email
   };
 };
@@ -0,0 +1,37 @@
+import { useCallback, useEffect, useState } from "react";
+import toast from "react-hot-toast";
+
+import { createRuleProfile, fetchRuleProfiles } from "../api";
+import { RuleConfig, RuleProfile } from "../api/types";
+
+export const useRuleProfiles = () => {
+  const [profiles, setProfiles] = useState<RuleProfile[]>([]);
+
+  const load = useCallback(async () => {
+    try {
+      setProfiles(await fetchRuleProfiles());
+    } catch (error) {
+      console.error(error);
+      toast.error("Failed to load rule profiles");
+    }
+  }, []);
+
+  const save = useCallback(async (name: string, ruleConfig: RuleConfig, shared = false): Promise<RuleProfile | null> => {
+    try {
+      const profile = await createRuleProfile(name, ruleConfig, shared);
+      setProfiles((prev) => [...prev, profile].sort((a, b) => a.name.localeCompare(b.name)));
+      toast.success(`Saved rule profile "${profile.name}"`);
+      return profile;
+    } catch (error) {
+      console.error(error);
+      toast.error("Unable to save rule profile.");
+      return null;
+    }
+  }, []);
+
+  useEffect(() => {
+    load();
+  }, [load]);
+
+  return { profiles, save, refresh: load };
+};
@@ -1,21 +1,52 @@
-import { useState } from "react";
+import { useMemo, useState } from "react";
 
 import { defaultRuleConfig, RuleConfig } from "../api/types";
 import { DocumentCard } from "../components/DocumentCard";
 import { RuleConfigForm } from "../components/RuleConfigForm";
+import { StatsSummary } from "../components/StatsSummary";
 import { UploadCard } from "../components/UploadCard";
 import { DashboardLayout } from "../components/layout/DashboardLayout";
 import { useDocuments } from "../hooks/useDocuments";
+import { useRuleProfiles } from "../hooks/useRuleProfiles";
 
 export const DashboardPage: React.FC = () => {
   const [ruleConfig, setRuleConfig] = useState<RuleConfig>(defaultRuleConfig);
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
-  const { documents, isLoading, isUploading, upload, download, email } = useDocuments();
+  const [previousDocumentId, setPreviousDocumentId] = useState<number | undefined>(undefined);
+  const [profileId, setProfileId] = useState<number | undefined>(undefined);
+  const [preview, setPreview] = useState(true);
+  const { documents, progress, isLoading, isUploading, upload, reanalyze, download, exportHistory, email, remove } = useDocuments();
+  const { profiles, save: saveProfile } = useRuleProfiles();
+  // Any change to the listed documents (status, new analysis, deletion) moves the server-side counters.
+  const statsRevision = useMemo(
+    () => documents.map((doc) => `${doc.id}:${doc.status}:${doc.latest_analysis?.analysis_id ?? ""}`).join(","),
+    [documents]
+  );
 
   const handleUpload = async () => {
     if (!selectedFile) return;
-    await upload(selectedFile, ruleConfig);
+    await upload(selectedFile, ruleConfig, { previousDocumentId, profileId, preview });
     setSelectedFile(null);
+    setPreviousDocumentId(undefined);
+  };
+
+  const handleProfileSelect = (value: string) => {
+    const profile = profiles.find((item) => item.id === Number(value));
+    setProfileId(profile?.id);
+    if (profile) setRuleConfig(profile.rule_config);
+  };
+
+  // Any manual edit turns the form back into an ad-hoc rule config.
+  const handleRuleChange = (next: RuleConfig) => {
+    setRuleConfig(next);
+    setProfileId(undefined);
+  };
+
+  const handleSaveProfile = async () => {
+    const name = prompt("Name this rule profile")?.trim();
+    if (!name) return;
+    const profile = await saveProfile(name, ruleConfig);
+    if (profile) setProfileId(profile.id);
   };
 
   return (
@@ -37,20 +68,70 @@ export const DashboardPage: React.FC = () => {
                   {isUploading ? "Processing..." : "Run analysis"}
                 </button>
               </div>
-              <p className="card__note">The PDF will be parsed, summarized, and packaged with your rule set.</p>
+              {documents.length > 0 && (
+                <label className="card__note">
+                  Amendment or corrigendum of{" "}
+                  <select
+                    value={previousDocumentId ?? ""}
+                    onChange={(event) => setPreviousDocumentId(event.target.value ? Number(event.target.value) : undefined)}
+                    disabled={isUploading}
+                  >
+                    <option value="">(new tender)</option>
+                    {documents.map((doc) => (
+                      <option key={doc.id} value={doc.id}>
+                        {doc.original_filename} (v{doc.version})
+                      </option>
+                    ))}
+                  </select>
+                </label>
+              )}
+              <label className="card__note">
+                <input type="checkbox" checked={preview} onChange={(event) => setPreview(event.target.checked)} /> Show a
+                quick preview of the first pages while the full analysis runs
+              </label>
+              <p className="card__note">
+                {previousDocumentId
+                  ? "Only pages that changed since the selected version are re-extracted; the report lists what changed."
+                  : "The PDF will be parsed, summarized, and packaged with your rule set."}
+              </p>
             </div>
           )}
-          <RuleConfigForm value={ruleConfig} onChange={setRuleConfig} />
+          <div className="card card--inline">
+            <div className="card__header">
+              <label className="card__note">
+                Rule profile{" "}
+                <select value={profileId ?? ""} onChange={(event) => handleProfileSelect(event.target.value)}>
+                  <option value="">(custom rules)</option>
+                  {profiles.map((profile) => (
+                    <option key={profile.id} value={profile.id}>
+                      {profile.name}
+                      {profile.organization ? ` (${profile.organization})` : ""}
+                    </option>
+                  ))}
+                </select>
+              </label>
+              <button className="btn btn--ghost" onClick={handleSaveProfile} disabled={Boolean(profileId)}>
+                Save as profile
+              </button>
+            </div>
+          </div>
+          <RuleConfigForm value={ruleConfig} onChange={handleRuleChange} />
         </div>
 
         <div className="grid__col">
+          <StatsSummary revision={statsRevision} />
           <div className="card">
             <div className="card__header">
               <div>
                 <h2>Recent analyses</h2>
                 <p>Track every bid package your team has processed.</p>
               </div>
-              <span className="badge">{documents.length}</span>
+              <div>
+                <button className="btn btn--ghost" onClick={() => exportHistory("zip")} disabled={documents.length === 0}>
+                  Export all
+                </button>{" "}
+                <span className="badge">{documents.length}</span>
+              </div>
             </div>
             {isLoading ? (
               <p>Loading documents...</p>
@@ -62,8 +143,11 @@ export const DashboardPage: React.FC = () => {
                   <DocumentCard
                     key={doc.id}
                     document={doc}
+                    progress={progress[doc.id]}
                     onDownload={download}
                     onEmail={email}
+                    onReanalyze={(documentId) => reanalyze(documentId, profileId)}
+                    onDelete={remove}
                   />
                 ))}
               </div>